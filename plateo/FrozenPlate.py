@@ -0,0 +1,490 @@
+"""This module implements read-only, hashable snapshots of plates.
+
+A snapshot is created with ``plate.freeze()``. Snapshots can be shared
+between threads, stored in long histories, and used as keys in caches.
+Executing a picklist on snapshots (see ``PickList.execute_on_snapshots``)
+returns new snapshots which share all the unchanged wells with the previous
+ones, so that each new snapshot only costs the wells changed.
+"""
+
+from collections.abc import Mapping
+
+import numpy as np
+import pandas
+
+from .Well import (Well, check_transfer, add_quantities,
+                   subtract_quantities)
+from .tools import wellname_to_coordinates
+
+_HASH_MODULO = 2 ** 64
+
+
+class FrozenDict(Mapping):
+    """Read-only, hashable dict."""
+
+    __slots__ = ("_dict", "_hash")
+
+    def __init__(self, *args, **kwargs):
+        self._dict = dict(*args, **kwargs)
+        self._hash = None
+
+    def __getitem__(self, key):
+        return self._dict[key]
+
+    def __iter__(self):
+        return iter(self._dict)
+
+    def __len__(self):
+        return len(self._dict)
+
+    def __contains__(self, key):
+        return key in self._dict
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(frozenset(self._dict.items()))
+        return self._hash
+
+    def __eq__(self, other):
+        if isinstance(other, FrozenDict):
+            return self._dict == other._dict
+        return self._dict == other
+
+    def __repr__(self):
+        return "FrozenDict(%s)" % self._dict
+
+
+class FrozenObject:
+    """Read-only, hashable wrapper of an unhashable object, such as a Numpy
+    array or a Pandas dataframe.
+
+    ``value`` is a private copy of the object (a read-only array for Numpy
+    arrays). Two FrozenObjects are equal if they have the same type and
+    content.
+    """
+
+    __slots__ = ("value", "key", "_hash")
+
+    def __init__(self, value):
+        if isinstance(value, np.ndarray):
+            value = value.copy()
+            if value.dtype.hasobject:
+                content = freeze_value(value.tolist())
+            else:
+                content = (value.dtype.str, value.tobytes())
+            key = ("ndarray", value.shape, content)
+            value.flags.writeable = False
+        elif isinstance(value, (pandas.DataFrame, pandas.Series)):
+            value = value.copy()
+            if isinstance(value, pandas.DataFrame):
+                columns = tuple(value.columns)
+            else:
+                columns = (value.name,)
+            try:
+                content = pandas.util.hash_pandas_object(
+                    value, index=False).values.tobytes()
+            except TypeError:
+                raise TypeError("This %s has unhashable values and cannot "
+                                "be frozen." % value.__class__.__name__)
+            key = (value.__class__.__name__, columns,
+                   tuple(value.index), content)
+        else:
+            raise TypeError("Values of type %s cannot be frozen."
+                            % value.__class__.__name__)
+        object.__setattr__(self, "value", value)
+        object.__setattr__(self, "key", key)
+        object.__setattr__(self, "_hash", None)
+
+    def __setattr__(self, attribute, value):
+        raise AttributeError("FrozenObject objects are read-only.")
+
+    def __hash__(self):
+        if self._hash is None:
+            object.__setattr__(self, "_hash", hash(self.key))
+        return self._hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, FrozenObject):
+            return NotImplemented
+        return self.key == other.key
+
+    def __repr__(self):
+        return "FrozenObject(%s)" % repr(self.value)
+
+
+def freeze_value(value):
+    """Return a read-only, hashable version of a (data) value: dicts become
+    FrozenDicts, lists and tuples become tuples, sets become frozensets,
+    Numpy arrays and Pandas dataframes and series become FrozenObjects.
+
+    A TypeError is raised for other unhashable values.
+    """
+    if isinstance(value, (FrozenDict, FrozenObject)):
+        return value
+    if isinstance(value, Mapping):
+        return FrozenDict(
+            (key, freeze_value(val)) for key, val in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze_value(val) for val in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(freeze_value(val) for val in value)
+    if isinstance(value, (np.ndarray, pandas.DataFrame, pandas.Series)):
+        return FrozenObject(value)
+    try:
+        hash(value)
+    except TypeError:
+        raise TypeError("Values of type %s cannot be frozen."
+                        % value.__class__.__name__)
+    return value
+
+
+def thaw_value(value):
+    """Return a mutable version of a value frozen by ``freeze_value`` (dicts
+    for FrozenDicts, lists for tuples, sets for frozensets, copies of the
+    objects of FrozenObjects)."""
+    if isinstance(value, FrozenDict):
+        return {key: thaw_value(val) for key, val in value.items()}
+    if isinstance(value, tuple):
+        return [thaw_value(val) for val in value]
+    if isinstance(value, frozenset):
+        return set(thaw_value(val) for val in value)
+    if isinstance(value, FrozenObject):
+        return value.value.copy()
+    return value
+
+
+class FrozenWell:
+    """Read-only, hashable snapshot of a well.
+
+    The attributes are ``name``, ``row``, ``column``, ``volume``,
+    ``quantities`` and ``data`` (FrozenDicts), ``sources`` (a tuple of
+    (plate name, well name) for the source wells), and ``capacity``.
+    """
+
+    __slots__ = ("name", "row", "column", "volume", "quantities", "data",
+                 "sources", "capacity", "_hash")
+
+    def __init__(self, name, row, column, volume=0, quantities=None,
+                 data=None, sources=(), capacity=None):
+        set_attribute = object.__setattr__
+        set_attribute(self, "name", name)
+        set_attribute(self, "row", row)
+        set_attribute(self, "column", column)
+        set_attribute(self, "volume", volume)
+        set_attribute(self, "quantities", FrozenDict(quantities or {}))
+        set_attribute(self, "data", freeze_value(data or {}))
+        set_attribute(self, "sources", tuple(sources))
+        set_attribute(self, "capacity", capacity)
+        set_attribute(self, "_hash", None)
+
+    @staticmethod
+    def from_well(well):
+        """Return a snapshot of a (mutable) Well."""
+        sources = [
+            (source.plate.name, source.name) if isinstance(source, Well)
+            else source
+            for source in (well._sources or ())
+        ]
+        return FrozenWell(name=well.name, row=well.row, column=well.column,
+                          volume=well.content.volume,
+                          quantities=well.content._quantities,
+                          data=well._data, sources=sources,
+                          capacity=well.capacity)
+
+    def with_content(self, volume, quantities, sources=None):
+        """Return a copy of the well with a different content (and sources).
+        """
+        well = FrozenWell.__new__(FrozenWell)
+        set_attribute = object.__setattr__
+        for attribute in ("name", "row", "column", "data", "capacity"):
+            set_attribute(well, attribute, getattr(self, attribute))
+        set_attribute(well, "volume", volume)
+        set_attribute(well, "quantities", FrozenDict(quantities))
+        set_attribute(well, "sources",
+                      self.sources if sources is None else sources)
+        set_attribute(well, "_hash", None)
+        return well
+
+    @property
+    def is_empty(self):
+        """Return true iff the well's volume is 0"""
+        return self.volume == 0
+
+    def __setattr__(self, attribute, value):
+        raise AttributeError("FrozenWell objects are read-only.")
+
+    def __delattr__(self, attribute):
+        raise AttributeError("FrozenWell objects are read-only.")
+
+    def _key(self):
+        return (self.name, self.row, self.column, self.volume,
+                self.quantities, self.data, self.sources, self.capacity)
+
+    def __hash__(self):
+        if self._hash is None:
+            object.__setattr__(self, "_hash", hash(self._key()))
+        return self._hash
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, FrozenWell):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __repr__(self):
+        return "FrozenWell(%s)" % self.name
+
+
+class FrozenPlate(Mapping):
+    """Read-only, hashable snapshot of a plate, returned by ``plate.freeze()``.
+
+    The snapshot behaves like a read-only dict {wellname: FrozenWell}. It has
+    the ``name``, ``data`` (FrozenDict), ``num_rows`` and ``num_columns`` of
+    the plate, the name of its class, ``plate_class``, and the capacity of
+    its wells, ``well_capacity``. Use ``thaw()`` to get a new mutable plate.
+
+    The wells never accessed in a lazy plate are not stored, they are
+    returned as new empty wells (with capacity ``well_capacity``) when
+    accessed. The wells which share their
+    content (e.g. in troughs) keep sharing it when picklists are executed on
+    the snapshot.
+    """
+
+    __slots__ = ("name", "plate_class", "num_rows", "num_columns", "data",
+                 "well_capacity", "_wells", "_content_groups", "_wells_hash")
+
+    def __init__(self, name, plate_class, num_rows, num_columns, wells,
+                 data=None, content_groups=None, well_capacity=None):
+        set_attribute = object.__setattr__
+        set_attribute(self, "name", name)
+        set_attribute(self, "plate_class", plate_class)
+        set_attribute(self, "num_rows", num_rows)
+        set_attribute(self, "num_columns", num_columns)
+        set_attribute(self, "well_capacity", well_capacity)
+        set_attribute(self, "data", freeze_value(data or {}))
+        set_attribute(self, "_wells", dict(wells))
+        set_attribute(self, "_content_groups", content_groups or {})
+        set_attribute(self, "_wells_hash", None)
+
+    @staticmethod
+    def from_plate(plate):
+        """Return a snapshot of a (mutable) Plate (see ``Plate.freeze``)."""
+        wells, names_by_content = {}, {}
+        for well in plate.iter_wells(skip_untouched=True):
+            wells[well.name] = FrozenWell.from_well(well)
+            names_by_content.setdefault(id(well.content), []).append(
+                well.name)
+        content_groups = {
+            name: tuple(names)
+            for names in names_by_content.values()
+            if len(names) > 1
+            for name in names
+        }
+        return FrozenPlate(name=plate.name,
+                           plate_class=plate.__class__.__name__,
+                           num_rows=plate.num_rows,
+                           num_columns=plate.num_columns,
+                           wells=wells, data=plate.data,
+                           content_groups=content_groups,
+                           well_capacity=plate.PlateWell.capacity)
+
+    def __getitem__(self, wellname):
+        well = self._wells.get(wellname, None)
+        if well is not None:
+            return well
+        row, column = wellname_to_coordinates(wellname)
+        if not ((1 <= row <= self.num_rows) and
+                (1 <= column <= self.num_columns)):
+            raise KeyError(wellname)
+        return FrozenWell(name=wellname, row=row, column=column,
+                          capacity=self.well_capacity)
+
+    def __iter__(self):
+        return iter(self._wells)
+
+    def __len__(self):
+        return len(self._wells)
+
+    def __setattr__(self, attribute, value):
+        raise AttributeError("FrozenPlate objects are read-only.")
+
+    def __delattr__(self, attribute):
+        raise AttributeError("FrozenPlate objects are read-only.")
+
+    def iter_wells(self, direction="row"):
+        """Iter through the wells either by row or by column."""
+        if direction == "row":
+            key = lambda w: (w.row, w.column)
+        else:
+            key = lambda w: (w.column, w.row)
+        return sorted(self._wells.values(), key=key)
+
+    def content_group(self, wellname):
+        """Return the names of the wells sharing their content with the well
+        (including the well)."""
+        return self._content_groups.get(wellname, (wellname,))
+
+    def with_wells(self, new_wells):
+        """Return a new snapshot where some wells are replaced.
+
+        ``new_wells`` is a dict {wellname: FrozenWell}. All the other wells
+        are shared with this snapshot.
+        """
+        wells = dict(self._wells)
+        wells_hash = self._wells_hash
+        for name, well in new_wells.items():
+            if wells_hash is not None:
+                if name in wells:
+                    wells_hash -= hash((name, wells[name]))
+                wells_hash = (wells_hash + hash((name, well))) % _HASH_MODULO
+            wells[name] = well
+        plate = FrozenPlate.__new__(FrozenPlate)
+        set_attribute = object.__setattr__
+        for attribute in ("name", "plate_class", "num_rows", "num_columns",
+                          "data", "well_capacity", "_content_groups"):
+            set_attribute(plate, attribute, getattr(self, attribute))
+        set_attribute(plate, "_wells", wells)
+        set_attribute(plate, "_wells_hash", wells_hash)
+        return plate
+
+    def _get_wells_hash(self):
+        # Sum of the wells' hashes, updated in ``with_wells`` when a few wells
+        # change, rather than computed again.
+        if self._wells_hash is None:
+            wells_hash = sum(hash(item) for item in self._wells.items())
+            object.__setattr__(self, "_wells_hash", wells_hash % _HASH_MODULO)
+        return self._wells_hash
+
+    def __hash__(self):
+        return hash((self.name, self.plate_class, self.num_rows,
+                     self.num_columns, self.data, self._get_wells_hash()))
+
+    def __eq__(self, other):
+        if self is other:
+            return True
+        if not isinstance(other, FrozenPlate):
+            return NotImplemented
+        return ((self.name, self.plate_class, self.num_rows,
+                 self.num_columns, self.data) ==
+                (other.name, other.plate_class, other.num_rows,
+                 other.num_columns, other.data) and
+                (self._get_wells_hash() == other._get_wells_hash()) and
+                (self._wells == other._wells))
+
+    def thaw(self):
+        """Return a new (mutable) plate with the content and data of the
+        snapshot.
+
+        The sources of the wells are not restored.
+        """
+        from .containers import get_plate_class_by_name
+
+        plate_class = get_plate_class_by_name(
+            self.plate_class, self.num_rows, self.num_columns)
+        wells_data = {
+            name: thaw_value(well.data)
+            for name, well in self._wells.items()
+            if len(well.data)
+        }
+        plate = plate_class(name=self.name, wells_data=wells_data,
+                            data=thaw_value(self.data))
+        for name, frozen_well in self._wells.items():
+            content = plate.wells[name].content
+            content.volume = frozen_well.volume
+            content.quantities = content.container_class(
+                dict(frozen_well.quantities))
+        return plate
+
+    def __repr__(self):
+        return "FrozenPlate(%s)" % self.name
+
+
+def execute_on_snapshots(picklist, snapshots):
+    """Execute a picklist on plate snapshots, return new snapshots.
+
+    The snapshots are not modified. The new snapshots share all the wells
+    not involved in the picklist with the previous snapshots.
+
+    Parameters
+    ----------
+
+    picklist
+      A PickList. Its plates are matched with the snapshots by name.
+
+    snapshots
+      A list of FrozenPlates, or a dict {plate_name: FrozenPlate}. The
+      result is of the same type.
+
+    A ValueError is raised if several snapshots, or several plates of the
+    picklist, have the same name, or if a plate of the picklist has no
+    snapshot.
+    """
+    if isinstance(snapshots, Mapping):
+        snapshots_dict = dict(snapshots)
+    else:
+        snapshots_dict = {snapshot.name: snapshot for snapshot in snapshots}
+        if len(snapshots_dict) < len(snapshots):
+            raise ValueError("Several snapshots have the same name, they "
+                             "cannot be matched with the picklist's plates.")
+    plate_names = [plate.name for plate in picklist.list_plates()]
+    if len(set(plate_names)) < len(plate_names):
+        raise ValueError("Several plates of the picklist have the same "
+                         "name, they cannot be matched with snapshots.")
+    for plate_name in plate_names:
+        if plate_name not in snapshots_dict:
+            raise ValueError("No snapshot for the picklist's plate %s."
+                             % plate_name)
+    new_wells = {name: {} for name in snapshots_dict}
+
+    def get_well(plate_name, wellname):
+        well = new_wells[plate_name].get(wellname, None)
+        if well is None:
+            well = snapshots_dict[plate_name][wellname]
+        return well
+
+    def set_content(plate_name, well, volume, quantities, sources=None):
+        snapshot = snapshots_dict[plate_name]
+        for name in snapshot.content_group(well.name):
+            other_well = well if name == well.name else get_well(plate_name,
+                                                                 name)
+            new_wells[plate_name][name] = other_well.with_content(
+                volume, quantities,
+                sources=sources if name == well.name else None)
+
+    for transfer in picklist.transfers_list:
+        source_plate = transfer.source_well.plate.name
+        destination_plate = transfer.destination_well.plate.name
+        source = get_well(source_plate, transfer.source_well.name)
+        destination = get_well(destination_plate,
+                               transfer.destination_well.name)
+        volume = transfer.volume
+        factor = check_transfer(source, destination, volume)
+        transfered = {
+            component: quantity * factor
+            for component, quantity in source.quantities.items()
+        }
+        source_quantities = dict(source.quantities)
+        subtract_quantities(source_quantities, transfered)
+        set_content(source_plate, source, source.volume - volume,
+                    source_quantities)
+        destination = get_well(destination_plate, destination.name)
+        destination_quantities = dict(destination.quantities)
+        add_quantities(destination_quantities, transfered)
+        sources = destination.sources
+        if (source_plate, source.name) not in sources:
+            sources = sources + ((source_plate, source.name),)
+        set_content(destination_plate, destination,
+                    destination.volume + volume, destination_quantities,
+                    sources=sources)
+
+    new_snapshots = {
+        name: (snapshot.with_wells(new_wells[name]) if new_wells[name]
+               else snapshot)
+        for name, snapshot in snapshots_dict.items()
+    }
+    if isinstance(snapshots, Mapping):
+        return new_snapshots
+    return [new_snapshots[snapshot.name] for snapshot in snapshots]
@@ -0,0 +1,204 @@
+"""This module implements the recording of liquid transfers as a mixing graph,
+to trace which original wells the content of each well comes from."""
+
+from collections import OrderedDict
+
+import numpy as np
+
+try:
+    import scipy.sparse
+    SCIPY_AVAILABLE = True
+except ImportError:
+    SCIPY_AVAILABLE = False
+
+
+class MixingGraph:
+    """Record of well-to-well transfers, to trace the composition of wells.
+
+    Each transfer is recorded as an edge (source well, destination well,
+    volume transferred, volume of the destination before the transfer). The
+    wells which are used as sources, or which already have liquid, before
+    receiving anything are the "root" wells.
+
+    Examples
+    --------
+
+    >>> graph = MixingGraph()
+    >>> picklist.execute(callback_function=graph.record_transfer)
+    >>> graph.fractions(final_plate["A1"])
+    {(Parts-A1): 0.25, (Parts-B1): 0.25, (Buffer-A1): 0.5}
+    >>> matrix, wells, roots = graph.fractions_matrix()
+
+    Notes
+    -----
+
+    Only the transfers recorded are taken into account: content added to the
+    wells in any other way is ignored.
+    """
+
+    def __init__(self):
+        self.edges = []
+        self.edges_into = {}
+        self._weights = {}
+        self._totals = {}
+        self._edges_replayed = 0
+
+    def add_edge(self, source_well, destination_well, volume,
+                 destination_volume):
+        """Record a transfer of ``volume`` from ``source_well`` to
+        ``destination_well`` which contained ``destination_volume`` just
+        before the transfer."""
+        self.edges_into.setdefault(destination_well, []).append(
+            len(self.edges))
+        self.edges.append((source_well, destination_well, volume,
+                           destination_volume))
+
+    def record_transfer(self, picklist, transfer):
+        """Record a transfer which has just been executed.
+
+        This method can be used as ``callback_function`` of
+        ``PickList.execute``.
+        """
+        destination_well = transfer.destination_well
+        self.add_edge(transfer.source_well, destination_well,
+                      transfer.volume,
+                      destination_well.volume - transfer.volume)
+
+    def record_picklist(self, picklist):
+        """Execute the picklist (in place) while recording its transfers."""
+        picklist.execute(callback_function=self.record_transfer)
+
+    def _compute_compositions(self):
+        """Return a dict {well: {root_well: weight}} for all wells in the
+        graph, where the fraction of a well's content coming from a root well
+        is the root's weight divided by the well's total weight (see
+        ``_totals``).
+
+        The weights are updated in place by replaying the transfers recorded
+        since the last call, so that each transfer only costs the size of
+        the source's composition (pooling N wells into one is O(N)).
+        """
+        weights, totals = self._weights, self._totals
+        for source, destination, volume, destination_volume in (
+                self.edges[self._edges_replayed:]):
+            if source not in weights:
+                weights[source] = {source: 1.0}
+                totals[source] = 1.0
+            source_weights, source_total = weights[source], totals[source]
+            destination_weights = weights.get(destination, None)
+            if destination_volume <= 0:
+                destination_weights = weights[destination] = {}
+                totals[destination] = 0.0
+            elif destination_weights is None:
+                destination_weights = weights[destination] = {
+                    destination: destination_volume}
+                totals[destination] = destination_volume
+            if (volume == 0) or (source_total == 0):
+                continue
+            # Volumes are converted to the scale of the destination's weights
+            # (the destination may have lost volume, in the same proportions
+            # for all roots, since its weights were last updated).
+            scale = (totals[destination] / destination_volume
+                     if totals[destination] else 1.0)
+            factor = volume * scale / source_total
+            for root, weight in list(source_weights.items()):
+                destination_weights[root] = (
+                    destination_weights.get(root, 0) + weight * factor)
+            totals[destination] += volume * scale
+        self._edges_replayed = len(self.edges)
+        return weights
+
+    def _well_fractions(self, well):
+        weights = self._compute_compositions().get(well, None)
+        if weights is None:
+            return {well: 1.0}
+        total = self._totals[well]
+        if total == 0:
+            return {}
+        return {root: weight / total for root, weight in weights.items()}
+
+    def fractions(self, well):
+        """Return a dict {root_well: fraction} giving the fraction (in volume)
+        of the well's content coming from each root well."""
+        return self._well_fractions(well)
+
+    def list_wells(self):
+        """Return the list of all wells in the graph, in order of first
+        appearance."""
+        wells = OrderedDict()
+        for source, destination, _, _ in self.edges:
+            wells[source] = True
+            wells[destination] = True
+        return list(wells)
+
+    def list_roots(self):
+        """Return the list of all root wells, in order of first appearance."""
+        compositions = self._compute_compositions()
+        roots = OrderedDict()
+        for well in self.list_wells():
+            for root in compositions[well]:
+                roots[root] = True
+        return list(roots)
+
+    def fractions_matrix(self, wells=None, roots=None):
+        """Return (matrix, wells, roots), where ``matrix[i, j]`` is the
+        fraction of ``wells[i]``'s content coming from ``roots[j]``.
+
+        By default, all wells and roots of the graph are used. The matrix is
+        a scipy sparse (CSR) matrix if scipy is installed, else a numpy
+        array.
+        """
+        if wells is None:
+            wells = self.list_wells()
+        if roots is None:
+            roots = self.list_roots()
+        root_indices = {root: i for i, root in enumerate(roots)}
+        rows, columns, values = [], [], []
+        for i, well in enumerate(wells):
+            for root, fraction in self._well_fractions(well).items():
+                j = root_indices.get(root, None)
+                if j is not None:
+                    rows.append(i)
+                    columns.append(j)
+                    values.append(fraction)
+        shape = (len(wells), len(roots))
+        if SCIPY_AVAILABLE:
+            matrix = scipy.sparse.csr_matrix((values, (rows, columns)),
+                                             shape=shape)
+        else:
+            matrix = np.zeros(shape)
+            matrix[rows, columns] = values
+        return matrix, wells, roots
+
+    def ancestry(self, well):
+        """Return the list of the transfers which contributed to the well's
+        content, as (source_well, destination_well, volume) tuples in the
+        order in which they happened.
+
+        A transfer into an ancestor only counts if it happened before the
+        ancestor was used as a source. The tuples are the edges of the well's
+        ancestry graph.
+        """
+        edge_indices = set()
+        # Wells to explore, with the index of the last transfer to consider.
+        stack = [(well, len(self.edges))]
+        explored_until = {}
+        while stack:
+            current_well, until = stack.pop()
+            if explored_until.get(current_well, -1) >= until:
+                continue
+            explored_until[current_well] = until
+            for index in self.edges_into.get(current_well, ()):
+                if index >= until:
+                    break
+                edge_indices.add(index)
+                stack.append((self.edges[index][0], index))
+        return [self.edges[index][:3] for index in sorted(edge_indices)]
+
+    def ancestors(self, well):
+        """Return the list of all wells which contributed to the well's
+        content, in order of first contribution."""
+        ancestors = OrderedDict()
+        for source, _, _ in self.ancestry(well):
+            ancestors[source] = True
+        return list(ancestors)
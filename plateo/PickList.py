@@ -1,6 +1,6 @@
 """Classes to represent picklists and liquid transfers in general"""
 from collections import OrderedDict
-from copy import deepcopy
+from copy import copy, deepcopy
 import json
 
 import pandas
@@ -8,6 +8,7 @@ import pandas
 #import parsers
 #import exporters
 from .tools import compute_rows_columns, wellname_to_index, index_to_wellname
+from .FrozenPlate import execute_on_snapshots
 
 
 
@@ -31,6 +32,8 @@ class Transfer:
       information can be used later e.g. as parameters for the transfer
       when exporting a picklist.
     """
+    __slots__ = ("volume", "source_well", "destination_well", "data")
+
     def __init__(self, source_well, destination_well, volume, data=None):
 
         self.volume = volume
@@ -38,6 +41,16 @@ class Transfer:
         self.destination_well = destination_well
         self.data = data
 
+    @property
+    def source_plate(self):
+        """The plate of the source well."""
+        return self.source_well.plate
+
+    @property
+    def destination_plate(self):
+        """The plate of the destination well."""
+        return self.destination_well.plate
+
     def to_plain_string(self):
         """Return "xx L from {source_well} into {dest_well}"."""
         return ("{self.volume:.02E}L from {self.source_well.plate.name} "
@@ -107,37 +120,56 @@ class PickList:
         with open(filename, "w+") as f:
             f.write(self.to_plain_string())
 
+    def list_plates(self):
+        """Return the list of all plates involved in the picklist's transfers,
+        in order of first appearance."""
+        plates = OrderedDict()
+        for transfer in self.transfers_list:
+            plates[transfer.source_well.plate] = True
+            plates[transfer.destination_well.plate] = True
+        return list(plates.keys())
+
+    def with_plates_replaced(self, new_plates):
+        """Return a copy of the picklist where the transfers are between the
+        wells of other plates.
+
+        ``new_plates`` is a dict ``{plate: new_plate}``. Each transfer from or
+        to a well of ``plate`` becomes a transfer from or to the well with the
+        same name in ``new_plate``. The data of the picklist and transfers
+        are (shallow) copies.
+        """
+        return PickList([
+            Transfer(
+                source_well=new_plates[transfer.source_well.plate].wells[
+                    transfer.source_well.name],
+                destination_well=new_plates[
+                    transfer.destination_well.plate].wells[
+                    transfer.destination_well.name],
+                volume=transfer.volume,
+                data=copy(transfer.data)
+            )
+            for transfer in self.transfers_list
+        ], data=copy(self.data))
+
+    def copy_with_new_plates(self):
+        """Return (new_picklist, new_plates) where the plates of the picklist
+        are deep-copied.
+
+        ``new_plates`` is a dict ``{plate: plate_copy}`` and the transfers of
+        ``new_picklist`` are between the wells of the copies. The plates are
+        copied all at once, so that the wells of the different copies refer to
+        each other (e.g. through their sources) rather than to new copies.
+        """
+        plates = self.list_plates()
+        new_plates = dict(zip(plates, deepcopy(plates)))
+        return self.with_plates_replaced(new_plates), new_plates
+
     def execute(self, content_field="content", inplace=True,
                 callback_function=None):
         """Simulate the execution of the picklist"""
 
         if not inplace:
-            all_plates = set(
-                plate
-                for transfer in self.transfers_list
-                for plate in [transfer.source_well.plate,
-                              transfer.destination_well.plate]
-            )
-            new_plates = {
-                plate: deepcopy(plate)
-                for plate in all_plates
-            }
-
-            new_transfer_list = []
-            for transfer in self.transfers_list:
-                new_source_plate = new_plates[transfer.source_well.plate]
-                new_dest_plate = new_plates[transfer.destination_well.plate]
-                new_source_well = new_source_plate.wells[
-                    transfer.source_well.name]
-                new_dest_well = new_dest_plate.wells[
-                    transfer.destination_well.name]
-                new_transfer_list.append(Transfer(
-                    volume=transfer.volume,
-                    source_well=new_source_well,
-                    destination_well=new_dest_well
-                ))
-
-            new_picklist = PickList(transfers_list=new_transfer_list)
+            new_picklist, new_plates = self.copy_with_new_plates()
             new_picklist.execute(content_field=content_field, inplace=True,
                                  callback_function=callback_function)
             return new_plates
@@ -150,6 +182,16 @@ class PickList:
                 if callback_function is not None:
                     callback_function(self, transfer)
 
+    def execute_on_snapshots(self, snapshots):
+        """Simulate the execution of the picklist on plate snapshots (see
+        ``Plate.freeze``), and return the new snapshots.
+
+        ``snapshots`` is a list of FrozenPlates or a dict
+        {plate_name: FrozenPlate}, matched with the picklist's plates by name.
+        The result is of the same type. The snapshots are not modified.
+        """
+        return execute_on_snapshots(self, snapshots)
+
     def restricted_to(self, transfer_filter=None, source_well=None,
                       destination_well=None):
         """Return a version of the picklist restricted to transfers with the
@@ -179,8 +221,9 @@ class PickList:
         transfers, such as "source_well", or a function f(transfer) -> value.
         """
         if not hasattr(sorting_method, "__call__"):
+            attribute = sorting_method
             def sorting_method(transfer):
-                return transfer.__dict__[sorting_method]
+                return getattr(transfer, attribute)
         return PickList(sorted(self.transfers_list, key=sorting_method),
                         data={"parent": self})
 
@@ -197,7 +240,7 @@ class PickList:
         if isinstance(category, str):
             str_category = category
             def category(t):
-                return t.__dict__[str_category]
+                return getattr(t, str_category)
         categories = set([category(tr) for tr in self.transfers_list])
         return [
             (cat, self.restricted_to(lambda tr: category(tr) == cat))
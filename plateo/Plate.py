@@ -5,33 +5,208 @@ set number of wells, well format, etc.
 """
 from collections import OrderedDict
 import json
-from .Well import Well
+from .Well import Well, get_default_container_class
+from .FrozenPlate import FrozenPlate
 from .tools import (index_to_wellname, wellname_to_index,
-                    coordinates_to_wellname, rowname_to_number,
-                    replace_nans_in_dict)
-from box import Box
+                    coordinates_to_wellname, wellname_to_coordinates,
+                    rowname_to_number, replace_nans_in_dict,
+                    infer_plate_size_from_wellnames)
+
+WELL_DICT_KEYS = ("name", "content", "row", "column")
+
+
+def _replace_nans(value, replace_by=None):
+    """Return the value with NaNs (also in dicts and lists) replaced."""
+    if isinstance(value, float):
+        return replace_by if value != value else value
+    if isinstance(value, dict):
+        return {k: _replace_nans(v, replace_by) for k, v in value.items()}
+    if isinstance(value, (list, tuple)):
+        return [_replace_nans(v, replace_by) for v in value]
+    return value
+
+
+def _json_default(value):
+    """Serialize numpy arrays and scalars as lists and numbers, and other
+    objects as strings."""
+    if hasattr(value, "tolist"):
+        return value.tolist()
+    return str(value)
+
+
+class LazyWellsDict(dict):
+    """Dict {wellname: well} of a lazy plate, creating the wells on demand.
+
+    Accessing a well with ``wells[name]``, ``wells.get(name)`` or
+    ``wells.name`` creates it if it doesn't exist yet. ``name in wells`` is
+    true for all the wells of the plate, created or not. Iterating over the
+    dict, or calling ``keys()``, ``values()``, ``items()``, ``copy()`` or
+    ``len()``, first creates all the wells of the plate.
+    ``created_wells()`` returns only the wells created so far.
+    """
+
+    def __init__(self, plate):
+        dict.__init__(self)
+        self.plate = plate
+        self.complete = False
+
+    def _coordinates(self, wellname):
+        """Return the (row, column) of the well, or None if it is not the
+        name of a well of the plate."""
+        try:
+            row, column = wellname_to_coordinates(wellname)
+        except (AttributeError, TypeError, ValueError):
+            return None
+        if ((coordinates_to_wellname((row, column)) != wellname) or
+                not (1 <= row <= self.plate.num_rows) or
+                not (1 <= column <= self.plate.num_columns)):
+            return None
+        return row, column
+
+    def __missing__(self, wellname):
+        coordinates = self._coordinates(wellname)
+        if coordinates is None:
+            raise KeyError(wellname)
+        well = self.plate._new_well(coordinates[0], coordinates[1], wellname)
+        dict.__setitem__(self, wellname, well)
+        return well
+
+    def get(self, wellname, default=None):
+        try:
+            return self[wellname]
+        except KeyError:
+            return default
+
+    def __getattr__(self, wellname):
+        try:
+            return self[wellname]
+        except KeyError:
+            raise AttributeError(wellname)
+
+    def __contains__(self, wellname):
+        return (dict.__contains__(self, wellname) or
+                (self._coordinates(wellname) is not None))
+
+    def create_all_wells(self):
+        """Create all the wells of the plate which don't exist yet."""
+        if not self.complete:
+            plate = self.plate
+            for row in range(1, plate.num_rows + 1):
+                for column in range(1, plate.num_columns + 1):
+                    wellname = coordinates_to_wellname((row, column))
+                    if not dict.__contains__(self, wellname):
+                        dict.__setitem__(self, wellname,
+                                         plate._new_well(row, column,
+                                                         wellname))
+            self.complete = True
+
+    def created_wells(self):
+        """Return the list of the wells created so far."""
+        return list(dict.values(self))
+
+    def __iter__(self):
+        self.create_all_wells()
+        return dict.__iter__(self)
+
+    def __len__(self):
+        self.create_all_wells()
+        return dict.__len__(self)
+
+    def keys(self):
+        self.create_all_wells()
+        return dict.keys(self)
+
+    def values(self):
+        self.create_all_wells()
+        return dict.values(self)
+
+    def items(self):
+        self.create_all_wells()
+        return dict.items(self)
+
+    def copy(self):
+        self.create_all_wells()
+        return dict(dict.items(self))
+
+    def __reduce__(self):
+        return (self.__class__, (self.plate,),
+                {"complete": self.complete}, None, iter(dict.items(self)))
+
 
 class Plate:
-    """Base class for all wells."""
+    """Base class for all wells.
+
+    Parameters
+    ----------
+
+    name
+      Name of the plate.
+
+    wells_data
+      A dict {wellname: {field: value}} of data for some of the wells.
+
+    data
+      A dict of data on the plate.
+
+    lazy
+      If True, the wells are only created when first accessed, with
+      ``plate[name]`` or ``plate.wells[name]``, or when all wells are
+      iterated over. This saves time and memory for large plates of which
+      only a few wells are used. Methods such as ``list_well_data_fields``
+      skip the wells never accessed. By default, the ``lazy_wells`` class
+      attribute is used (False, unless set e.g. on a plate subclass).
+
+    Notes
+    -----
+
+    The data of the plate and wells, the wells' quantities and the plate's
+    ``wells`` are dicts of the class given by the ``container_class`` class
+    attribute, or by default ``Box`` (see
+    ``plateo.Well.set_default_container_class``). The wells' quantities can
+    use another class, given by the ``quantities_class`` class attribute,
+    e.g. ``SparseQuantities`` which stores the quantities as sparse vectors
+    and is much faster for wells with many components.
+    """
 
     PlateWell = Well
+    lazy_wells = False
+    container_class = None
+    quantities_class = None
 
     def __init__(self, name=None, wells_data=None,
-                 data=None):
+                 data=None, lazy=None):
 
+        if self.container_class is None:
+            self.container_class = get_default_container_class()
         self.name = name
-        self.data = Box({} if data is None else data)
+        self.data = self.container_class({} if data is None else data)
         self.wells_data = {} if wells_data is None else wells_data
         self.num_wells = self.num_rows * self.num_columns
-        self.wells = Box()
+        if lazy is None:
+            lazy = self.lazy_wells
 
+        if lazy:
+            self.wells = LazyWellsDict(self)
+            for wellname in self.wells_data:
+                self.wells[wellname]
+            return
+
+        self.wells = self.container_class()
         for row in range(1, self.num_rows + 1):
             for column in range(1, self.num_columns + 1):
                 wellname = coordinates_to_wellname((row, column))
-                data = self.wells_data.get(wellname, {})
-                well = self.PlateWell(plate=self, row=row, column=column,
-                                      name=wellname, data=data)
-                self.wells[wellname] = well
+                self.wells[wellname] = self._new_well(row, column, wellname)
+
+    def _new_well(self, row, column, wellname):
+        data = self.wells_data.get(wellname, {})
+        return self.PlateWell(plate=self, row=row, column=column,
+                              name=wellname, data=data)
+
+    @property
+    def is_lazy(self):
+        """True iff the plate's wells are only created when first accessed
+        (see parameter ``lazy`` of the Plate class)."""
+        return isinstance(self.wells, LazyWellsDict)
 
     def __getitem__(self, k):
         """Return e.g. well A1's dict when calling `myplate['A1']`."""
@@ -65,7 +240,7 @@ class Plate:
     def find_unique_well(self, content_includes=None, condition=None):
         if content_includes is not None:
             def condition(well):
-                return (content_includes in well.content.quantities.keys())
+                return (content_includes in (well.content._quantities or {}))
         wells = [
             well
             for name, well in self.wells.items()
@@ -83,8 +258,8 @@ class Plate:
     def list_well_data_fields(self):
         return sorted(list(set(
             field
-            for well in self
-            for field in well.data.keys()
+            for well in self.iter_wells(skip_untouched=True)
+            for field in (well._data or {})
         )))
 
     def wells_in_column(self, column_number):
@@ -123,7 +298,7 @@ class Plate:
                          ignore_none=False, direction_of_occurence="row"):
         if key is None:
             def key(well):
-                return well.data.get(data_field, None)
+                return (well._data or {}).get(data_field, None)
         dct = OrderedDict()
         for well in self.iter_wells(direction=direction_of_occurence):
             well_key = key(well)
@@ -150,28 +325,40 @@ class Plate:
     def wellname_to_index(self, wellname, direction="row"):
         return wellname_to_index(wellname, self.num_wells, direction=direction)
 
-    def iter_wells(self, direction="row"):
-        """Iter through the wells either by row or by column"""
+    def iter_wells(self, direction="row", skip_untouched=False):
+        """Iter through the wells either by row or by column.
+
+        If ``skip_untouched`` is True and the plate is lazy, only the wells
+        accessed so far are returned (the other wells are empty and have no
+        data).
+        """
         if direction == "row":
-            return self.wells_sorted_by(lambda w: (w.row, w.column))
+            return self.wells_sorted_by(lambda w: (w.row, w.column),
+                                        skip_untouched=skip_untouched)
         else:
-            return self.wells_sorted_by(lambda w: (w.column, w.row))
+            return self.wells_sorted_by(lambda w: (w.column, w.row),
+                                        skip_untouched=skip_untouched)
 
-    def wells_sorted_by(self, sortkey):
-        return (e for e in sorted(self.wells.values(), key=sortkey))
+    def wells_sorted_by(self, sortkey, skip_untouched=False):
+        if skip_untouched and self.is_lazy:
+            wells = self.wells.created_wells()
+        else:
+            wells = self.wells.values()
+        return (e for e in sorted(wells, key=sortkey))
     
     def list_data_field_values(self, data_field, include_none=False):
         return list(set([
-            w.data[data_field]
-            for w in self.iter_wells()
-            if data_field in w.data
-            and (include_none or (w.data[data_field] is not None))
+            w._data[data_field]
+            for w in self.iter_wells(skip_untouched=True)
+            if (w._data is not None) and (data_field in w._data)
+            and (include_none or (w._data[data_field] is not None))
         ]))
 
     def last_nonempty_well(self, direction='row'):
         """Return the last non-empty well found when traversing the plate."""
         selected_well = None
-        for well in self.iter_wells(direction=direction):
+        for well in self.iter_wells(direction=direction,
+                                    skip_untouched=True):
             if not well.is_empty:
                 selected_well = well
         return selected_well
@@ -192,5 +379,192 @@ class Plate:
             replace_nans_in_dict(dct, replace_by=replace_nans_by)
         return dct
 
+    def iter_json_chunks(self, compact=False, replace_nans_by=None):
+        """Iterate over the successive strings of the plate's JSON.
+
+        See ``to_json`` for the parameters.
+        """
+        encode = json.JSONEncoder(default=_json_default,
+                                  separators=(",", ":")).encode
+        yield "{%s,%s,%s,%s,%s," % (
+            '"name":' + encode(self.name),
+            '"class":' + encode(self.__class__.__name__),
+            '"num_rows":%d' % self.num_rows,
+            '"num_columns":%d' % self.num_columns,
+            '"data":' + encode(_replace_nans(dict(self.data), replace_nans_by))
+        )
+        if compact:
+            wellnames, volumes, quantities, wells_data = [], [], [], {}
+            components = {}
+            for well in self.iter_wells(skip_untouched=True):
+                if well._data:
+                    wells_data[well.name] = _replace_nans(dict(well._data),
+                                                          replace_nans_by)
+                content = well.content
+                if (content.volume == 0) and not content._quantities:
+                    continue
+                wellnames.append(well.name)
+                volumes.append(content.volume)
+                well_quantities = []
+                for component, quantity in (content._quantities or {}).items():
+                    if component not in components:
+                        components[component] = len(components)
+                    well_quantities += [components[component], quantity]
+                quantities.append(well_quantities)
+            yield '"compact":true,"wells":%s,"volumes":%s,' % (
+                encode(wellnames),
+                encode(_replace_nans(volumes, replace_nans_by)))
+            yield '"components":%s,"quantities":%s,"wells_data":%s}' % (
+                encode(list(components)),
+                encode(_replace_nans(quantities, replace_nans_by)),
+                encode(wells_data))
+            return
+        yield '"wells":{'
+        for i, well in enumerate(self.iter_wells()):
+            content = well.content
+            volume = content.volume
+            if volume != volume:
+                volume = replace_nans_by
+            quantities = {
+                component: (replace_nans_by if quantity != quantity
+                            else quantity)
+                for component, quantity in (content._quantities or {}).items()
+            }
+            well_dict = {
+                "name": well.name,
+                "content": {"volume": volume, "quantities": quantities},
+                "row": well.row,
+                "column": well.column
+            }
+            for field, value in (well._data or {}).items():
+                if field not in well_dict:
+                    well_dict[field] = _replace_nans(value, replace_nans_by)
+            yield "%s%s:%s" % ("," if i else "", encode(well.name),
+                               encode(well_dict))
+        yield "}}"
+
+    def to_json(self, target=None, compact=False, replace_nans_by=None):
+        """Serialize the plate (wells data and content included) as JSON.
+
+        The JSON is produced well by well, and NaN values (which are not
+        valid JSON) are replaced during the serialization. Numpy values are
+        converted to numbers or lists, other non-JSON values to strings. The
+        sources of the wells are not serialized.
+
+        Parameters
+        ----------
+
+        target
+          Either None (the JSON string is returned), a file path, or a
+          file-like object to which the JSON is written piece by piece.
+
+        compact
+          If False, the JSON has the same structure as ``to_dict()``, i.e.
+          ``{"data": ..., "wells": {"A1": {"name": ..., "content": ...}}}``
+          (with additional fields giving the plate's name, class and
+          dimensions). If True, only the non-empty wells' contents are
+          written, as arrays ``wells``, ``volumes``, ``components``, and
+          ``quantities``, where the quantities of each well are a flat list
+          ``[component_index, quantity, component_index, quantity...]``,
+          and ``wells_data`` gives the data of the wells having data.
+
+        replace_nans_by
+          Value written in place of NaNs (default None, i.e. JSON null).
+        """
+        chunks = self.iter_json_chunks(compact=compact,
+                                       replace_nans_by=replace_nans_by)
+        if target is None:
+            return "".join(chunks)
+        if isinstance(target, str):
+            with open(target, "w") as f:
+                f.writelines(chunks)
+        else:
+            target.writelines(chunks)
+
+    def freeze(self):
+        """Return a read-only, hashable snapshot of the plate's wells and
+        data, as a FrozenPlate (see ``plateo.FrozenPlate``)."""
+        return FrozenPlate.from_plate(self)
+
+    @classmethod
+    def from_dict(cls, dct):
+        """Return a plate from a dict of the JSON written by ``to_json``.
+
+        The dicts returned by ``to_dict`` are also accepted, in which case
+        the plate is of the class this method is called on (e.g.
+        ``Plate96.from_dict(dct)``) or, when called from ``Plate``, of the
+        smallest standard format containing all the wells.
+
+        For the JSON written by ``to_json``, the plate is of the class this
+        method is called on if it has the same name and dimensions as the
+        class written, else of the plate class found with this name (see
+        ``plateo.containers.get_plate_class_by_name``).
+        """
+        from .containers import get_plate_class, get_plate_class_by_name
+
+        if "class" in dct:
+            dimensions = (dct["num_rows"], dct["num_columns"])
+            if ((cls.__name__ == dct["class"]) and
+                    (getattr(cls, "num_rows", None),
+                     getattr(cls, "num_columns", None)) == dimensions):
+                plate_class = cls
+            else:
+                plate_class = get_plate_class_by_name(dct["class"],
+                                                      *dimensions)
+        elif hasattr(cls, "num_rows"):
+            plate_class = cls
+        else:
+            plate_class = get_plate_class(
+                infer_plate_size_from_wellnames(dct["wells"].keys()))
+        if dct.get("compact", False):
+            wells_data = dct["wells_data"]
+            components = dct["components"]
+            contents = [
+                (name, volume, {
+                    components[index]: quantity
+                    for index, quantity in zip(q[::2], q[1::2])
+                })
+                for name, volume, q in zip(dct["wells"], dct["volumes"],
+                                           dct["quantities"])
+            ]
+        else:
+            wells_data, contents = {}, []
+            for name, well_dict in dct["wells"].items():
+                data = {
+                    field: value
+                    for field, value in well_dict.items()
+                    if field not in WELL_DICT_KEYS
+                }
+                if data:
+                    wells_data[name] = data
+                content = well_dict["content"]
+                contents.append(
+                    (name, content["volume"], content["quantities"]))
+        plate = plate_class(name=dct.get("name", None), wells_data=wells_data,
+                            data=dct.get("data", None))
+        wells = plate.wells
+        for name, volume, quantities in contents:
+            content = wells[name].content
+            content.volume = 0 if volume is None else volume
+            if quantities:
+                content.quantities = content.container_class(quantities)
+        return plate
+
+    @classmethod
+    def from_json(cls, source):
+        """Return a plate from the JSON written by ``to_json``.
+
+        The ``source`` can be a JSON string, a file path, or a file-like
+        object. See ``from_dict`` for details.
+        """
+        if hasattr(source, "read"):
+            dct = json.load(source)
+        elif source.lstrip().startswith("{"):
+            dct = json.loads(source)
+        else:
+            with open(source, "r") as f:
+                dct = json.load(f)
+        return cls.from_dict(dct)
+
     def __repr__(self):
         return "%s(%s)" % (self.__class__.__name__, self.name)
@@ -0,0 +1,363 @@
+"""This module implements a SQLite database of plates and picklists.
+
+The store keeps the states of many plates (volumes, quantities and data of
+their wells) and picklists in a single file, with indexes to find e.g. all
+wells which ever contained a given component without loading every plate.
+"""
+
+import json
+import sqlite3
+
+from .PickList import PickList, Transfer
+from .containers import get_plate_class_by_name
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS plates (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    barcode TEXT,
+    class TEXT,
+    num_rows INTEGER,
+    num_columns INTEGER,
+    data TEXT
+);
+CREATE TABLE IF NOT EXISTS wells (
+    plate_id INTEGER,
+    name TEXT,
+    volume REAL,
+    data TEXT,
+    PRIMARY KEY (plate_id, name)
+);
+CREATE TABLE IF NOT EXISTS components (
+    plate_id INTEGER,
+    well_name TEXT,
+    component TEXT,
+    quantity REAL
+);
+CREATE TABLE IF NOT EXISTS well_data (
+    plate_id INTEGER,
+    well_name TEXT,
+    field TEXT,
+    value
+);
+CREATE TABLE IF NOT EXISTS picklists (
+    id INTEGER PRIMARY KEY,
+    name TEXT,
+    data TEXT
+);
+CREATE TABLE IF NOT EXISTS transfers (
+    picklist_id INTEGER,
+    position INTEGER,
+    source_plate_id INTEGER,
+    source_well TEXT,
+    destination_plate_id INTEGER,
+    destination_well TEXT,
+    volume REAL,
+    data TEXT
+);
+CREATE INDEX IF NOT EXISTS plates_barcode ON plates (barcode);
+CREATE INDEX IF NOT EXISTS plates_name ON plates (name);
+CREATE INDEX IF NOT EXISTS wells_name ON wells (name);
+CREATE INDEX IF NOT EXISTS components_plate ON components (plate_id);
+CREATE INDEX IF NOT EXISTS components_component
+    ON components (component, plate_id);
+CREATE INDEX IF NOT EXISTS well_data_plate ON well_data (plate_id);
+CREATE INDEX IF NOT EXISTS well_data_field ON well_data (field, value);
+CREATE INDEX IF NOT EXISTS picklists_name ON picklists (name);
+CREATE INDEX IF NOT EXISTS transfers_picklist
+    ON transfers (picklist_id, position);
+CREATE INDEX IF NOT EXISTS transfers_source
+    ON transfers (source_plate_id, source_well);
+CREATE INDEX IF NOT EXISTS transfers_destination
+    ON transfers (destination_plate_id, destination_well);
+"""
+
+
+def _to_json(data):
+    return json.dumps(data, default=str)
+
+
+def _sql_scalar(value):
+    """Return the value as a SQLite scalar, or None if it is not a scalar."""
+    if hasattr(value, "item") and not hasattr(value, "__len__"):
+        value = value.item()  # numpy scalars
+    if isinstance(value, (bool, int, float, str)):
+        return value
+    return None
+
+
+class PlateStore:
+    """A SQLite database of plates and picklists.
+
+    Examples
+    --------
+
+    >>> store = PlateStore("plates.db")
+    >>> store.add_plates([plate_1, plate_2])
+    >>> store.add_picklist(picklist, name="Run 12")
+    >>> for plate_id, well_name in store.find_wells(component="part_X"):
+    >>>     print (plate_id, well_name)
+    >>> for plate in store.iter_plates(component="part_X"):
+    >>>     print (plate.name)
+
+    Parameters
+    ----------
+
+    path
+      Path to the database file (created if it doesn't exist), or
+      ":memory:" for a temporary in-memory database.
+
+    Notes
+    -----
+
+    Only the wells with content or data are stored, and the sources of the
+    wells are not stored. Data values which are not JSON-serializable are
+    stored as strings. Only the data fields with a number or string value can
+    be used in queries.
+    """
+
+    def __init__(self, path=":memory:"):
+        self.path = path
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(SCHEMA)
+        self.plate_ids = {}
+
+    def close(self):
+        """Close the connection to the database."""
+        self.connection.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def add_plates(self, plates, barcodes=None):
+        """Store the current state of plates, return the list of their ids.
+
+        All plates are inserted in a single transaction. The ``barcodes`` are
+        a list of barcodes for the plates (by default, the ``barcode`` field
+        of the plates' data, if any).
+        """
+        plates = list(plates)
+        if barcodes is None:
+            barcodes = [plate.data.get("barcode", None) for plate in plates]
+        plate_ids = []
+        wells_rows, components_rows, data_rows = [], [], []
+        with self.connection:
+            for plate, barcode in zip(plates, barcodes):
+                cursor = self.connection.execute(
+                    "INSERT INTO plates (name, barcode, class, num_rows, "
+                    "num_columns, data) VALUES (?, ?, ?, ?, ?, ?)",
+                    (plate.name, barcode, plate.__class__.__name__,
+                     plate.num_rows, plate.num_columns, _to_json(plate.data)))
+                plate_id = cursor.lastrowid
+                self.plate_ids[plate] = plate_id
+                plate_ids.append(plate_id)
+                for well in plate.iter_wells(skip_untouched=True):
+                    quantities = well.content._quantities or {}
+                    well_data = well._data or {}
+                    if (well.content.volume == 0 and not quantities and
+                            not well_data):
+                        continue
+                    wells_rows.append((plate_id, well.name,
+                                       well.content.volume,
+                                       _to_json(well_data)))
+                    for component, quantity in quantities.items():
+                        components_rows.append(
+                            (plate_id, well.name, component, quantity))
+                    for field, value in well_data.items():
+                        value = _sql_scalar(value)
+                        if value is not None:
+                            data_rows.append(
+                                (plate_id, well.name, field, value))
+            self.connection.executemany(
+                "INSERT INTO wells VALUES (?, ?, ?, ?)", wells_rows)
+            self.connection.executemany(
+                "INSERT INTO components VALUES (?, ?, ?, ?)", components_rows)
+            self.connection.executemany(
+                "INSERT INTO well_data VALUES (?, ?, ?, ?)", data_rows)
+        return plate_ids
+
+    def add_plate(self, plate, barcode=None):
+        """Store the current state of a plate, return the plate's id."""
+        if barcode is None:
+            barcode = plate.data.get("barcode", None)
+        return self.add_plates([plate], barcodes=[barcode])[0]
+
+    def add_picklist(self, picklist, name=None):
+        """Store a picklist, return its id.
+
+        The plates of the picklist which have not been added to the store (by
+        this PlateStore object) are added first, in their current state.
+        """
+        new_plates = [
+            plate for plate in picklist.list_plates()
+            if plate not in self.plate_ids
+        ]
+        self.add_plates(new_plates)
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO picklists (name, data) VALUES (?, ?)",
+                (name, _to_json(picklist.data)))
+            picklist_id = cursor.lastrowid
+            self.connection.executemany(
+                "INSERT INTO transfers VALUES (?, ?, ?, ?, ?, ?, ?, ?)", [
+                    (picklist_id, i,
+                     self.plate_ids[transfer.source_well.plate],
+                     transfer.source_well.name,
+                     self.plate_ids[transfer.destination_well.plate],
+                     transfer.destination_well.name,
+                     transfer.volume,
+                     None if transfer.data is None
+                     else _to_json(transfer.data))
+                    for i, transfer in enumerate(picklist.transfers_list)
+                ])
+        return picklist_id
+
+    def get_plate(self, plate_id):
+        """Return the plate with the given id, as it was when stored."""
+        row = self.connection.execute(
+            "SELECT name, class, num_rows, num_columns, data FROM plates "
+            "WHERE id = ?", (plate_id,)).fetchone()
+        if row is None:
+            raise KeyError("No plate with id %s in the store." % plate_id)
+        name, class_name, num_rows, num_columns, data = row
+        plate_class = get_plate_class_by_name(class_name, num_rows,
+                                              num_columns)
+        plate = plate_class(name=name, data=json.loads(data))
+        for well_name, volume, well_data in self.connection.execute(
+                "SELECT name, volume, data FROM wells WHERE plate_id = ?",
+                (plate_id,)):
+            well = plate.wells[well_name]
+            well.content.volume = volume
+            well.data.update(json.loads(well_data))
+        quantities = {}
+        for well_name, component, quantity in self.connection.execute(
+                "SELECT well_name, component, quantity FROM components "
+                "WHERE plate_id = ?", (plate_id,)):
+            quantities.setdefault(well_name, {})[component] = quantity
+        for well_name, well_quantities in quantities.items():
+            content = plate.wells[well_name].content
+            content.quantities = content.container_class(well_quantities)
+        return plate
+
+    def find_plate_ids(self, name=None, barcode=None, component=None,
+                       data_field=None, data_value=None):
+        """Return the ids of the plates matching all the criteria given.
+
+        See ``find_wells`` for the ``component``, ``data_field`` and
+        ``data_value`` criteria.
+        """
+        query, parameters = ["SELECT id FROM plates WHERE 1"], []
+        for column, value in [("name", name), ("barcode", barcode)]:
+            if value is not None:
+                query.append("AND %s = ?" % column)
+                parameters.append(value)
+        if (component is not None) or (data_field is not None):
+            well_query, well_parameters = self._wells_query(
+                component, data_field, data_value)
+            query.append("AND id IN (SELECT plate_id FROM (%s))" % well_query)
+            parameters += well_parameters
+        query.append("ORDER BY id")
+        return [
+            plate_id for (plate_id,)
+            in self.connection.execute(" ".join(query), parameters)
+        ]
+
+    def iter_plates(self, name=None, barcode=None, component=None,
+                    data_field=None, data_value=None):
+        """Iterate over the plates matching all the criteria given.
+
+        The plates are loaded one at a time, as the iteration goes. See
+        ``find_plate_ids`` for the criteria.
+        """
+        plate_ids = self.find_plate_ids(
+            name=name, barcode=barcode, component=component,
+            data_field=data_field, data_value=data_value)
+        for plate_id in plate_ids:
+            yield self.get_plate(plate_id)
+
+    def _wells_query(self, component=None, data_field=None, data_value=None):
+        queries, parameters = [], []
+        if component is not None:
+            queries.append("SELECT plate_id, well_name FROM components "
+                           "WHERE component = ?")
+            parameters.append(component)
+        if data_field is not None:
+            query = "SELECT plate_id, well_name FROM well_data WHERE field = ?"
+            parameters.append(data_field)
+            if data_value is not None:
+                query += " AND value = ?"
+                parameters.append(_sql_scalar(data_value))
+            queries.append(query)
+        if len(queries) == 0:
+            queries.append("SELECT plate_id, name AS well_name FROM wells")
+        return " INTERSECT ".join(queries), parameters
+
+    def find_wells(self, component=None, data_field=None, data_value=None):
+        """Return a list of (plate_id, well_name) for all stored wells
+        matching all the criteria given, without loading the plates.
+
+        Parameters
+        ----------
+
+        component
+          Name of a component that the wells must contain.
+
+        data_field
+          Name of a data field that the wells must have.
+
+        data_value
+          Value that the wells' ``data_field`` must have.
+        """
+        query, parameters = self._wells_query(component, data_field,
+                                              data_value)
+        return self.connection.execute(
+            query + " ORDER BY plate_id, well_name", parameters).fetchall()
+
+    def get_picklist(self, picklist_id, plates_dict=None):
+        """Return the picklist with the given id.
+
+        The picklist's transfers are between the stored plates, each loaded
+        once. ``plates_dict`` can be a dict ``{plate_id: plate}`` of plates
+        to use instead of loading them from the store.
+        """
+        row = self.connection.execute(
+            "SELECT data FROM picklists WHERE id = ?",
+            (picklist_id,)).fetchone()
+        if row is None:
+            raise KeyError("No picklist with id %s in the store."
+                           % picklist_id)
+        plates = {} if plates_dict is None else dict(plates_dict)
+        transfers = []
+        for (source_plate_id, source_well, destination_plate_id,
+             destination_well, volume, data) in self.connection.execute(
+                "SELECT source_plate_id, source_well, destination_plate_id, "
+                "destination_well, volume, data FROM transfers "
+                "WHERE picklist_id = ? ORDER BY position", (picklist_id,)):
+            for plate_id in (source_plate_id, destination_plate_id):
+                if plate_id not in plates:
+                    plates[plate_id] = self.get_plate(plate_id)
+            transfers.append(Transfer(
+                source_well=plates[source_plate_id].wells[source_well],
+                destination_well=plates[destination_plate_id].wells[
+                    destination_well],
+                volume=volume,
+                data=None if data is None else json.loads(data)
+            ))
+        return PickList(transfers, data=json.loads(row[0]))
+
+    def iter_picklists(self, name=None):
+        """Iterate over the stored picklists (with the given name, if any),
+        loaded one at a time."""
+        query, parameters = "SELECT id FROM picklists", []
+        if name is not None:
+            query += " WHERE name = ?"
+            parameters.append(name)
+        picklist_ids = [
+            picklist_id for (picklist_id,)
+            in self.connection.execute(query + " ORDER BY id", parameters)
+        ]
+        for picklist_id in picklist_ids:
+            yield self.get_picklist(picklist_id)
@@ -0,0 +1,189 @@
+"""This module implements well quantities stored as sparse vectors.
+
+Component names are interned in a registry (name -> integer id), and the
+quantities of a well are stored as two arrays (sorted component ids, and
+quantities), so that mixing wells with many components is done with vector
+operations. See the ``quantities_class`` attribute of Plate.
+"""
+
+from collections.abc import MutableMapping
+
+import numpy as np
+
+
+class ComponentRegistry:
+    """Registry attributing a unique integer id to each component name."""
+
+    def __init__(self):
+        self.names = []
+        self.ids = {}
+
+    def get_id(self, name):
+        """Return the id of the component, registering it if it is new."""
+        component_id = self.ids.get(name, None)
+        if component_id is None:
+            component_id = self.ids[name] = len(self.names)
+            self.names.append(name)
+        return component_id
+
+    def get_ids(self, names):
+        """Return an array of the ids of the components."""
+        return np.array([self.get_id(name) for name in names], dtype=np.int64)
+
+    def __len__(self):
+        return len(self.names)
+
+
+component_registry = ComponentRegistry()
+
+
+class SparseQuantities(MutableMapping):
+    """Dict-like {component: quantity} stored as sparse vectors.
+
+    The object behaves like a dict of component names and quantities, but
+    stores an array ``ids`` of sorted component ids (see
+    ``component_registry``) and an array ``amounts`` of quantities. The
+    component names are only looked up when iterating over the keys.
+    Methods ``add``, ``subtract`` and ``scaled`` work on whole vectors.
+
+    Parameters
+    ----------
+
+    quantities
+      A dict (or other mapping) {component: quantity}.
+    """
+
+    __slots__ = ("ids", "amounts")
+    registry = component_registry
+
+    def __init__(self, quantities=None):
+        if isinstance(quantities, SparseQuantities):
+            self.ids = quantities.ids.copy()
+            self.amounts = quantities.amounts.copy()
+            return
+        items = list(dict(quantities or {}).items())
+        ids = self.registry.get_ids([name for name, _ in items])
+        values = np.array([value for _, value in items], dtype=float)
+        order = np.argsort(ids, kind="stable")
+        self.ids, self.amounts = ids[order], values[order]
+
+    @classmethod
+    def from_arrays(cls, ids, amounts):
+        """Return an instance with the given (sorted) ids and amounts."""
+        quantities = cls.__new__(cls)
+        quantities.ids = ids
+        quantities.amounts = amounts
+        return quantities
+
+    def _index(self, component):
+        component_id = self.registry.ids.get(component, None)
+        if component_id is None:
+            return None
+        index = np.searchsorted(self.ids, component_id)
+        if (index < len(self.ids)) and (self.ids[index] == component_id):
+            return index
+        return None
+
+    def __getitem__(self, component):
+        index = self._index(component)
+        if index is None:
+            raise KeyError(component)
+        return self.amounts[index].item()
+
+    def __setitem__(self, component, quantity):
+        index = self._index(component)
+        if index is not None:
+            self.amounts[index] = quantity
+            return
+        component_id = self.registry.get_id(component)
+        index = np.searchsorted(self.ids, component_id)
+        self.ids = np.insert(self.ids, index, component_id)
+        self.amounts = np.insert(self.amounts, index, quantity)
+
+    def __delitem__(self, component):
+        index = self._index(component)
+        if index is None:
+            raise KeyError(component)
+        self.ids = np.delete(self.ids, index)
+        self.amounts = np.delete(self.amounts, index)
+
+    def __contains__(self, component):
+        return self._index(component) is not None
+
+    def __iter__(self):
+        names = self.registry.names
+        return (names[i] for i in self.ids.tolist())
+
+    def __len__(self):
+        return len(self.ids)
+
+    def items(self):
+        names = self.registry.names
+        return list(zip([names[i] for i in self.ids.tolist()],
+                        self.amounts.tolist()))
+
+    def values(self):
+        return self.amounts.tolist()
+
+    def copy(self):
+        return SparseQuantities.from_arrays(self.ids.copy(),
+                                            self.amounts.copy())
+
+    def __copy__(self):
+        return self.copy()
+
+    def __deepcopy__(self, memo):
+        return self.copy()
+
+    def __reduce__(self):
+        # Component ids are only valid in this process, pickle the names.
+        return (SparseQuantities, (dict(self.items()),))
+
+    def __repr__(self):
+        return "SparseQuantities(%s)" % dict(self.items())
+
+    def scaled(self, factor):
+        """Return new quantities equal to these quantities times factor."""
+        return SparseQuantities.from_arrays(self.ids.copy(),
+                                            self.amounts * factor)
+
+    def _aligned(self, other):
+        """Return (ids, self_values, other_values, other_mask) on the union of
+        the ids of both vectors."""
+        if np.array_equal(self.ids, other.ids):
+            return self.ids, self.amounts, other.amounts, None
+        ids = np.union1d(self.ids, other.ids)
+        self_values = np.zeros(len(ids))
+        self_values[np.searchsorted(ids, self.ids)] = self.amounts
+        other_values = np.zeros(len(ids))
+        other_indices = np.searchsorted(ids, other.ids)
+        other_values[other_indices] = other.amounts
+        other_mask = np.zeros(len(ids), dtype=bool)
+        other_mask[other_indices] = True
+        return ids, self_values, other_values, other_mask
+
+    def add(self, other, factor=1):
+        """Add ``factor`` times the other quantities (a SparseQuantities or a
+        dict) to these quantities, in place."""
+        if not isinstance(other, SparseQuantities):
+            other = SparseQuantities(other)
+        ids, self_values, other_values, _ = self._aligned(other)
+        self.ids = ids
+        self.amounts = self_values + factor * other_values
+
+    def subtract(self, other):
+        """Subtract the other quantities (a SparseQuantities or a dict) from
+        these quantities, in place.
+
+        Components whose quantity becomes exactly zero by subtraction of the
+        same quantity are removed.
+        """
+        if not isinstance(other, SparseQuantities):
+            other = SparseQuantities(other)
+        ids, self_values, other_values, other_mask = self._aligned(other)
+        removed = self_values == other_values
+        if other_mask is not None:
+            removed &= other_mask
+        keep = ~removed
+        self.ids = ids[keep]
+        self.amounts = (self_values - other_values)[keep]
@@ -0,0 +1,150 @@
+"""This module implements the step-by-step execution of picklists, with undo
+and fast seek to any transfer."""
+
+
+def _copy_quantities(quantities):
+    return None if quantities is None else type(quantities)(quantities)
+
+
+class TransferJournal:
+    """Journaled execution of a picklist, which can be undone.
+
+    The transfers of the picklist are executed (in place, on the picklist's
+    plates) one at a time. Before each transfer, the content of the two
+    wells involved is recorded, so that the transfer can be undone. Every
+    ``checkpoint_interval`` transfers, the contents of all the wells of the
+    picklist are recorded, so that any transfer index can be reached by
+    replaying at most ``checkpoint_interval`` transfers.
+
+    Parameters
+    ----------
+
+    picklist
+      The picklist to execute. Position 0 corresponds to the state of the
+      plates when the journal is created.
+
+    checkpoint_interval
+      Number of transfers between two checkpoints.
+
+    Examples
+    --------
+
+    >>> journal = TransferJournal(picklist)
+    >>> journal.seek(10) # Execute the first 10 transfers.
+    >>> journal.undo() # Back to the state after 9 transfers.
+    >>> journal.seek(0) # Back to the initial state.
+    >>> journal.run() # Execute all transfers.
+
+    Notes
+    -----
+
+    The journal assumes that the plates are only modified through the
+    journal. If a transfer fails (e.g. with a TransferError), the error is
+    raised and the journal stays at the position of the last transfer
+    executed.
+    """
+
+    def __init__(self, picklist, checkpoint_interval=100):
+        self.picklist = picklist
+        self.transfers = list(picklist.transfers_list)
+        self.checkpoint_interval = checkpoint_interval
+        wells = {}
+        for transfer in self.transfers:
+            wells[transfer.source_well] = True
+            wells[transfer.destination_well] = True
+        self.wells = list(wells)
+        self.contents = list({id(w.content): w.content
+                              for w in self.wells}.values())
+        self.position = 0
+        self.deltas = {}
+        self.checkpoints = {0: self._take_checkpoint()}
+
+    def __len__(self):
+        return len(self.transfers)
+
+    @property
+    def current_transfer(self):
+        """Next transfer to be executed (None if all were executed)."""
+        if self.position < len(self.transfers):
+            return self.transfers[self.position]
+        return None
+
+    def _take_checkpoint(self):
+        return (
+            [(content.volume, _copy_quantities(content._quantities))
+             for content in self.contents],
+            [None if well._sources is None else list(well._sources)
+             for well in self.wells]
+        )
+
+    def _restore_checkpoint(self, position):
+        contents_states, sources = self.checkpoints[position]
+        for content, (volume, quantities) in zip(self.contents,
+                                                 contents_states):
+            content.volume = volume
+            content._quantities = _copy_quantities(quantities)
+        for well, well_sources in zip(self.wells, sources):
+            well.sources = well_sources
+        self.position = position
+
+    def step(self):
+        """Execute the next transfer."""
+        if self.position >= len(self.transfers):
+            raise IndexError("All the transfers have been executed.")
+        transfer = self.transfers[self.position]
+        source, destination = transfer.source_well, transfer.destination_well
+        contents = [source.content]
+        if destination.content is not source.content:
+            contents.append(destination.content)
+        delta = (
+            [(content, content.volume, _copy_quantities(content._quantities))
+             for content in contents],
+            len(destination._sources or ())
+        )
+        source.transfer_to_other_well(destination_well=destination,
+                                      transfer_volume=transfer.volume)
+        self.deltas[self.position] = delta
+        self.position += 1
+        if ((self.position % self.checkpoint_interval == 0) and
+                (self.position not in self.checkpoints)):
+            self.checkpoints[self.position] = self._take_checkpoint()
+
+    def undo(self):
+        """Undo the last transfer executed."""
+        if self.position == 0:
+            raise IndexError("No transfer to undo.")
+        delta = self.deltas.pop(self.position - 1, None)
+        if delta is None:
+            self.seek(self.position - 1)
+            return
+        contents_states, number_of_sources = delta
+        for content, volume, quantities in contents_states:
+            content.volume = volume
+            content._quantities = quantities
+        sources = self.transfers[self.position - 1].destination_well._sources
+        if sources is not None:
+            del sources[number_of_sources:]
+        self.position -= 1
+
+    def seek(self, position):
+        """Bring the plates to their state after the first ``position``
+        transfers, using undos or the nearest checkpoint."""
+        if not 0 <= position <= len(self.transfers):
+            raise IndexError("Position %d out of range." % position)
+        checkpoint = max(p for p in self.checkpoints if p <= position)
+        if position < self.position:
+            can_undo = all(i in self.deltas
+                           for i in range(position, self.position))
+            if (not can_undo) or (self.position - position >
+                                  position - checkpoint):
+                self._restore_checkpoint(checkpoint)
+        elif checkpoint > self.position:
+            self._restore_checkpoint(checkpoint)
+        while self.position > position:
+            self.undo()
+        while self.position < position:
+            self.step()
+
+    def run(self):
+        """Execute all the remaining transfers."""
+        self.seek(len(self.transfers))
@@ -1,8 +1,148 @@
 from box import Box
 
+from .SparseQuantities import SparseQuantities
+
 class TransferError(ValueError):
     pass
 
+
+class AttrDict(dict):
+    """Dict whose items can also be accessed as attributes (``d.key``).
+
+    Unlike Box, the values (e.g. sub-dicts) are stored as they are, with no
+    conversion, so that setting and getting items is as fast as with a dict.
+    """
+
+    __slots__ = ()
+
+    def __getattr__(self, key):
+        try:
+            return self[key]
+        except KeyError:
+            raise AttributeError(key)
+
+    def __setattr__(self, key, value):
+        self[key] = value
+
+    def __delattr__(self, key):
+        try:
+            del self[key]
+        except KeyError:
+            raise AttributeError(key)
+
+
+_DEFAULT_CONTAINER_CLASS = [Box]
+
+
+def set_default_container_class(container_class):
+    """Set the class of the dicts of plates and wells data, well quantities,
+    and plate wells, for the plates created afterwards.
+
+    ``container_class`` can be ``Box`` (the default, with attribute access
+    and recursive conversion of sub-dicts), ``AttrDict`` (attribute access,
+    no conversion, faster), or ``dict`` (fastest, no attribute access). It
+    can also be set for a given plate class with the class attribute
+    ``container_class``.
+    """
+    _DEFAULT_CONTAINER_CLASS[0] = container_class
+
+
+def get_default_container_class():
+    """Return the class set with ``set_default_container_class``."""
+    return _DEFAULT_CONTAINER_CLASS[0]
+
+
+def check_transfer(source_well, destination_well, transfer_volume):
+    """Raise a TransferError if the transfer is impossible, else return the
+    fraction of the source well's volume which is transferred.
+
+    The wells can be Well or FrozenWell objects.
+    """
+    if source_well.is_empty:
+        raise TransferError(
+            "Transfer %s => %s impossible: %s is empty" % (
+             source_well, destination_well, source_well))
+    factor = float(transfer_volume) / source_well.volume
+    if factor > 1:
+        raise TransferError(
+            ("Substraction of %.2e L from %s impossible."
+             " Current volume: %.2e L")
+            % (transfer_volume, source_well, source_well.volume)
+        )
+    final_destination_volume = destination_well.volume + transfer_volume
+    if ((destination_well.capacity is not None) and
+       (final_destination_volume > destination_well.capacity)):
+        raise TransferError(
+            "Transfer of %.2e L from %s to %s brings volume over capacity."
+            % (transfer_volume, source_well, destination_well)
+        )
+    return factor
+
+
+def add_quantities(quantities, components_quantities):
+    """Add the components' quantities to a dict of quantities, in place."""
+    for component, quantity in components_quantities.items():
+        quantities[component] = quantities.get(component, 0) + quantity
+
+
+def subtract_quantities(quantities, components_quantities):
+    """Subtract the components' quantities from a dict of quantities, in
+    place. Components whose quantity is entirely subtracted are removed."""
+    for component, quantity in components_quantities.items():
+        current_quantity = quantities[component]
+        if current_quantity == quantity:
+            del quantities[component]
+        else:
+            quantities[component] = current_quantity - quantity
+
+
+def _invalidating(method):
+    """Wrap a list method so that it drops the ids set of a SourcesList."""
+    def wrapper(self, *args):
+        self._ids = None
+        return method(self, *args)
+    wrapper.__name__ = method.__name__
+    return wrapper
+
+
+class SourcesList(list):
+    """List of the sources of a well, with a set of the ids of the sources
+    for fast membership tests (see ``Well.add_source``).
+
+    The set is created when first needed, and dropped by any method which
+    modifies the list, and in copies of the list.
+    """
+
+    __slots__ = ("_ids",)
+
+    def __init__(self, *args):
+        list.__init__(self, *args)
+        self._ids = None
+
+    def __reduce_ex__(self, protocol):
+        return (SourcesList, (list(self),))
+
+    def add(self, source):
+        """Append the source if it is not already in the list."""
+        ids = self._ids
+        if ids is None:
+            ids = self._ids = set(id(s) for s in self)
+        if id(source) not in ids:
+            list.append(self, source)
+            ids.add(id(source))
+
+    __setitem__ = _invalidating(list.__setitem__)
+    __delitem__ = _invalidating(list.__delitem__)
+    __iadd__ = _invalidating(list.__iadd__)
+    __imul__ = _invalidating(list.__imul__)
+    append = _invalidating(list.append)
+    extend = _invalidating(list.extend)
+    insert = _invalidating(list.insert)
+    pop = _invalidating(list.pop)
+    remove = _invalidating(list.remove)
+    clear = _invalidating(list.clear)
+
+
 class WellContent:
     """Class to represent the volume and quantities of a well.
 
@@ -10,37 +150,52 @@ class WellContent:
     to have several wells share the same content, e.g. in throughs.
     """
 
-    def __init__(self, quantities=None, volume=0):
-        if quantities is None:
-            quantities = {}
+    __slots__ = ("volume", "_quantities", "container_class")
+
+    def __init__(self, quantities=None, volume=0, container_class=None):
+        if container_class is None:
+            container_class = get_default_container_class()
+        self.container_class = container_class
         self.volume = volume
-        self.quantities = Box(quantities)
+        self._quantities = container_class(quantities) if quantities else None
+
+    @property
+    def quantities(self):
+        """Dict {component: quantity}, only created when first used."""
+        if self._quantities is None:
+            self._quantities = self.container_class()
+        return self._quantities
+
+    @quantities.setter
+    def quantities(self, quantities):
+        self._quantities = quantities
 
     def concentration(self, component=None, default=0):
-        if self.quantities == {}:
+        quantities = self._quantities
+        if not quantities:
             return default
         if self.volume == 0:
             return default
         if component is None:
-            component = list(self.quantities.keys())[0]
-        if component not in self.quantities:
+            component = list(quantities.keys())[0]
+        if component not in quantities:
             return default
-        return 1.0 * self.quantities[component] / self.volume
+        return 1.0 * quantities[component] / self.volume
 
     def to_dict(self):
         """Return a dict {volume: 0.0001, quantities: {...:...}}"""
         return {
             "volume": self.volume,
-            "quantities": self.quantities
+            "quantities": self._quantities or {}
         }
 
     def make_empty(self):
         self.volume = 0
-        self.quantities = Box({})
+        self._quantities = None
 
     def components_as_string(self, separator=" "):
         """Return a string representation of what's in the well mix"""
-        return separator.join(sorted(self.quantities.keys()))
+        return separator.join(sorted((self._quantities or {}).keys()))
 
 class Well:
     """Generic class for a well.
@@ -65,64 +220,108 @@ class Well:
 
 
     """
+    __slots__ = ("plate", "row", "column", "name", "content", "_data",
+                 "_sources")
     capacity = None
 
     def __init__(self, plate, row, column, name, data=None):
+        container_class = self._container_class(plate)
+        quantities_class = getattr(plate, "quantities_class", None)
         self.plate = plate
         self.row = row
         self.column = column
         self.name = name
-        self.data = Box({} if data is None else data)
-        self.sources = []
-        self.content = WellContent()
+        self._data = container_class(data) if data else None
+        self._sources = None
+        self.content = WellContent(
+            container_class=quantities_class or container_class)
+
+    @staticmethod
+    def _container_class(plate):
+        container_class = getattr(plate, "container_class", None)
+        if container_class is None:
+            container_class = get_default_container_class()
+        return container_class
+
+    @property
+    def data(self):
+        """Dict of the well's data, only created when first used."""
+        if self._data is None:
+            self._data = self._container_class(self.plate)()
+        return self._data
+
+    @data.setter
+    def data(self, data):
+        self._data = data
+
+    @property
+    def sources(self):
+        """List of the wells (or other sources) which the well received
+        liquid from (a SourcesList), only created when first used.
+
+        Setting the sources with a list stores a SourcesList copy of it.
+        """
+        if self._sources is None:
+            self._sources = SourcesList()
+        return self._sources
+
+    @sources.setter
+    def sources(self, sources):
+        self._sources = None if sources is None else SourcesList(sources)
+
+    def add_source(self, source):
+        """Add a well (or other source) to the well's sources, if it is not
+        already one of them.
+
+        The ids of the sources are kept in a set, so that this check takes
+        a constant time. The set is rebuilt if the list of sources was
+        modified directly (e.g. with ``well.sources.append(source)``).
+        """
+        self.sources.add(source)
 
     @property
     def volume(self):
         return self.content.volume
 
     def iterate_sources_tree(self):
-        for source in self.sources:
-            if isinstance(source, Well):
-                for parent in source.iterate_sources_tree():
-                    yield parent
-            else:
-                yield source
-        yield self
+        """Iterate over all the ancestors of the well, then the well itself.
 
-    def transfer_to_other_well(self, destination_well, transfer_volume):
-        if self.is_empty:
-            raise TransferError(
-                "Transfer %s => %s impossible: %s is empty" % (
-                 self, destination_well, self))
-        factor = float(transfer_volume) / self.volume
+        Each ancestor is returned once, after its own sources.
+        """
+        visited = set()
+        stack = [(self, False)]
+        while stack:
+            node, sources_done = stack.pop()
+            if sources_done:
+                yield node
+            elif id(node) not in visited:
+                visited.add(id(node))
+                if isinstance(node, Well):
+                    stack.append((node, True))
+                    stack.extend((source, False) for source in
+                                 reversed(node._sources or ()))
+                else:
+                    yield node
 
+    def transfer_to_other_well(self, destination_well, transfer_volume):
         #  pre-check in both source and destination wells that transfers
         #  are valid
-        if factor > 1:
-            raise TransferError(
-                ("Substraction of %.2e L from %s impossible."
-                 " Current volume: %.2e L")
-                % (transfer_volume, self, self.volume)
-            )
-        final_destination_volume = destination_well.volume + transfer_volume
-        if ((destination_well.capacity is not None) and
-           (final_destination_volume > destination_well.capacity)):
-            raise TransferError(
-                "Transfer of %.2e L from %s to %s brings volume over capacity."
-                % (transfer_volume, self, destination_well)
-            )
+        factor = check_transfer(self, destination_well, transfer_volume)
 
         #  If you arrive here, it means that the transfer is valid, do it.
-        quantities_transfered = {
-            component: quantity * factor
-            for component, quantity in self.content.quantities.items()
-        }
+        source_quantities = self.content._quantities
+        if isinstance(source_quantities, SparseQuantities):
+            quantities_transfered = source_quantities.scaled(factor)
+        else:
+            quantities_transfered = {
+                component: quantity * factor
+                for component, quantity in (source_quantities or {}).items()
+            }
         destination_well.add_content(quantities_transfered,
                                      volume=transfer_volume)
         self.subtract_content(quantities_transfered,
                               volume=transfer_volume)
-        if self not in destination_well.sources:
-            destination_well.sources.append(self)
+        destination_well.add_source(self)
 
     def add_content(self, components_quantities, volume=None):
         if volume > 0:
@@ -133,10 +332,13 @@ class Well:
                     % (volume, self)
                 )
             self.content.volume = final_volume
-        for component, quantity in components_quantities.items():
-            if component not in self.content.quantities:
-                self.content.quantities[component] = 0
-            self.content.quantities[component] += quantity
+        if not components_quantities:
+            return
+        quantities = self.content.quantities
+        if isinstance(quantities, SparseQuantities):
+            quantities.add(components_quantities)
+            return
+        add_quantities(quantities, components_quantities)
 
 
     def subtract_content(self, components_quantities, volume=0):
@@ -148,15 +350,16 @@ class Well:
                     % (volume, self, self.volume)
                 )
             self.content.volume -= volume
-        for component, quantity in components_quantities.items():
-            if self.content.quantities[component] == quantity:
-                self.content.quantities.pop(component)
-            else:
-                self.content.quantities[component] -= quantity
+        if not components_quantities:
+            return
+        quantities = self.content.quantities
+        if isinstance(quantities, SparseQuantities):
+            quantities.subtract(components_quantities)
+            return
+        subtract_quantities(quantities, components_quantities)
     
     def empty_completely(self):
-        self.content.quantities = {}
-        self.content.volume = 0
+        self.content.make_empty()
 
     @property
     def coordinates(self):
@@ -175,10 +378,10 @@ class Well:
     def pretty_summary(self):
         data = "\n    ".join([""] + [
             ("%s: %s" % (key, value))
-            for key, value in self.data.items()])
+            for key, value in (self._data or {}).items()])
         content = "\n    ".join([""] + [
             ("%s: %s" % (key, value))
-            for key, value in self.content.quantities.items()])
+            for key, value in (self.content._quantities or {}).items()])
         return (
             "{self}\n"
             "  Volume: {self.volume}\n"
@@ -193,7 +396,7 @@ class Well:
                 ["content", self.content.to_dict()],
                 ["row", self.row],
                 ["column", self.column],
-            ] + list(self.data.items())
+            ] + list((self._data or {}).items())
         )
 
     def index_in_plate(self, direction='row'):
@@ -1,4 +1,9 @@
 from .Plate import Plate
 from .PickList import PickList, Transfer
 from .AssemblyPlan import AssemblyPlan
-from .Well import TransferError
+from .Well import TransferError, AttrDict, set_default_container_class
+from .PlateStore import PlateStore
+from .SparseQuantities import SparseQuantities, component_registry
+from .MixingGraph import MixingGraph
+from .TransferJournal import TransferJournal
+from .FrozenPlate import FrozenPlate, FrozenWell
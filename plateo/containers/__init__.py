@@ -1,5 +1,6 @@
 from .plates import (
     get_plate_class,
+    get_plate_class_by_name,
     Plate96, Plate384, Plate1536, Plate2x4,
     Plate4ti0960, Plate4ti0130, PlateLabcyteEchoLp0200Ldv,
     PlateLabcyteEchoP05525Pp, Trough8x1
@@ -8,6 +8,18 @@ def get_plate_class(num_wells):
         1536: Plate1536,
     }[num_wells]
 
+def get_plate_class_by_name(class_name, num_rows, num_columns):
+    """Return the container class with this name and dimensions, or a new
+    Plate class with these dimensions."""
+    plate_class = globals().get(class_name, None)
+    if (isinstance(plate_class, type) and issubclass(plate_class, Plate) and
+            (getattr(plate_class, "num_rows", None),
+             getattr(plate_class, "num_columns", None)) ==
+            (num_rows, num_columns)):
+        return plate_class
+    return type(str(class_name), (Plate,),
+                dict(num_rows=num_rows, num_columns=num_columns))
+
 class Plate96(Plate):
     """Base class for standard 96-well plates"""
     num_rows = 8
@@ -34,22 +46,26 @@ class Plate2x4(Plate):
 class Plate4ti0960(Plate96):
     """96-well plate from from 4titude"""
     class PlateWell(Well):
+        __slots__ = ()
         capacity = 150e-6
 
 class Plate4ti0130(Plate96):
     """96-well plate with 2ml deepwells from 4titude"""
     class PlateWell(Well):
+        __slots__ = ()
         capacity = 1900e-6
 
 class PlateLabcyteEchoLp0200Ldv(Plate384):
     """Low dead volume 384-well Echo plate"""
     class PlateWell(Well):
+        __slots__ = ()
         capacity = 12e-6
         echo_dead_volume = 3e-6
 
 class PlateLabcyteEchoP05525Pp(Plate384):
     """Polypropylene 384-well ECHO plate"""
     class PlateWell(Well):
+        __slots__ = ()
         capacity = 50e-6
         echo_dead_volume = 15e-6
 
@@ -58,7 +74,12 @@ class Trough8x1(Plate):
     num_rows = 8
     num_columns = 1
 
-    def __init__(self, name, data=None):
-        Plate.__init__(self, name=name, data=data)
-        for well in self:
-            well.content = self["A1"].content
+    def __init__(self, name, data=None, wells_data=None, lazy=None):
+        Plate.__init__(self, name=name, wells_data=wells_data, data=data,
+                       lazy=lazy)
+
+    def _new_well(self, row, column, wellname):
+        well = Plate._new_well(self, row, column, wellname)
+        if wellname != "A1":
+            well.content = self.wells["A1"].content
+        return well
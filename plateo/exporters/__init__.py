@@ -6,15 +6,28 @@ from .picklist_to_tecan_evo_picklist_file import \
 from .picklist_to_labcyte_echo_picklist_file import \
     picklist_to_labcyte_echo_picklist_file
 
-from .plate_to_bokeh_plots import plate_to_bokeh_plot
+from .plate_to_bokeh_plots import plate_to_bokeh_plot, plates_to_bokeh_grid
 
 from .plate_to_matplotlib_plots import (PlateGraphsPlotter,
+                                        PlateCurvesPlotter,
                                         PlateTextPlotter,
                                         PlateColorsPlotter)
 
+from .plate_to_raster_images import PlateColorsRasterizer
+
+from .plates_to_images import (plates_to_image_files,
+                               plates_to_contact_sheet)
+
 from .plate_to_tables import (plate_to_pandas_dataframe,
+                              plate_to_arrow_table,
                               plate_to_platemap_spreadsheet,
-                              plate_to_content_spreadsheet)
+                              plate_to_content_spreadsheet,
+                              plates_to_content_spreadsheet)
+
+from .plates_to_arrow_files import (plates_to_arrow_table,
+                                    picklist_to_arrow_table,
+                                    plates_to_arrow_file,
+                                    picklist_to_arrow_file)
 
 from .plate_to_genesift_sequencing_order_spreadsheet import \
     plate_to_genesift_sequencing_order_spreadsheet
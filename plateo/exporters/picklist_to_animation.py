@@ -25,6 +25,9 @@
 """
 
 
+from copy import deepcopy
+import pickle
+
 from matplotlib.patches import ConnectionPatch
 from proglog import ProgressBarLogger, TqdmProgressBarLogger
 from matplotlib.backends.backend_agg import FigureCanvasAgg
@@ -33,6 +36,10 @@ import numpy as np
 from matplotlib.backends.backend_pdf import PdfPages
 import imageio
 
+from ..PickList import PickList
+from ..tools import parallel_imap, effective_n_jobs
+from .plate_to_raster_images import draw_arrow
+
 
 class PicklistAnimator:
     """A picklist animator !
@@ -51,6 +58,14 @@ class PicklistAnimator:
       Either None for no logger, 'bar' for a progress bar logger, or any custom
       Proglog progress bar logger.
 
+    incremental
+      If True, the plates are plotted only once, and for each transfer only
+      the wells involved in the transfer and the arrow are updated (using
+      blitting for movies). This is much faster for long picklists. It
+      requires plotters supporting ``update_wells`` (such as
+      PlateColorsPlotter and PlateTextPlotter), else the plates are
+      re-plotted for every transfer.
+
 
     Examples
     --------
@@ -69,7 +84,7 @@ class PicklistAnimator:
     """
 
     def __init__(self, plate_plotters, message_function=None,
-                 plate_figure_size=(8, 6), logger='bar'):
+                 plate_figure_size=(8, 6), logger='bar', incremental=False):
         """Initialize."""
         self.plate_plotters = plate_plotters
         if logger is None:
@@ -79,18 +94,21 @@ class PicklistAnimator:
         self.logger = logger
         self.message_function = message_function
         self.plate_figure_size = plate_figure_size
+        self.incremental = incremental
 
     @staticmethod
     def mplfig_to_npimage(fig):
-        """ Converts a matplotlib figure to a RGB array"""
-        #  only the Agg backend now supports the tostring_rgb function
-        canvas = FigureCanvasAgg(fig)
+        """Render a matplotlib figure and return a RGB array view of it.
+
+        The figure's canvas is reused if it is an Agg canvas. The returned
+        array is a (read-only) view on the canvas' RGBA buffer, without the
+        alpha channel: it is only valid until the figure is drawn again.
+        """
+        canvas = fig.canvas
+        if not isinstance(canvas, FigureCanvasAgg):
+            canvas = FigureCanvasAgg(fig)
         canvas.draw()
-        l, b, w, h = canvas.figure.bbox.bounds
-        w, h = int(w), int(h)
-        buf = canvas.tostring_rgb()
-        image = np.fromstring(buf, dtype=np.uint8)
-        return image.reshape(h, w, 3)
+        return np.asarray(canvas.buffer_rgba())[:, :, :3]
 
     @staticmethod
     def list_source_and_target_plates(picklist):
@@ -128,6 +146,8 @@ class PicklistAnimator:
         axes
           (left, right): Two lists of matplotlib axes, one for the source
           plates on the left, one for the destination plates on the right.
+          If provided, the axes are cleared and keep their positions, else a
+          new figure is created and laid out.
 
         """
         if axes is None:
@@ -140,7 +160,9 @@ class PicklistAnimator:
             for ax in axes.flatten():
                 ax.axis('off')
                 ax.set_aspect('equal')
+            layout = True
         else:
+            layout = False
             fig = axes[0][0].figure
             for ax in axes.flatten():
                 ax.clear()
@@ -155,15 +177,17 @@ class PicklistAnimator:
                 ax.set_title(plate.name, fontsize=20)
                 self.plate_plotters[plate.name].plot_plate(plate, ax=ax)
                 axes_dict[plate.name] = ax
-        for i in range(5):
-            fig.tight_layout()
+        if layout:
+            # The layout is computed once, so that the frames of animations
+            # re-plotting the plates on the same axes do not shift.
+            for i in range(5):
+                fig.tight_layout()
         return fig, axes, axes_dict
 
-    def plot_transfer(self, transfer, source_plates, target_plates, axes=None):
-        """Plot the plates and add and arrow for the transfer"""
-        fig, axes, axes_dict = self.plot_plates(source_plates, target_plates,
-                                                axes=axes)
-
+    @staticmethod
+    def make_transfer_arrow(transfer, axes_dict):
+        """Return an arrow from the source to the destination of the transfer.
+        """
         source_well = transfer.source_well
         source_plate = source_well.plate
         source_ax = axes_dict[source_plate.name]
@@ -177,21 +201,28 @@ class PicklistAnimator:
         target_coord = x, target_plate.num_rows - y + 1
 
         target_ax.set_zorder(source_ax.get_zorder() - 1)
-        arrow = ConnectionPatch(
+        return ConnectionPatch(
             xyA=source_coord, xyB=target_coord,
             coordsA="data", coordsB="data",
             axesA=source_ax, axesB=target_ax,
             shrinkB=5.0, lw=2,
             facecolor='black',
             arrowstyle="wedge", zorder=1000)
-        source_ax.add_artist(arrow)
+
+    def plot_transfer(self, transfer, source_plates, target_plates, axes=None):
+        """Plot the plates and add and arrow for the transfer"""
+        fig, axes, axes_dict = self.plot_plates(source_plates, target_plates,
+                                                axes=axes)
+        arrow = self.make_transfer_arrow(transfer, axes_dict)
+        axes_dict[transfer.source_well.plate.name].add_artist(arrow)
         return fig, axes
 
-    def _make_transfer_figure(self, picklist, transfer=None, axes=None):
-        sources, targets = self.list_source_and_target_plates(picklist)
+    def _make_transfer_figure(self, picklist, transfer=None, axes=None,
+                              plates=None):
+        if plates is None:
+            plates = self.list_source_and_target_plates(picklist)
+        sources, targets = plates
         if transfer is not None:
-            index = self.logger.bars['transfers']['index']
-            self.logger(transfers__index=index + 1)
             fig, axes = self.plot_transfer(transfer, sources, targets,
                                            axes=axes)
         else:
@@ -204,7 +235,260 @@ class PicklistAnimator:
                 fig.suptitle(message, fontsize=12)
         return fig, axes
 
-    def animate(self, picklist, target, dpi=160, fps=5):
+    @staticmethod
+    def _list_overlay_artists(well_artists):
+        """Return the artists to redraw when well artists change.
+
+        These are, for each ax, the well artists and all artists drawn above
+        them, in drawing order.
+        """
+        overlay_artists = []
+        for ax in set(artist.axes for artist in well_artists):
+            ax_wells = set(a for a in well_artists if a.axes is ax)
+            min_zorder = min(artist.get_zorder() for artist in ax_wells)
+            hidden = [ax.patch]
+            if not ax.axison:
+                hidden += [ax.xaxis, ax.yaxis] + list(ax.spines.values())
+            overlay_artists += sorted([
+                artist for artist in ax.get_children()
+                if (artist in ax_wells) or (
+                    artist.get_visible() and (artist not in hidden)
+                    and (artist.get_zorder() >= min_zorder))
+            ], key=lambda artist: artist.get_zorder())
+        return overlay_artists
+
+    def _execute_incrementally(self, picklist, transfers, sources, targets,
+                               frame_function, dpi=None, blit=False,
+                               initial_plates=None):
+        """Execute transfers in place, updating only the changed wells' plots.
+
+        The plates are plotted once, then after each transfer the plot of the
+        source and destination wells is updated, the transfer arrow and
+        message are set, and ``frame_function(fig, canvas)`` is called.
+
+        If ``blit`` is true, the figure is fully rendered only once on the Agg
+        ``canvas``. For each transfer, only the screen regions of the updated
+        well artists are restored from a background rendered without the
+        wells and redrawn, then the arrow and message are drawn on top (this
+        is only valid to read the canvas buffer, not to save the figure to
+        vector formats).
+
+        If provided, ``initial_plates`` are the (sources, targets) lists of
+        plates in the picklist's initial state, which are plotted first
+        before being updated to the current state of ``sources`` and
+        ``targets``, so that the plot (e.g. its color scale) does not depend
+        on where the rendering starts.
+
+        Returns False (without executing the transfers) if the plotters do not
+        support incremental updates.
+        """
+        if initial_plates is None:
+            initial_plates = (sources, targets)
+        fig, axes, axes_dict = self.plot_plates(*initial_plates)
+        well_artists = []
+        for plate in sources + targets:
+            plotter = self.plate_plotters[plate.name]
+            artists = plotter.update_wells(axes_dict[plate.name], plate,
+                                           list(plate))
+            if artists is None:
+                plt.close(fig)
+                return False
+            well_artists += artists
+        message = None
+        if self.message_function is not None:
+            fig.subplots_adjust(top=0.8)
+            message = fig.suptitle("", fontsize=12)
+        if dpi is not None:
+            fig.dpi = dpi
+        canvas = FigureCanvasAgg(fig)
+        if blit:
+            if message is not None:
+                message.set_animated(True)
+            overlay_artists = self._list_overlay_artists(well_artists)
+            for artist in overlay_artists:
+                artist.set_visible(False)
+            canvas.draw()
+            background_without_wells = canvas.copy_from_bbox(fig.bbox)
+            for artist in overlay_artists:
+                artist.set_visible(True)
+            canvas.draw()
+            renderer = canvas.get_renderer()
+
+            def extent(artist):
+                bbox = artist.get_window_extent(renderer)
+                if not np.isfinite(bbox.extents).all():
+                    # Some collections cannot compute their extent
+                    bbox = artist.axes.bbox
+                return bbox.padded(2).extents
+            artist_indices = {a: i for i, a in enumerate(overlay_artists)}
+            extents = np.array([extent(a) for a in overlay_artists])
+
+        def overlapping_artists(regions):
+            """Return a boolean mask of the overlay artists overlapping any
+            of the (N, 4) array of regions (x0, y0, x1, y1)."""
+            x0, y0, x1, y1 = [extents[:, [i]] for i in range(4)]
+            overlaps = ((x0 < regions[:, 2]) & (regions[:, 0] < x1) &
+                        (y0 < regions[:, 3]) & (regions[:, 1] < y1))
+            return overlaps.any(axis=1)
+
+        def redraw_artists(changed_artists):
+            """Restore the background below the changed artists and redraw
+            all overlay artists in these regions."""
+            to_redraw = np.zeros(len(overlay_artists), dtype=bool)
+            regions = []
+            for artist in changed_artists:
+                index = artist_indices[artist]
+                old_extent, new_extent = extents[index], extent(artist)
+                to_redraw[index] = True
+                regions.append(np.concatenate([
+                    np.minimum(old_extent, new_extent)[:2],
+                    np.maximum(old_extent, new_extent)[2:]]))
+            regions = np.array(regions).reshape(-1, 4)
+            # Extend the regions to the artists overlapping them, so that no
+            # artist is partially redrawn over itself.
+            while True:
+                overlapping = overlapping_artists(regions) & ~to_redraw
+                if not overlapping.any():
+                    break
+                to_redraw |= overlapping
+                regions = np.vstack([regions, extents[overlapping]])
+            height = fig.bbox.height
+            for x0, y0, x1, y1 in regions:
+                canvas.restore_region(
+                    background_without_wells,
+                    bbox=(x0, height - y1, x1, height - y0), xy=(0, 0))
+            for index in to_redraw.nonzero()[0]:
+                fig.draw_artist(overlay_artists[index])
+                extents[index] = extent(overlay_artists[index])
+
+        def make_frame(transfer):
+            changed_artists = []
+            for well in (transfer.source_well, transfer.destination_well):
+                plotter = self.plate_plotters[well.plate.name]
+                changed_artists += plotter.update_wells(
+                    axes_dict[well.plate.name], well.plate, [well])
+            if message is not None:
+                text = self.message_function(picklist, transfer)
+                message.set_text("" if text is None else text)
+            arrow = self.make_transfer_arrow(transfer, axes_dict)
+            fig.add_artist(arrow)
+            if blit:
+                arrow.set_animated(True)
+                redraw_artists(changed_artists)
+                background = canvas.copy_from_bbox(fig.bbox)
+                fig.draw_artist(arrow)
+                if message is not None:
+                    fig.draw_artist(message)
+            frame_function(fig, canvas)
+            if blit:
+                canvas.restore_region(background)
+            arrow.remove()
+
+        PickList(transfers).execute(
+            inplace=True, callback_function=lambda _, tr: make_frame(tr))
+        plt.close(fig)
+        return True
+
+    def _render_transfers(self, picklist, transfers, sources, targets,
+                          frame_function, dpi=None, blit=False,
+                          initial_plates=None):
+        """Execute the transfers in place, calling ``frame_function`` after
+        each transfer.
+
+        ``transfers`` are transfers of ``picklist`` (which is passed to the
+        message function) between wells of the ``sources`` and ``targets``
+        plates. ``frame_function(fig, canvas)`` is called with the figure's
+        Agg canvas, which is up to date if ``blit`` is true (in incremental
+        mode the changes are blitted, else the figure is redrawn). See
+        ``_execute_incrementally`` for ``initial_plates``.
+        """
+        if self.incremental and self._execute_incrementally(
+                picklist, transfers, sources, targets, frame_function,
+                dpi=dpi, blit=blit, initial_plates=initial_plates):
+            return
+        plates = (sources, targets)
+        fig, axes = self._make_transfer_figure(picklist, plates=plates)
+        if dpi is not None:
+            fig.dpi = dpi
+        canvas = FigureCanvasAgg(fig)
+
+        def make_frame(transfer):
+            self._make_transfer_figure(picklist, transfer, axes=axes,
+                                       plates=plates)
+            if blit:
+                canvas.draw()
+            frame_function(fig, canvas)
+        PickList(transfers).execute(
+            inplace=True, callback_function=lambda _, tr: make_frame(tr))
+        plt.close(fig)
+
+    def _render_frames(self, picklist, extract_frame, write_frame, dpi=None,
+                       blit=False, n_jobs=1, chunk_size=None):
+        """Render one frame per transfer and write the frames in order.
+
+        The picklist is executed on copies of its plates.
+        ``extract_frame(fig, canvas)`` returns a (picklable) frame after each
+        transfer, and ``write_frame(frame)`` is called on the frames in the
+        order of the transfers.
+
+        If ``n_jobs`` is not 1, the picklist is first executed without any
+        plotting to record the states of the plates at the start of each
+        chunk of ``chunk_size`` transfers. The chunks are then rendered in
+        parallel in ``n_jobs`` processes, each starting from a copy of the
+        plates in their recorded state.
+        """
+        sources, targets = self.list_source_and_target_plates(picklist)
+        transfers_list = picklist.transfers_list
+        n_transfers = len(transfers_list)
+
+        def write(frame):
+            write_frame(frame)
+            index = self.logger.bars['transfers']['index']
+            self.logger(transfers__index=index + 1)
+
+        if n_jobs == 1:
+            new_picklist, new_plates = picklist.copy_with_new_plates()
+            self._render_transfers(
+                new_picklist, new_picklist.transfers_list,
+                [new_plates[plate] for plate in sources],
+                [new_plates[plate] for plate in targets],
+                lambda fig, canvas: write(extract_frame(fig, canvas)),
+                dpi=dpi, blit=blit)
+            return
+
+        if chunk_size is None:
+            n_workers = effective_n_jobs(n_jobs)
+            chunk_size = max(1, min(50, -(-n_transfers // (2 * n_workers))))
+        starts = list(range(0, n_transfers, chunk_size))
+        plates = sources + targets
+        _, simulated_plates = picklist.copy_with_new_plates()
+        states = []
+        for start in starts:
+            states.append(deepcopy([simulated_plates[p] for p in plates]))
+            chunk = PickList(transfers_list[start:start + chunk_size])
+            chunk.with_plates_replaced(simulated_plates).execute()
+
+        def render_chunk(chunk_index):
+            chunk_plates = dict(zip(plates, states[chunk_index]))
+            chunk_picklist = picklist.with_plates_replaced(chunk_plates)
+            start = starts[chunk_index]
+            frames = []
+            self._render_transfers(
+                chunk_picklist,
+                chunk_picklist.transfers_list[start:start + chunk_size],
+                [chunk_plates[plate] for plate in sources],
+                [chunk_plates[plate] for plate in targets],
+                lambda fig, canvas: frames.append(extract_frame(fig, canvas)),
+                dpi=dpi, blit=blit, initial_plates=(sources, targets))
+            return frames
+
+        for frames in parallel_imap(render_chunk, range(len(starts)),
+                                    n_jobs=n_jobs):
+            for frame in frames:
+                write(frame)
+
+    def animate(self, picklist, target, dpi=160, fps=5, n_jobs=1,
+                chunk_size=None):
         """Create a movie of the picklist.
 
         Parameters
@@ -220,34 +504,217 @@ class PicklistAnimator:
 
         fps
           Frames per second
+
+        n_jobs
+          Number of processes rendering the frames. If not 1, the states of
+          the plates are first computed without plotting, then chunks of
+          ``chunk_size`` consecutive frames are rendered in parallel and
+          written in order (None means as many processes as CPUs). In
+          incremental mode the frames are identical to sequentially rendered
+          ones, else the layout of the plates (recomputed at every frame) may
+          differ slightly between chunks.
+
+        chunk_size
+          Number of consecutive transfers rendered by a process at a time.
+          By default, the picklist is split in about 2 chunks per process,
+          of at most 50 transfers.
         """
         self.logger(transfers__total=len(picklist.transfers_list))
-        writer = imageio.get_writer(target, fps=fps)
-        fig, axes = self._make_transfer_figure(picklist)
 
-        def make_frame(picklist, transfer):
-            fig, _ = self._make_transfer_figure(picklist, transfer, axes=axes)
-            fig.dpi = dpi
-            writer.append_data(self.mplfig_to_npimage(fig))
-        picklist.execute(inplace=False, callback_function=make_frame)
+        def extract_frame(fig, canvas):
+            # A view on the canvas buffer, which is copied only when the frame
+            # must be sent from a worker process.
+            frame = np.asarray(canvas.buffer_rgba())[:, :, :3]
+            return frame if n_jobs == 1 else frame.copy()
+
+        writer = imageio.get_writer(target, fps=fps)
+        self._render_frames(picklist, extract_frame, writer.append_data,
+                            dpi=dpi, blit=True, n_jobs=n_jobs,
+                            chunk_size=chunk_size)
         writer.close()
-        plt.close(fig)
 
-    def write_pdf(self, picklist, target):
+    def write_pdf(self, picklist, target, n_jobs=1, chunk_size=None):
         """Create a multi-page PDF animation of the picklist.
 
         Parameters
         ----------
 
+        picklist
+          Picklist to be animated
+
+        target
+          File path or file-like object where to write the PDF.
 
+        n_jobs
+          Number of processes preparing the pages' figures (see ``animate``).
+          The figures are then sent to the main process which writes them to
+          the PDF.
+
+        chunk_size
+          Number of consecutive transfers handled by a process at a time.
         """
         self.logger(transfers__total=len(picklist.transfers_list))
 
         with PdfPages(target) as pdf:
-            fig, axes = self._make_transfer_figure(picklist)
-
-            def make_frame(picklist, transfer):
-                fig, _ = self._make_transfer_figure(picklist, transfer, axes=axes)
+            if n_jobs == 1:
+                def extract_page(fig, canvas):
+                    pdf.savefig(fig, bbox_inches="tight")
+                self._render_frames(picklist, extract_page, lambda _: None)
+                return
+
+            def write_page(pickled_figure):
+                fig = pickle.loads(pickled_figure)
                 pdf.savefig(fig, bbox_inches="tight")
                 plt.close(fig)
-            picklist.execute(inplace=False, callback_function=make_frame)
+            self._render_frames(
+                picklist, lambda fig, canvas: pickle.dumps(fig), write_page,
+                n_jobs=n_jobs, chunk_size=chunk_size)
+
+
+class PicklistRasterAnimator:
+    """A fast picklist animator drawing frames directly as NumPy arrays.
+
+    The plates are rendered with raster renderers (such as
+    PlateColorsRasterizer) instead of matplotlib, sources on the left and
+    targets on the right. For each transfer, only the two wells involved are
+    re-colored and an arrow is drawn from the source to the destination. The
+    frames have no titles or labels.
+
+    Parameters
+    ----------
+    plate_rasterizers
+      A dictionnary ``{plate_name: rasterizer_to_use_for_that_plate}``.
+      The colormap ranges are computed from the initial states of the plates.
+
+    padding
+      Space in pixels around and between the plates.
+
+    background_color, arrow_color
+      RGB colors (0-255) of the frames' background and of the arrows.
+
+    arrow_width, arrow_head_size
+      Width of the arrows' shaft and head, in pixels.
+
+    logger
+      Either None for no logger, 'bar' for a progress bar logger, or any custom
+      Proglog progress bar logger.
+
+    Examples
+    --------
+
+    >>> animator = PicklistRasterAnimator(
+    >>>     plate_rasterizers={
+    >>>         'Source': PlateColorsRasterizer(lambda w: w.volume),
+    >>>         'Target': PlateColorsRasterizer(lambda w: w.volume)
+    >>>     })
+    >>> animator.animate(picklist, "test.mp4", fps=3)
+    """
+
+    def __init__(self, plate_rasterizers, padding=20,
+                 background_color=(255, 255, 255), arrow_color=(0, 0, 0),
+                 arrow_width=2, arrow_head_size=8, logger='bar'):
+        self.plate_rasterizers = plate_rasterizers
+        self.padding = padding
+        self.background_color = background_color
+        self.arrow_color = arrow_color
+        self.arrow_width = arrow_width
+        self.arrow_head_size = arrow_head_size
+        if logger is None:
+            logger = ProgressBarLogger()
+        elif logger == 'bar':
+            logger = TqdmProgressBarLogger(bars=['transfers'])
+        self.logger = logger
+
+    def plot_plates(self, source_plates, target_plates):
+        """Return (frame, regions) with all plates rendered on the frame.
+
+        ``regions`` is a dict ``{plate_name: (top, left)}`` of the positions
+        of the plates' images in the frame.
+        """
+        columns = [source_plates, target_plates]
+        shapes = [
+            [self.plate_rasterizers[p.name].image_shape(p) for p in plates]
+            for plates in columns
+        ]
+        cell_height = max(shape[0] for s in shapes for shape in s)
+        cell_widths = [max([shape[1] for shape in s] or [0]) for s in shapes]
+        n_rows = max(len(plates) for plates in columns)
+        pad = self.padding
+        frame = np.empty((n_rows * (cell_height + pad) + pad,
+                          sum(cell_widths) + 3 * pad, 3), dtype=np.uint8)
+        frame[:] = self.background_color
+        regions = {}
+        for column, plates in enumerate(columns):
+            left = pad + column * (cell_widths[0] + pad)
+            for i, plate in enumerate(plates):
+                top = pad + i * (cell_height + pad)
+                height, width, _ = shapes[column][i]
+                self.plate_rasterizers[plate.name].render(
+                    plate, out=frame[top:top + height, left:left + width])
+                regions[plate.name] = (top, left)
+        return frame, regions
+
+    def iter_frames(self, picklist):
+        """Execute the picklist on copies of its plates and yield one frame
+        (RGB array) per transfer.
+
+        The same array is updated and yielded at each transfer: copy the
+        frames if they need to be kept.
+        """
+        sources, targets = PicklistAnimator.list_source_and_target_plates(
+            picklist)
+        new_picklist, new_plates = picklist.copy_with_new_plates()
+        sources = [new_plates[plate] for plate in sources]
+        targets = [new_plates[plate] for plate in targets]
+        frame, regions = self.plot_plates(sources, targets)
+        limits, images = {}, {}
+        for plate in sources + targets:
+            rasterizer = self.plate_rasterizers[plate.name]
+            values = rasterizer.well_values(plate.iter_wells())
+            limits[plate.name] = rasterizer.value_limits(values)
+            top, left = regions[plate.name]
+            height, width, _ = rasterizer.image_shape(plate)
+            images[plate.name] = frame[top:top + height, left:left + width]
+
+        def well_position(well):
+            top, left = regions[well.plate.name]
+            x, y = self.plate_rasterizers[well.plate.name].well_center(
+                well.plate, well)
+            return left + x, top + y
+
+        for transfer in new_picklist.transfers_list:
+            transfer.source_well.transfer_to_other_well(
+                destination_well=transfer.destination_well,
+                transfer_volume=transfer.volume)
+            for well in (transfer.source_well, transfer.destination_well):
+                self.plate_rasterizers[well.plate.name].render_wells(
+                    images[well.plate.name], well.plate, [well],
+                    limits[well.plate.name])
+            region, background = draw_arrow(
+                frame, well_position(transfer.source_well),
+                well_position(transfer.destination_well),
+                color=self.arrow_color, width=self.arrow_width,
+                head_size=self.arrow_head_size)
+            yield frame
+            frame[region] = background
+
+    def animate(self, picklist, target, fps=5):
+        """Create a movie of the picklist.
+
+        Parameters
+        ----------
+        picklist
+          Picklist to be animated
+
+        target
+          File path or file-like object where to write the movie.
+
+        fps
+          Frames per second
+        """
+        self.logger(transfers__total=len(picklist.transfers_list))
+        writer = imageio.get_writer(target, fps=fps)
+        for i, frame in enumerate(self.iter_frames(picklist)):
+            writer.append_data(frame)
+            self.logger(transfers__index=i + 1)
+        writer.close()
@@ -1,7 +1,6 @@
-from copy import deepcopy
-
 try:
     from bokeh.plotting import figure, ColumnDataSource
+    from bokeh.layouts import gridplot
     from bokeh.models import (
         Range1d, TapTool, HoverTool, OpenURL
     )
@@ -9,16 +8,13 @@ try:
 except ImportError:
     BOKEH_AVAILABLE = False
 
-from ..tools import (
-    dicts_to_columns,
-    wellname_to_coordinates,
-    number_to_rowname
-)
+from ..tools import number_to_rowname
 import numpy as np
 
 
 def plate_to_bokeh_plot(plate, hover_data=(), well_to_html=None,
-                        well_color_function=None):
+                        well_color_function=None, output_backend=None,
+                        width=600, height=400, title=None):
     """Return an interactive bokeh plot of the plate.
 
     Hovering the wells displays some data on the wells.
@@ -39,104 +35,99 @@ def plate_to_bokeh_plot(plate, hover_data=(), well_to_html=None,
 
     well_color_function
       A function well=> #a103ba associating a color to fill each well
+
+    output_backend
+      Bokeh output backend, "canvas", "svg" or "webgl". By default, "webgl"
+      is used for plates with more than 384 wells, which renders much faster
+      in the browser, and "canvas" for smaller plates.
+
+    width, height
+      Size of the plot in pixels (the plot is then scaled to the width of
+      the page).
+
+    title
+      Optional title of the plot.
+
+    Notes
+    -----
+
+    If wells have a ``url`` data field, clicking on them opens the URL.
     """
 
     if not BOKEH_AVAILABLE:
         raise ImportError(
             "Function plate_to_bokeh_plot requires Bokeh installed")
-    wells = deepcopy(plate.wells)
 
     if well_color_function is None:
         def well_color_function(well):
-            return "#fff" if well.content == {} else "#aaa"
+            return "#aaa" if well.content._quantities else "#fff"
 
     if hover_data != ():
         def well_to_html(well):
-            return "\n".join(
+            return "<br/>".join(
                 [well.name] + [
-                    "%s: %s" % (field, data.get(field, ""))
+                    "%s: %s" % (field, (well._data or {}).get(field, ""))
                     for field in hover_data
                 ]
             )
     elif well_to_html is None:
         well_to_html = lambda well: well.name
 
-    for name, well in wells.items():
-        data = {
-            field: info
-            for field, info in data.items()
-            if not isinstance(info, dict)
-        }
+    if output_backend is None:
+        output_backend = "webgl" if plate.num_wells > 384 else "canvas"
 
     n_rows, n_columns = plate.num_rows, plate.num_columns
-    p = figure(plot_width=600, plot_height=400,
+    p = figure(width=width, height=height, title=title,
                tools="box_zoom,reset,tap,save",
                x_range=Range1d(0, n_columns + 2),
                y_range=Range1d(0, n_rows + 2),
-               responsive=True)
+               sizing_mode="scale_width",
+               output_backend=output_backend)
 
-    placeholder_wells = p.circle(
+    grid_y, grid_x = np.mgrid[:n_rows, :n_columns]
+    p.circle(
         x="x", y="y", radius=0.3, fill_color=None,
         line_width=1, line_color="gray", name="placeholder_well",
-        source=ColumnDataSource(dicts_to_columns([
-            {
-                "x": x + 2,
-                "y": y + 1
-            }
-            for y in range(n_rows)
-            for x in range(n_columns)
-        ]))
+        source=ColumnDataSource({
+            "x": grid_x.flatten() + 2,
+            "y": grid_y.flatten() + 1
+        })
     )
 
-    dicts = []
-    for name, well in wells.items():
-        row, column = wellname_to_coordinates(name)
-        well_infos = {
-            "display_color": well_color_function(well),
-            "bokeh_x": column + 1,
-            "bokeh_y": n_rows + 1 - row,
-            "html_content": well_to_html(well)
-        }
-        #well_infos.update(data)
-        dicts.append(well_infos)
-
+    wells = list(plate.iter_wells())
+    columns = {
+        "well_name": [well.name for well in wells],
+        "bokeh_x": np.array([well.column for well in wells]) + 1,
+        "bokeh_y": n_rows + 1 - np.array([well.row for well in wells]),
+        "display_color": [well_color_function(well) for well in wells],
+        "html_content": [well_to_html(well) for well in wells],
+    }
+    urls = [(well._data or {}).get("url", None) for well in wells]
+    has_urls = any(url is not None for url in urls)
+    if has_urls:
+        columns["url"] = ["" if url is None else url for url in urls]
     actual_wells = p.circle(
         x="bokeh_x", y="bokeh_y", radius=0.3, fill_color='display_color',
         line_width=1, line_color="black", name="well",
-        source=ColumnDataSource(dicts_to_columns(dicts))
+        source=ColumnDataSource(columns)
     )
 
-    text = p.text(
+    p.text(
         x="x", y="y", text="text", text_baseline="middle",
         text_align="center", text_font_size="%dpx" % (
           0.8 * 144 / int(np.round(np.sqrt(plate.num_wells / 6)))),
-        source=ColumnDataSource(dicts_to_columns([
-            {
-                "text": number_to_rowname(i + 1),
-                "x": 1,
-                "y": n_rows - i
-            }
-            for i in range(n_rows)
-        ] + [
-            {
-                "text": str(i + 1),
-                "x": i + 2,
-                "y": n_rows + 1
-            }
-            for i in range(n_columns)
-        ]))
+        source=ColumnDataSource({
+            "text": ([number_to_rowname(i + 1) for i in range(n_rows)] +
+                     [str(i + 1) for i in range(n_columns)]),
+            "x": [1] * n_rows + list(range(2, n_columns + 2)),
+            "y": list(range(n_rows, 0, -1)) + [n_rows + 1] * n_columns
+        })
     )
-    if well_to_html is not None:
-        tooltips = "@html_content"
-    else:
-        tooltips = "<u><b>@well_name</b></u><br/>" + " ".join(
-            ["@%s" % field for field in hover_data]
-        )
-    hover = HoverTool(names=["well"], tooltips=tooltips)
+    hover = HoverTool(renderers=[actual_wells], tooltips="@html_content")
     p.add_tools(hover)
 
-    if any(("url" in well) for well in wells):
-        taptool = p.select(type=TapTool)
+    if has_urls:
+        taptool = p.select_one(TapTool)
         taptool.callback = OpenURL(url="@url")
 
     p.toolbar.logo = None
@@ -145,3 +136,27 @@ def plate_to_bokeh_plot(plate, hover_data=(), well_to_html=None,
     p.xgrid.grid_line_color = None
     p.ygrid.grid_line_color = None
     return p
+
+
+def plates_to_bokeh_grid(plates, ncols=2, **kwargs):
+    """Return a bokeh grid layout with an interactive plot of each plate.
+
+    Parameters
+    ----------
+
+    plates
+      A list of plates, displayed row by row, with their names as titles.
+
+    ncols
+      Number of plots per row.
+
+    **kwargs
+      Parameters of ``plate_to_bokeh_plot`` (hover_data, well_to_html,
+      well_color_function, output_backend, width, height).
+    """
+    plots = [
+        plate_to_bokeh_plot(plate, title=plate.name, **kwargs)
+        for plate in plates
+    ]
+    return gridplot(plots, ncols=ncols, sizing_mode="scale_width",
+                    toolbar_options=dict(logo=None))
@@ -1,10 +1,20 @@
 import textwrap
+from functools import lru_cache
+from weakref import WeakKeyDictionary
 
 import numpy as np
 
 try:
+    import matplotlib
     import matplotlib.pyplot as plt
     import matplotlib.patches as patches
+    from matplotlib.collections import (LineCollection, PathCollection,
+                                        PolyCollection)
+    from matplotlib.colors import to_rgba_array
+    from matplotlib.font_manager import FontProperties
+    from matplotlib.path import Path
+    from matplotlib.textpath import TextPath, text_to_path
+    from matplotlib.transforms import Affine2D
     from mpl_toolkits.axes_grid1.inset_locator import inset_axes
     MATPLOTLIB_AVAILABLE = True
 except ImportError:
@@ -19,18 +29,124 @@ from ..tools import (
 letters = 'ABCDEFGHIJKLMNOPQRSTUVWXYZ'
 
 
+# fontdict keys supported by text collections, and the corresponding
+# FontProperties parameters.
+TEXT_COLLECTION_FONT_KEYS = {
+    "size": "size", "fontsize": "size",
+    "weight": "weight", "fontweight": "weight",
+    "family": "family", "fontfamily": "family",
+    "style": "style", "fontstyle": "style",
+}
+TEXT_COLLECTION_KEYS = set(TEXT_COLLECTION_FONT_KEYS) | {"color", "alpha"}
+
+
+@lru_cache(maxsize=2**14)
+def text_path(text, horizontalalignment="center", verticalalignment="center",
+              **font_properties):
+    """Return a Path drawing the text, in points, relative to its anchor.
+
+    The (possibly multi-line) text is aligned on its anchor point as with
+    ``ax.text`` (``verticalalignment`` is "center" or "baseline"). The font
+    properties (size, weight, family, style) are passed to FontProperties.
+    The paths are cached, and must not be modified.
+    """
+    fontproperties = FontProperties(**font_properties)
+    size = fontproperties.get_size_in_points()
+    _, line_height, line_descent = text_to_path.get_text_width_height_descent(
+        "lp", fontproperties, ismath=False)
+    line_spacing = 1.2 * size
+    lines = text.split("\n")
+    paths = []
+    for i, line in enumerate(lines):
+        if line.strip() == "":
+            continue
+        path = TextPath((0, 0), line, prop=fontproperties)
+        width, _, _ = text_to_path.get_text_width_height_descent(
+            line, fontproperties, ismath=False)
+        dx = {"left": 0, "center": -width / 2.0,
+              "right": -width}[horizontalalignment]
+        paths.append(path.transformed(
+            Affine2D().translate(dx, -i * line_spacing)))
+    if verticalalignment == "center":
+        top = line_height - line_descent
+        bottom = -line_descent - (len(lines) - 1) * line_spacing
+        dy = -(top + bottom) / 2.0
+        paths = [p.transformed(Affine2D().translate(0, dy)) for p in paths]
+    if paths == []:
+        return Path(np.zeros((1, 2)), [Path.MOVETO])
+    return Path.make_compound_path(*paths)
+
+
+def fontdict_to_text_path_parameters(fontdict):
+    """Return (font_properties, color) for ``text_path`` from a fontdict."""
+    font_properties = {
+        TEXT_COLLECTION_FONT_KEYS[key]: (
+            tuple(value) if isinstance(value, list) else value)
+        for key, value in fontdict.items()
+        if key in TEXT_COLLECTION_FONT_KEYS
+    }
+    color = fontdict.get("color", matplotlib.rcParams["text.color"])
+    color = to_rgba_array(color, alpha=fontdict.get("alpha", None))[0]
+    return font_properties, color
+
+
+def make_text_collection(ax, texts, positions, fontdicts=None,
+                         horizontalalignment="center",
+                         verticalalignment="center"):
+    """Add many texts to the ax as one collection and return the collection.
+
+    The texts are drawn as paths with a fixed size in points (as with
+    ``ax.text``) at ``positions`` (in data coordinates), which is much faster
+    to draw than one Text artist per text. The fontdicts (one per text) can
+    only have keys in TEXT_COLLECTION_KEYS.
+    """
+    if fontdicts is None:
+        fontdicts = [{}] * len(texts)
+    paths, colors = [], []
+    for text, fontdict in zip(texts, fontdicts):
+        font_properties, color = fontdict_to_text_path_parameters(fontdict)
+        paths.append(text_path(text, horizontalalignment, verticalalignment,
+                               **font_properties))
+        colors.append(color)
+    collection = PathCollection(
+        paths, offsets=np.array(positions, dtype=float).reshape(-1, 2),
+        offset_transform=ax.transData, facecolors=colors,
+        edgecolors="none", linewidths=0)
+    # Like Text artists, the texts are not clipped to the ax. Snapping to
+    # pixels would distort glyphs with only straight strokes (E, F, H...).
+    collection.set_clip_on(False)
+    collection.set_snap(False)
+    collection.set_transform(
+        Affine2D().scale(1 / 72.0) + ax.figure.dpi_scale_trans)
+    ax.add_collection(collection, autolim=False)
+    return collection
+
+
+@lru_cache(maxsize=None)
+def _plate_layout_labels(num_wells):
+    """Return the texts and positions of the row and column labels of a plate
+    format, as (column_labels, column_positions, row_labels, row_positions).
+    """
+    n_rows, n_columns = compute_rows_columns(num_wells)
+    column_labels = [str(i) for i in range(1, n_columns + 1)]
+    column_positions = [(i, 1.075 * n_rows) for i in range(1, n_columns + 1)]
+    row_labels = [number_to_rowname(i + 1) for i in range(n_rows)]
+    row_positions = [(0.3, n_rows - i) for i in range(n_rows)]
+    return column_labels, column_positions, row_labels, row_positions
+
+
 def draw_plate_layout(num_wells, ax):
     """Draw the plate's border, row letters, column numbers."""
     n_rows, n_columns = compute_rows_columns(num_wells)
     ax.axis("off")
     ax.add_patch(patches.Rectangle((0.5, 0.5), n_columns, n_rows, fill=False))
-    for i in range(1, n_columns + 1):
-        ax.text(i, 1.075 * n_rows, str(i), horizontalalignment="center")
+    (column_labels, column_positions,
+     row_labels, row_positions) = _plate_layout_labels(num_wells)
+    make_text_collection(ax, column_labels, column_positions,
+                         verticalalignment="baseline")
     ax.set_ylim(0, n_rows + 2)
-    for i in range(n_rows):
-        ax.text(0.3, n_rows - i, number_to_rowname(i + 1),
-                verticalalignment="center",
-                horizontalalignment="right")
+    make_text_collection(ax, row_labels, row_positions,
+                         horizontalalignment="right")
     ax.plot([n_rows], [n_columns])
     ax.set_xlim(0, n_columns + 0.6)
 
@@ -97,28 +213,43 @@ class PlatePlotter:
 
         draw_plate_layout(plate.num_wells, ax)
 
-        stats = {}
-
         def progress(plate):
             if progress_bar:
                 return tqdm(plate, total=plate.num_wells)
             else:
                 return plate
-        for well in progress(plate):
-            if not well_filter(well):
-                continue
+        wells = [well for well in progress(plate) if well_filter(well)]
+        stats = self.plot_wells(ax, plate, wells)
+        self.post_process(ax, stats)
+        return ax, stats
 
-            x, y = well.column, well.row
-            y = plate.num_rows - y + 1
+    def plot_wells(self, ax, plate, wells):
+        """Plot the wells and return the stats {wellname: well_stat}.
 
+        By default, ``plot_well`` is called on each well. Subclasses can
+        override this method to plot all wells at once.
+        """
+        stats = {}
+        for well in wells:
+            x, y = well.column, plate.num_rows - well.row + 1
             stats[well.name] = self.plot_well(ax, x, y, well)
-
-        self.post_process(ax, stats)
-        return ax, stats
+        return stats
 
     def post_process(self, ax, stats):
         pass
 
+    def update_wells(self, ax, plate, wells):
+        """Update the plot of some wells on an ax where the plate was plotted.
+
+        This enables to re-draw only the wells whose content changed (e.g.
+        in picklist animations) instead of re-plotting the whole plate.
+
+        Returns the list of the artists representing the updated wells on the
+        ax (which should be redrawn), or None if the plotter does not support
+        incremental updates, in which case the plate must be re-plotted.
+        """
+        return None
+
 
 class PlateColorsPlotter(PlatePlotter):
     """Plot a plate's well statistic with wells colored differently.
@@ -146,28 +277,67 @@ class PlateColorsPlotter(PlatePlotter):
         self.vmin = vmin
         self.vmax = vmax
         self.edge_width = edge_width
+        self.artists = WeakKeyDictionary()
 
     def plot_well(self, ax, x, y, well):
         return ((x, y), self.stat_function(well))
 
+    def plot_wells(self, ax, plate, wells):
+        num_rows = plate.num_rows
+        return {
+            well.name: ((well.column, num_rows - well.row + 1),
+                        self.stat_function(well))
+            for well in wells
+        }
+
+    def update_wells(self, ax, plate, wells):
+        if ax not in self.artists:
+            return None
+        plot, well_data = self.artists[ax]
+        if self.well_radius == 'full':
+            for well in wells:
+                x, y = well.column, plate.num_rows - well.row + 1
+                well_data[y - 1, x - 1] = self.stat_function(well)
+            plot.set_data(well_data[::-1, :])
+            if well_data.ndim == 2:
+                self._autoscale(plot, well_data)
+        else:
+            indices, values = well_data
+            for well in wells:
+                values[indices[well.name]] = self.stat_function(well)
+            if plot.get_array() is not None:
+                plot.set_array(np.array(values))
+                self._autoscale(plot, plot.get_array())
+            else:
+                plot.set_facecolors(values)
+        return [plot]
+
+    def _autoscale(self, plot, values):
+        """Set the color scale limits not fixed by ``vmin`` and ``vmax`` to
+        the range of the values, as a new plot of the plate would."""
+        if (self.vmin is not None) and (self.vmax is not None):
+            return
+        values = np.ma.masked_invalid(np.asarray(values, dtype=float))
+        if values.count() == 0:
+            return
+        vmin = values.min() if self.vmin is None else self.vmin
+        vmax = values.max() if self.vmax is None else self.vmax
+        plot.set_clim(vmin, vmax)
+
     def post_process(self, ax, stats):
         xy, stats_values = zip(*stats.values())
-        xx, yy = zip(*xy)
+        xx, yy = np.array(xy).T
         if self.well_radius == 'full':
-            values = list(stats.values())
-            colors = [
-                v[1] for v in values if (v[1] is not None)
-            ]
+            colors = [v for v in stats_values if v is not None]
             depth = len(colors[0]) if hasattr(colors[0], '__iter__') else 1
-            my, mx = max(yy), max(xx)
+            my, mx = yy.max(), xx.max()
             grid = np.zeros((my, mx, depth) if depth > 1 else (my, mx))
-            for (x, y), stat in stats.values():
-                grid[y-1, x-1] = stat
+            grid[yy - 1, xx - 1] = np.array(stats_values, dtype=float)
             plot = ax.imshow(grid[::-1, :], alpha=self.alpha,
                              vmin=self.vmin, vmax=self.vmax,
                              cmap=self.colormap,
-                             extent=[0.5, max(xx)+0.5, 0.5, max(yy)+0.5])
-
+                             extent=[0.5, mx + 0.5, 0.5, my + 0.5])
+            self.artists[ax] = (plot, grid)
 
         else:
             plot = ax.scatter(xx, yy, s=self.well_radius, c=stats_values,
@@ -175,6 +345,8 @@ class PlateColorsPlotter(PlatePlotter):
                               linewidths=self.edge_width,
                               edgecolors='k',
                               alpha=self.alpha, cmap=self.colormap)
+            indices = {name: i for i, name in enumerate(stats.keys())}
+            self.artists[ax] = (plot, (indices, list(stats_values)))
         if self.plot_colorbar:
             ax.figure.colorbar(plot)
 
@@ -182,15 +354,22 @@ class PlateColorsPlotter(PlatePlotter):
 class PlateTextPlotter(PlatePlotter):
     """Plot a plate's well statistic as text at the well's positions.
 
+    The texts of all wells are drawn as a single collection of paths, which
+    is much faster than one text artist per well for large plates. If the
+    fontdicts have other keys than TEXT_COLLECTION_KEYS (color, alpha, size,
+    weight, family, style), one matplotlib Text is used per well instead.
+
     Parameters
     ----------
 
     text_function
       A function (well) => text
 
-    with_colorbar
-      It true a colorbar giving a scale for color values will be plotted
-      alongside the map
+    line_length
+      If provided, the texts are wrapped to lines of at most this length.
+
+    fontdict
+      Either a fontdict or a function (well) => fontdict.
     """
 
     def __init__(self, text_function, line_length=None, fontdict=None):
@@ -198,21 +377,77 @@ class PlateTextPlotter(PlatePlotter):
         self.fontdict = {} if fontdict is None else fontdict
         self.text_function = text_function
         self.line_length = line_length
+        self.artists = WeakKeyDictionary()
 
-    def plot_well(self, ax, x, y, well):
+    def well_text_and_fontdict(self, well):
         text = str(self.text_function(well))
         if self.line_length is not None:
             text = '\n'.join(textwrap.wrap(text, self.line_length))
         fontdict = self.fontdict
         if not isinstance(fontdict, dict):
             fontdict = fontdict(well)
+        return text, fontdict
 
-        ax.text(x, y, str(text),
-                fontdict=fontdict,
-                horizontalalignment="center",
-                verticalalignment="center")
+    def plot_well(self, ax, x, y, well):
+        text, fontdict = self.well_text_and_fontdict(well)
+        text_artist = ax.text(x, y, str(text),
+                              fontdict=fontdict,
+                              horizontalalignment="center",
+                              verticalalignment="center")
+        self.artists.setdefault(ax, {})[well.name] = text_artist
         return ((x, y), text)
 
+    def plot_wells(self, ax, plate, wells):
+        texts, fontdicts = zip(*[
+            self.well_text_and_fontdict(well) for well in wells
+        ]) if len(wells) else ((), ())
+        if any(set(fontdict) - TEXT_COLLECTION_KEYS for fontdict in fontdicts):
+            return PlatePlotter.plot_wells(self, ax, plate, wells)
+        positions = [(well.column, plate.num_rows - well.row + 1)
+                     for well in wells]
+        collection = make_text_collection(ax, texts, positions, fontdicts)
+        indices = {well.name: i for i, well in enumerate(wells)}
+        self.artists[ax] = (collection, indices)
+        return {
+            well.name: (position, text)
+            for well, position, text in zip(wells, positions, texts)
+        }
+
+    def plot_plate(self, plate, ax=None, **kwargs):
+        if ax is not None:
+            self.artists.pop(ax, None)
+        return PlatePlotter.plot_plate(self, plate, ax=ax, **kwargs)
+
+    plot_plate.__doc__ = PlatePlotter.plot_plate.__doc__
+
+    def update_wells(self, ax, plate, wells):
+        if ax not in self.artists:
+            return None
+        if isinstance(self.artists[ax], tuple):
+            collection, indices = self.artists[ax]
+            paths = collection.get_paths()
+            colors = collection.get_facecolors()
+            for well in wells:
+                if well.name in indices:
+                    text, fontdict = self.well_text_and_fontdict(well)
+                    font_properties, color = \
+                        fontdict_to_text_path_parameters(fontdict)
+                    paths[indices[well.name]] = text_path(
+                        text, "center", "center", **font_properties)
+                    colors[indices[well.name]] = color
+            collection.set_paths(paths)
+            collection.set_facecolors(colors)
+            return [collection]
+        text_artists = self.artists[ax]
+        updated_artists = []
+        for well in wells:
+            if well.name in text_artists:
+                text, fontdict = self.well_text_and_fontdict(well)
+                text_artists[well.name].set_text(text)
+                text_artists[well.name].update(fontdict)
+                updated_artists.append(text_artists[well.name])
+        return updated_artists
+
 
 class PlateGraphsPlotter(PlatePlotter):
     """Plot a graph (for instance time series) for each well of the plate
@@ -247,3 +482,117 @@ class PlateGraphsPlotter(PlatePlotter):
         well_ax = place_inset_ax_in_data_coordinates(ax, bbox)
         self.plot_function(well, well_ax)
         return well_ax
+
+
+class PlateCurvesPlotter(PlateGraphsPlotter):
+    """Plot curves (for instance time series) in a small graph for each well.
+
+    The layout is the same as with PlateGraphsPlotter, but instead of one
+    inset axes per well, the curves of all wells are drawn on the plate's ax
+    as a single line collection, with a frame around each well's graph (and
+    no ticks). This is much faster for large plates.
+
+    Parameters
+    ----------
+
+    curves_function
+      A function f(well) => (xs, ys) or None, where ``xs`` is an array of N
+      values and ``ys`` is an array of N values (for one curve) or of shape
+      (number_of_curves, N). The curves of a well are drawn with the colors
+      of the matplotlib color cycle, as in an axes.
+
+    subplot_size
+      (width, height) of subplots, between 0 and 1 (1 meaning the graphs of
+      the different wells will have virtually no margin between them)
+
+    xlim, ylim
+      The limits of the graphs, either "shared" for the same limits for all
+      graphs (to compare the wells), "well" for limits adjusted to each
+      well's data (as with PlateGraphsPlotter), or (min, max). Data outside
+      of the limits is clipped to the graph's frame.
+
+    frame
+      If true, a frame is drawn around each well's graph.
+
+    line_properties
+      Properties of the matplotlib LineCollection of the curves, e.g.
+      ``{"linewidths": 0.5}``.
+    """
+
+    def __init__(self, curves_function, subplot_size=(0.7, 0.7),
+                 xlim="shared", ylim="shared", frame=True,
+                 line_properties=None):
+        PlateGraphsPlotter.__init__(self, None, subplot_size=subplot_size)
+        self.curves_function = curves_function
+        self.xlim = xlim
+        self.ylim = ylim
+        self.frame = frame
+        self.line_properties = ({} if line_properties is None
+                                else line_properties)
+
+    @staticmethod
+    def _compute_limits(values, limits, margin):
+        """Return a (n_wells, 2) array of the graphs' limits along one
+        dimension, from the list of arrays of the wells' values."""
+        if not isinstance(limits, str):
+            return np.tile(np.array(limits, dtype=float), (len(values), 1))
+        bounds = np.array([
+            (np.nanmin(v), np.nanmax(v)) if np.isfinite(v).any()
+            else (np.nan, np.nan)
+            for v in values
+        ]).reshape(-1, 2)
+        if limits == "shared":
+            bounds[:] = np.nanmin(bounds[:, 0]), np.nanmax(bounds[:, 1])
+        span = bounds[:, 1] - bounds[:, 0]
+        span[span == 0] = 1
+        bounds += np.outer(margin * span, [-1, 1])
+        return bounds
+
+    def plot_wells(self, ax, plate, wells):
+        stats = {}
+        for well in wells:
+            curves = self.curves_function(well)
+            if curves is not None:
+                xs, ys = curves
+                stats[well.name] = (np.asarray(xs, dtype=float),
+                                    np.atleast_2d(np.asarray(ys, dtype=float)))
+        if len(stats) == 0:
+            return stats
+        wells = [plate.wells[name] for name in stats]
+        xs, ys = zip(*stats.values())
+        xlims = self._compute_limits(
+            xs, self.xlim, matplotlib.rcParams["axes.xmargin"])
+        ylims = self._compute_limits(
+            ys, self.ylim, matplotlib.rcParams["axes.ymargin"])
+        width, height = self.subplot_width, self.subplot_height
+        centers = np.array([(well.column, plate.num_rows - well.row + 1)
+                            for well in wells], dtype=float)
+        lefts = centers[:, 0] - width / 2.0
+        bottoms = centers[:, 1] - height / 2.0
+
+        segments, colors = [], []
+        cycle_colors = matplotlib.rcParams["axes.prop_cycle"].by_key().get(
+            "color", ["k"])
+        for i, (x, y) in enumerate(zip(xs, ys)):
+            x = (x - xlims[i, 0]) / (xlims[i, 1] - xlims[i, 0])
+            y = (y - ylims[i, 0]) / (ylims[i, 1] - ylims[i, 0])
+            x = lefts[i] + width * np.clip(x, 0, 1)
+            y = bottoms[i] + height * np.clip(y, 0, 1)
+            for j, curve_y in enumerate(y):
+                segments.append(np.array([x, curve_y]).T)
+                colors.append(cycle_colors[j % len(cycle_colors)])
+        line_properties = dict(colors=colors)
+        line_properties.update(self.line_properties)
+        ax.add_collection(LineCollection(segments, **line_properties),
+                          autolim=False)
+        if self.frame:
+            frames = np.array([
+                [(left, bottom), (left + width, bottom),
+                 (left + width, bottom + height), (left, bottom + height)]
+                for left, bottom in zip(lefts, bottoms)
+            ])
+            ax.add_collection(PolyCollection(
+                frames, facecolors="none", edgecolors="k",
+                linewidths=matplotlib.rcParams["axes.linewidth"]),
+                autolim=False)
+        return stats
@@ -0,0 +1,347 @@
+"""Fast rendering of plates as NumPy RGB images, without matplotlib.
+
+The images only represent the plate's border and wells (no titles, labels or
+colorbars), which makes them much faster to produce than matplotlib plots, for
+instance to generate thumbnails of many plates or long picklist animations
+(see ``PicklistRasterAnimator``).
+"""
+
+from functools import lru_cache
+
+import numpy as np
+
+try:
+    import matplotlib
+    MATPLOTLIB_AVAILABLE = True
+except ImportError:
+    MATPLOTLIB_AVAILABLE = False
+
+
+class PlateRasterTemplate:
+    """Precomputed pixel geometry of the images of a plate format.
+
+    Use ``get_raster_template`` to get templates shared between renderers.
+
+    Parameters
+    ----------
+
+    num_rows, num_columns
+      Numbers of rows and columns of the plate format (e.g. 8 and 12 for
+      96-well plates, 8 and 1 for troughs).
+
+    well_size
+      Distance in pixels between the centers of two neighbouring wells.
+
+    well_radius
+      Radius of the wells as a fraction of ``well_size``, or 'full' for square
+      wells filling the whole grid.
+
+    margin
+      Number of pixels around the wells (the plate's border is drawn in the
+      margin, one pixel away from the wells' grid). Defaults to half a well.
+
+    Attributes
+    ----------
+
+    shape
+      (height, width) of the images.
+
+    pixel_rows, pixel_columns, pixel_wells
+      Arrays of the coordinates of all well pixels and the (0-based, in row
+      order) index of the well they belong to, sorted by well.
+
+    well_starts
+      The pixels of the well of index ``i`` are at positions
+      ``well_starts[i]:well_starts[i + 1]`` in the pixel arrays.
+
+    well_centers
+      Array of shape (num_wells, 2) of the (x, y) coordinates of the wells'
+      centers, in pixels.
+    """
+
+    def __init__(self, num_rows, num_columns, well_size=10, well_radius=0.4,
+                 margin=None):
+        num_wells = num_rows * num_columns
+        if margin is None:
+            margin = max(2, well_size // 2)
+        self.num_rows = num_rows
+        self.num_columns = num_columns
+        self.num_wells = num_wells
+        self.well_size = well_size
+        self.margin = margin
+        self.shape = (num_rows * well_size + 2 * margin,
+                      num_columns * well_size + 2 * margin)
+        y, x = np.mgrid[:self.shape[0], :self.shape[1]] + 0.5
+        rows = np.floor((y - margin) / well_size).astype(int)
+        columns = np.floor((x - margin) / well_size).astype(int)
+        in_well = ((rows >= 0) & (rows < num_rows) &
+                   (columns >= 0) & (columns < num_columns))
+        if well_radius != 'full':
+            dy = y - margin - (rows + 0.5) * well_size
+            dx = x - margin - (columns + 0.5) * well_size
+            in_well &= (dx ** 2 + dy ** 2) <= (well_radius * well_size) ** 2
+        pixel_rows, pixel_columns = np.nonzero(in_well)
+        pixel_wells = (rows * num_columns + columns)[in_well]
+        order = np.argsort(pixel_wells, kind="stable")
+        self.pixel_rows = pixel_rows[order]
+        self.pixel_columns = pixel_columns[order]
+        self.pixel_wells = pixel_wells[order]
+        self.well_starts = np.searchsorted(self.pixel_wells,
+                                           np.arange(num_wells + 1))
+        centers_y, centers_x = np.mgrid[:num_rows, :num_columns] + 0.5
+        self.well_centers = margin + well_size * np.array([
+            centers_x.flatten(), centers_y.flatten()]).T
+        self.wells_bounds = (margin, margin + num_rows * well_size,
+                             margin, margin + num_columns * well_size)
+        for array in (self.pixel_rows, self.pixel_columns, self.pixel_wells,
+                      self.well_starts, self.well_centers):
+            array.flags.writeable = False
+
+    def well_pixels(self, well_indices):
+        """Return (pixel_rows, pixel_columns, positions) of the given wells'
+        pixels, where ``positions`` are the positions of the pixels' wells in
+        ``well_indices``."""
+        well_indices = np.asarray(well_indices, dtype=int)
+        starts = self.well_starts[well_indices]
+        counts = self.well_starts[well_indices + 1] - starts
+        positions = np.repeat(np.arange(len(well_indices)), counts)
+        pixels = (np.arange(counts.sum()) -
+                  np.repeat(np.cumsum(counts) - counts, counts) +
+                  np.repeat(starts, counts))
+        return self.pixel_rows[pixels], self.pixel_columns[pixels], positions
+
+    def draw_border(self, image, color):
+        """Draw the plate's border on the image, in place."""
+        top, bottom, left, right = self.wells_bounds
+        image[top - 1, left - 1:right + 1] = color
+        image[bottom, left - 1:right + 1] = color
+        image[top - 1:bottom + 1, left - 1] = color
+        image[top - 1:bottom + 1, right] = color
+
+
+@lru_cache(maxsize=None)
+def get_raster_template(num_rows, num_columns, well_size=10, well_radius=0.4,
+                        margin=None):
+    """Return a (cached) PlateRasterTemplate for the given plate format."""
+    return PlateRasterTemplate(num_rows, num_columns, well_size=well_size,
+                               well_radius=well_radius, margin=margin)
+
+
+def colormap_to_lut(colormap=None, n_colors=256):
+    """Return a (n_colors, 3) uint8 array of the colormap's colors.
+
+    The colormap can be a matplotlib colormap or colormap name (None for
+    matplotlib's default colormap), or an array of RGB colors (with values
+    between 0 and 1 or 0 and 255). Without matplotlib, the default is a
+    grayscale colormap.
+    """
+    if colormap is None and not MATPLOTLIB_AVAILABLE:
+        colormap = np.linspace([0, 0, 0], [1, 1, 1], n_colors)
+    if colormap is None or isinstance(colormap, str):
+        colormap = matplotlib.colormaps[
+            colormap or matplotlib.rcParams["image.cmap"]]
+    if callable(colormap):
+        colormap = colormap(np.linspace(0, 1, n_colors))[:, :3]
+    colors = np.asarray(colormap, dtype=float)[:, :3]
+    if colors.max() <= 1:
+        colors = 255 * colors
+    return np.round(colors).astype(np.uint8)
+
+
+def draw_arrow(image, start, end, color=(0, 0, 0), width=2, head_size=8):
+    """Draw an arrow on an RGB image, in place.
+
+    Parameters
+    ----------
+
+    image
+      Array of shape (height, width, 3).
+
+    start, end
+      (x, y) coordinates, in pixels, of the arrow's start and tip.
+
+    color
+      RGB color of the arrow.
+
+    width, head_size
+      Width of the arrow's shaft and of the base of its head, in pixels.
+
+    Returns
+    -------
+
+    (region, background) where ``region`` is a tuple of slices such that
+    ``image[region] = background`` removes the arrow.
+    """
+    (x0, y0), (x1, y1) = start, end
+    height, image_width = image.shape[:2]
+    pad = head_size + width
+    region = (
+        slice(max(0, int(min(y0, y1) - pad)),
+              min(height, int(max(y0, y1) + pad) + 1)),
+        slice(max(0, int(min(x0, x1) - pad)),
+              min(image_width, int(max(x0, x1) + pad) + 1))
+    )
+    background = image[region].copy()
+    length = np.hypot(x1 - x0, y1 - y0)
+    if length == 0:
+        return region, background
+    ux, uy = (x1 - x0) / length, (y1 - y0) / length
+    y, x = np.mgrid[region] + 0.5
+    along = (x - x0) * ux + (y - y0) * uy
+    across = np.abs((y - y0) * ux - (x - x0) * uy)
+    head_length = min(head_size, length)
+    head_base = length - head_length
+    shaft = (along >= 0) & (along <= head_base) & (across <= width / 2.0)
+    head = ((along >= head_base) & (along <= length) &
+            (across <= 0.5 * head_size * (length - along) / head_length))
+    image[region][shaft | head] = color
+    return region, background
+
+
+class PlateColorsRasterizer:
+    """Render a plate's well statistic as an image with colored wells.
+
+    This is a fast, matplotlib-free equivalent of ``PlateColorsPlotter``.
+
+    Parameters
+    ----------
+
+    stat_function
+      The function to be plotted, with signature (well) => value. The value
+      can be a number (mapped to a color of the colormap), an (r, g, b) color
+      with values between 0 and 1, or None for wells to be left blank.
+
+    colormap
+      A matplotlib colormap or colormap name, or an array of RGB colors (see
+      ``colormap_to_lut``).
+
+    vmin, vmax
+      Values mapped to the first and last colors of the colormap. By default,
+      the minimal and maximal values of the plate.
+
+    well_size, well_radius, margin
+      Geometry of the image (see ``PlateRasterTemplate``).
+
+    background_color, border_color, empty_well_color
+      RGB colors (0-255) of the image's background, of the plate's border,
+      and of wells with no value.
+
+    Examples
+    --------
+
+    >>> rasterizer = PlateColorsRasterizer(lambda well: well.volume)
+    >>> image = rasterizer.render(plate)  # array of shape (height, width, 3)
+    """
+
+    def __init__(self, stat_function, colormap=None, vmin=None, vmax=None,
+                 well_size=10, well_radius=0.4, margin=None,
+                 background_color=(255, 255, 255), border_color=(0, 0, 0),
+                 empty_well_color=(230, 230, 230)):
+        self.stat_function = stat_function
+        self.lut = colormap_to_lut(colormap)
+        self.vmin = vmin
+        self.vmax = vmax
+        self.well_size = well_size
+        self.well_radius = well_radius
+        self.margin = margin
+        self.background_color = background_color
+        self.border_color = border_color
+        self.empty_well_color = empty_well_color
+
+    def template(self, plate):
+        """Return the PlateRasterTemplate of the images of the plate's format.
+        """
+        return get_raster_template(plate.num_rows, plate.num_columns,
+                                   well_size=self.well_size,
+                                   well_radius=self.well_radius,
+                                   margin=self.margin)
+
+    def image_shape(self, plate):
+        """Return the (height, width, 3) shape of the plate's images."""
+        return self.template(plate).shape + (3,)
+
+    def well_values(self, wells):
+        """Return an array of the stat function's values for the wells.
+
+        The array has shape (n_wells,) for numerical statistics, or
+        (n_wells, 3) for RGB colors. Wells with no value get NaNs.
+        """
+        stats = [self.stat_function(well) for well in wells]
+        if any(hasattr(stat, '__iter__') for stat in stats):
+            return np.array([
+                (np.nan, np.nan, np.nan) if stat is None else stat[:3]
+                for stat in stats
+            ], dtype=float)
+        return np.array([np.nan if stat is None else stat for stat in stats],
+                        dtype=float)
+
+    def value_limits(self, values):
+        """Return the (vmin, vmax) range of the colormap for these values."""
+        vmin, vmax = self.vmin, self.vmax
+        if values.ndim == 1 and not np.isnan(values).all():
+            if vmin is None:
+                vmin = np.nanmin(values)
+            if vmax is None:
+                vmax = np.nanmax(values)
+        return (0 if vmin is None else vmin), (1 if vmax is None else vmax)
+
+    def values_to_colors(self, values, limits):
+        """Return a (n_wells, 3) uint8 array of the colors of the values."""
+        missing = np.isnan(values)
+        if values.ndim == 2:
+            colors = np.round(255 * np.clip(np.nan_to_num(values), 0, 1))
+            colors = colors.astype(np.uint8)
+            missing = missing.any(axis=1)
+        else:
+            vmin, vmax = limits
+            scale = (len(self.lut) - 1) / (vmax - vmin) if vmax > vmin else 0
+            lut_indices = np.clip(
+                np.nan_to_num((values - vmin) * scale), 0, len(self.lut) - 1)
+            colors = self.lut[np.round(lut_indices).astype(int)]
+        colors[missing] = self.empty_well_color
+        return colors
+
+    def render(self, plate, out=None, limits=None):
+        """Return an RGB image of the plate.
+
+        Parameters
+        ----------
+
+        plate
+          The plate to render.
+
+        out
+          Optional array of shape ``self.image_shape(plate)`` (possibly a view
+          on a larger image) where to draw the plate.
+
+        limits
+          (vmin, vmax) range of the colormap. By default, computed from the
+          plate's values (see ``value_limits``).
+        """
+        template = self.template(plate)
+        if out is None:
+            out = np.empty(template.shape + (3,), dtype=np.uint8)
+        out[:] = self.background_color
+        template.draw_border(out, self.border_color)
+        values = self.well_values(plate.iter_wells())
+        if limits is None:
+            limits = self.value_limits(values)
+        colors = self.values_to_colors(values, limits)
+        out[template.pixel_rows, template.pixel_columns] = colors[
+            template.pixel_wells]
+        return out
+
+    def render_wells(self, image, plate, wells, limits):
+        """Update, in place, the colors of some wells in an image of the plate
+        made with ``render``."""
+        template = self.template(plate)
+        indices = [(well.row - 1) * plate.num_columns + well.column - 1
+                   for well in wells]
+        colors = self.values_to_colors(self.well_values(wells), limits)
+        rows, columns, positions = template.well_pixels(indices)
+        image[rows, columns] = colors[positions]
+
+    def well_center(self, plate, well):
+        """Return the (x, y) coordinates in pixels of the well's center."""
+        index = (well.row - 1) * plate.num_columns + well.column - 1
+        return self.template(plate).well_centers[index]
@@ -1,7 +1,158 @@
-from collections import defaultdict
+from collections import OrderedDict
 from ..tools import number_to_rowname, unit_factors
+import numpy as np
 import pandas
 
+try:
+    import pyarrow
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+WELL_COLUMNS = ("name", "row", "column", "volume", "quantities")
+DATA_COLUMN_PREFIX = "data."
+
+
+def data_field_to_column(field, reserved_columns=WELL_COLUMNS):
+    """Return the name of the column of a data field in tables of wells.
+
+    Fields named like one of the ``reserved_columns`` (e.g. a ``volume``
+    data field), or starting with ``data.``, get a ``data.`` prefix, so that
+    they do not collide with the other columns (see
+    ``column_to_data_field``).
+    """
+    if (field in reserved_columns) or (
+            isinstance(field, str) and field.startswith(DATA_COLUMN_PREFIX)):
+        return DATA_COLUMN_PREFIX + field
+    return field
+
+
+def column_to_data_field(column):
+    """Return the name of the data field of a column named with
+    ``data_field_to_column``."""
+    if isinstance(column, str) and column.startswith(DATA_COLUMN_PREFIX):
+        return column[len(DATA_COLUMN_PREFIX):]
+    return column
+
+
+def plate_to_platemap_grids(plate, wellinfo_functions):
+    """Return platemaps of several well infos, in a single pass over the wells.
+
+    Parameters
+    ----------
+
+    plate
+      A Plate object
+
+    wellinfo_functions
+      A dict (or list of pairs) ``{name: f(well) -> info}``.
+
+    Returns
+    -------
+
+    An OrderedDict ``{name: grid}`` where each grid is an array of shape
+    (num_rows, num_columns) with the info of well A1 at position [0, 0].
+    """
+    wellinfo_functions = OrderedDict(wellinfo_functions)
+    shape = (plate.num_rows, plate.num_columns)
+    grids = OrderedDict([
+        (name, np.empty(shape, dtype=object)) for name in wellinfo_functions
+    ])
+    functions_and_grids = [(wellinfo_functions[name], grid)
+                           for name, grid in grids.items()]
+    for well in plate.wells.values():
+        position = (well.row - 1, well.column - 1)
+        for function, grid in functions_and_grids:
+            grid[position] = function(well)
+    return grids
+
+
+def platemap_grid_to_dataframe(grid):
+    """Return a dataframe with row names (A, B...) as index and column numbers
+    as columns from a (num_rows, num_columns) grid."""
+    n_rows, n_columns = grid.shape
+    return pandas.DataFrame(
+        grid, index=[number_to_rowname(i + 1) for i in range(n_rows)],
+        columns=list(range(1, n_columns + 1))
+    ).infer_objects()
+
+
+def _excel_cell_value(value):
+    if value is None or (isinstance(value, float) and np.isnan(value)):
+        return None
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _write_block_with_pandas(writer, sheet_name, startrow, title,
+                             dataframe, headers=True):
+    """Write a platemap below ``startrow`` in a Pandas ExcelWriter's sheet,
+    return the first row of the next block."""
+    if title is not None:
+        pandas.DataFrame([[title]]).to_excel(
+            writer, sheet_name=sheet_name, header=False, index=False,
+            startrow=startrow)
+        startrow += 1
+    dataframe.to_excel(writer, sheet_name=sheet_name, header=headers,
+                       index=headers, startrow=startrow)
+    return startrow + len(dataframe) + int(headers) + 1
+
+
+def _append_block(worksheet, title, dataframe, headers=True,
+                  first_block=True):
+    """Append a platemap to a (write-only) openpyxl worksheet."""
+    if not first_block:
+        worksheet.append([])
+    if title is not None:
+        worksheet.append([title])
+    if headers:
+        worksheet.append([None] + list(dataframe.columns))
+    values = dataframe.to_numpy(dtype=object).tolist()
+    for rowname, row in zip(dataframe.index, values):
+        row = [_excel_cell_value(value) for value in row]
+        worksheet.append(([rowname] + row) if headers else row)
+
+
+def write_platemaps_to_excel(filepath, sheets, headers=True):
+    """Write platemap dataframes to the sheets of an Excel file.
+
+    Parameters
+    ----------
+
+    filepath
+      Path to a ".xlsx" file, or a Pandas ExcelWriter object.
+
+    sheets
+      A list of ``(sheet_name, blocks)`` where ``blocks`` is a list of
+      ``(title, dataframe)`` platemaps written one below the other (with
+      title above the dataframe if the title is not None, and an empty line
+      between blocks).
+
+    headers
+      If true, the row names and column numbers are written.
+
+    With a file path, the workbook is written with openpyxl's write-only
+    mode, which streams the rows to the file with a constant memory usage.
+    """
+    if isinstance(filepath, pandas.ExcelWriter):
+        for sheet_name, blocks in sheets:
+            startrow = 0
+            for title, dataframe in blocks:
+                startrow = _write_block_with_pandas(
+                    filepath, sheet_name, startrow, title, dataframe,
+                    headers=headers)
+        return
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    for sheet_name, blocks in sheets:
+        worksheet = workbook.create_sheet(title=sheet_name)
+        for i, (title, dataframe) in enumerate(blocks):
+            _append_block(worksheet, title, dataframe, headers=headers,
+                          first_block=(i == 0))
+    workbook.save(filepath)
+
+
 def plate_to_platemap_spreadsheet(plate, wellinfo_function, filepath=None,
                                   sheet_name='plate_map', headers=True):
     """Generate a spreadsheet with a map of the plate.
@@ -36,28 +187,185 @@ def plate_to_platemap_spreadsheet(plate, wellinfo_function, filepath=None,
 
         """
 
-    platedict = defaultdict(lambda *a: {})
-    for well in plate:
-        info = wellinfo_function(well)
-        platedict[well.column][number_to_rowname(well.row)] = info
-    dataframe = pandas.DataFrame.from_dict(platedict)
+    grid = plate_to_platemap_grids(plate, [(sheet_name, wellinfo_function)])
+    dataframe = platemap_grid_to_dataframe(grid[sheet_name])
     if filepath is None:
         return dataframe
     elif str(filepath).lower().endswith(".csv"):
         dataframe.to_csv(filepath, header=headers, index=headers)
     else:
-        dataframe.to_excel(filepath, sheet_name=sheet_name, header=headers,
-                           index=headers)
-
-def plate_to_pandas_dataframe(plate, fields=None, direction='row'):
-    """Return a dataframe with the info on each well"""
-    dataframe = pandas.DataFrame.from_records(plate.to_dict()["wells"]).T
-    by = (["row", "column"] if direction == 'row' else ['column', 'row'])
-    dataframe = dataframe.sort_values(by=by)
+        write_platemaps_to_excel(filepath, [(sheet_name, [(None, dataframe)])],
+                                 headers=headers)
+
+
+def plate_to_columns(plate, fields=None, direction='row'):
+    """Return a dict {column_name: values} with the info on each well.
+
+    The columns are built in a single pass over the wells, ordered by row or
+    by column (``direction``). The columns are ``name``, ``row``, ``column``
+    (arrays of well names, row and column numbers), ``volume`` (array of the
+    content volumes), ``quantities`` (list of dicts {component: quantity}),
+    and one list per data field of the wells (with NaN for wells without this
+    field). Data fields named like another column are in a column with a
+    ``data.`` prefix (e.g. ``data.volume``, see ``data_field_to_column``).
+    If ``fields`` is provided, only these columns are returned (and only
+    these data fields are collected), in this order.
+    """
+    wells = list(plate.iter_wells(direction=direction))
+    wellnames = np.array([well.name for well in wells], dtype=object)
+    n_wells = len(wells)
+    selected = None if fields is None else set(fields)
+    rows = np.empty(n_wells, dtype=int)
+    columns = np.empty(n_wells, dtype=int)
+    volumes = np.empty(n_wells, dtype=float)
+    quantities = []
+    data_columns = OrderedDict()
+    column_names = {}
+    for i, well in enumerate(wells):
+        rows[i] = well.row
+        columns[i] = well.column
+        volumes[i] = well.content.volume
+        quantities.append(dict(well.content._quantities or {}))
+        for field, value in (well._data or {}).items():
+            column_name = column_names.get(field, None)
+            if column_name is None:
+                column_name = column_names[field] = data_field_to_column(
+                    field, WELL_COLUMNS + ("content",))
+            if (selected is not None) and (column_name not in selected):
+                continue
+            if column_name not in data_columns:
+                data_columns[column_name] = [np.nan] * n_wells
+            data_columns[column_name][i] = value
+    result = OrderedDict([
+        ("name", wellnames), ("row", rows), ("column", columns),
+        ("volume", volumes), ("quantities", quantities)
+    ])
+    result.update(data_columns)
+    if fields is not None:
+        if "content" in fields:
+            result["content"] = [
+                {"volume": volume, "quantities": well_quantities}
+                for volume, well_quantities in zip(volumes, quantities)
+            ]
+        result = OrderedDict([
+            (field, result[field]) for field in fields if field in result
+        ])
+    return result
+
+
+def plate_to_pandas_dataframe(plate, fields=None, direction='row',
+                              split_content=False):
+    """Return a dataframe with the info on each well.
+
+    The dataframe is indexed by well name and ordered by row or by column
+    (``direction``). It has columns ``name``, ``content`` (dicts {volume: v,
+    quantities: {...}}), ``row``, ``column``, and one column per data field
+    of the wells, with NaN for wells without this field (a data field named
+    like one of the first columns gives the value of this column for the
+    wells which have this field, as in ``Well.to_dict``). All columns have
+    the ``object`` dtype, so values are kept as they are (e.g. None). If
+    ``fields`` is provided, only these columns are returned.
+
+    With ``split_content=True``, the dataframe has the columns of
+    ``plate_to_columns`` instead: ``content`` is replaced by ``volume`` and
+    ``quantities`` columns (``content`` can still be requested in
+    ``fields``), data fields named like these columns get a ``data.``
+    prefix, and columns have inferred dtypes (faster, and better for
+    computations).
+    """
+    if split_content:
+        columns = plate_to_columns(plate, fields=fields, direction=direction)
+        index = [well.name for well in plate.iter_wells(direction=direction)]
+        dataframe = pandas.DataFrame(columns, index=index)
+        if fields is not None:
+            dataframe = dataframe[[f for f in fields if f in columns]]
+        return dataframe
+    wells = list(plate.iter_wells(direction=direction))
+    index = [well.name for well in wells]
+    columns = OrderedDict([
+        ("name", index),
+        ("content", [well.content.to_dict() for well in wells]),
+        ("row", [well.row for well in wells]),
+        ("column", [well.column for well in wells]),
+    ])
+    selected = None if fields is None else set(fields)
+    for i, well in enumerate(wells):
+        for field, value in (well._data or {}).items():
+            if (selected is not None) and (field not in selected):
+                continue
+            if field not in columns:
+                columns[field] = [np.nan] * len(wells)
+            columns[field][i] = value
+    dataframe = pandas.DataFrame(OrderedDict([
+        (name, pandas.Series(values, index=index, dtype=object))
+        for name, values in columns.items()
+    ]))
     if fields is not None:
         dataframe = dataframe[fields]
     return dataframe
 
+
+def _is_missing(value):
+    return (value is None) or (isinstance(value, float) and np.isnan(value))
+
+
+def columns_to_arrow_table(columns, metadata=None):
+    """Return a pyarrow Table from a dict {column_name: values}, as returned
+    by ``plate_to_columns``.
+
+    ``quantities`` becomes a map<string, double> column, and the columns
+    whose values pyarrow cannot convert to a single type are stored as
+    strings (NaN and None values become nulls).
+    """
+    if not PYARROW_AVAILABLE:
+        raise ImportError("Install pyarrow to export plates to Arrow.")
+    arrays = OrderedDict()
+    for name, values in columns.items():
+        if name == "quantities":
+            arrays[name] = pyarrow.array(
+                [list(q.items()) for q in values],
+                type=pyarrow.map_(pyarrow.string(), pyarrow.float64()))
+        elif name == "name":
+            arrays[name] = pyarrow.array(list(values), type=pyarrow.string())
+        else:
+            try:
+                arrays[name] = pyarrow.array(values, from_pandas=True)
+            except (pyarrow.ArrowInvalid, pyarrow.ArrowTypeError):
+                arrays[name] = pyarrow.array([
+                    None if _is_missing(value) else str(value)
+                    for value in values
+                ], type=pyarrow.string())
+    return pyarrow.table(arrays, metadata=metadata)
+
+
+def plate_to_arrow_table(plate, fields=None, direction='row'):
+    """Return a pyarrow Table with the info on each well.
+
+    The columns are the same as with ``plate_to_pandas_dataframe``, with
+    ``quantities`` as a map<string, double> column. Data fields whose values
+    pyarrow cannot convert to a single type are stored as strings.
+    """
+    if not PYARROW_AVAILABLE:
+        raise ImportError("Install pyarrow to export plates to Arrow.")
+    columns = plate_to_columns(plate, fields=fields, direction=direction)
+    return columns_to_arrow_table(columns)
+
+
+def _content_wellinfo_functions(content_type=None, volume_unit='uL',
+                                 concentration_unit='ng-uL'):
+    volume_factor = unit_factors[volume_unit]
+    c_mass, c_vol = concentration_unit.split('-')
+    concentration_factor = unit_factors[c_mass] / unit_factors[c_vol]
+    return [
+        (('content (%s)' % content_type) if content_type else 'content',
+         lambda w: w.content.components_as_string()),
+        ('volume (%s)' % volume_unit,
+         lambda w: w.content.volume / volume_factor),
+        ('concentration (%s)' % concentration_unit,
+         lambda w: w.content.concentration() / concentration_factor)
+    ]
+
+
 def plate_to_content_spreadsheet(plate, filepath, content_type=None,
                                  volume_unit='uL',
                                  concentration_unit='ng-uL'):
@@ -81,21 +389,57 @@ def plate_to_content_spreadsheet(plate, filepath, content_type=None,
     filepath
       Path to the excel spreadsheet to write. An Excel writer also works.
     """
+    functions = _content_wellinfo_functions(
+        content_type=content_type, volume_unit=volume_unit,
+        concentration_unit=concentration_unit)
+    grids = plate_to_platemap_grids(plate, functions)
+    write_platemaps_to_excel(filepath, [
+        (name, [(None, platemap_grid_to_dataframe(grid))])
+        for name, grid in grids.items()
+    ])
 
-    volume_factor = unit_factors[volume_unit]
-    c_mass, c_vol = concentration_unit.split('-')
-    concentration_factor = unit_factors[c_mass] / unit_factors[c_vol]
 
-    functions = [
-        (('content (%s)' % content_type) if content_type else 'content',
-         lambda w: w.content.components_as_string()),
-        ('volume (%s)' % volume_unit,
-        lambda w: w.content.volume / volume_factor),
-        ('concentration (%s)' % concentration_unit,
-        lambda w: w.content.concentration() / concentration_factor)
-    ]
-    writer = pandas.ExcelWriter(filepath)
-    for name, fun in functions:
-        plate_to_platemap_spreadsheet(plate, fun, sheet_name=name,
-                                      filepath=writer)
-    writer.close()
+def plates_to_content_spreadsheet(plates, filepath, content_type=None,
+                                  volume_unit='uL',
+                                  concentration_unit='ng-uL'):
+    """Write many plates into Excel 'content', 'volume', 'concentration' sheets.
+
+    Each sheet has the platemaps of all plates one below the other, each
+    platemap being preceded by the plate's name (see
+    ``plate_to_content_spreadsheet`` for the content of the sheets). The
+    workbook is streamed to the file, so that large plate libraries can be
+    exported with a low memory usage.
+
+    Parameters
+    ----------
+    plates
+      List of plates to be written.
+
+    filepath
+      Path to the excel spreadsheet to write. An Excel writer also works.
+    """
+    functions = _content_wellinfo_functions(
+        content_type=content_type, volume_unit=volume_unit,
+        concentration_unit=concentration_unit)
+    sheet_names = [name for name, _ in functions]
+    if isinstance(filepath, pandas.ExcelWriter):
+        startrows = [0 for name in sheet_names]
+        for plate in plates:
+            grids = plate_to_platemap_grids(plate, functions)
+            for i, (name, grid) in enumerate(grids.items()):
+                startrows[i] = _write_block_with_pandas(
+                    filepath, name, startrows[i], plate.name,
+                    platemap_grid_to_dataframe(grid))
+        return
+    from openpyxl import Workbook
+    workbook = Workbook(write_only=True)
+    worksheets = [workbook.create_sheet(title=name) for name in sheet_names]
+    # The grids of each plate are written to all sheets before the next plate
+    # is processed, so only one plate's grids are in memory at a time.
+    for i, plate in enumerate(plates):
+        grids = plate_to_platemap_grids(plate, functions)
+        for worksheet, grid in zip(worksheets, grids.values()):
+            _append_block(worksheet, plate.name,
+                          platemap_grid_to_dataframe(grid),
+                          first_block=(i == 0))
+    workbook.save(filepath)
@@ -0,0 +1,216 @@
+"""Columnar (Arrow IPC or Parquet) files for archiving plates and picklists.
+
+The files can be read back into Plate and PickList objects with the parsers
+``plates_from_arrow_file`` and ``picklist_from_arrow_file``.
+"""
+
+from collections import OrderedDict
+import json
+
+import numpy as np
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+from .plate_to_tables import (plate_to_columns, columns_to_arrow_table,
+                              data_field_to_column)
+
+ARROW_METADATA_KEY = b"plateo"
+TRANSFER_COLUMNS = ("source_plate", "source_well", "destination_plate",
+                    "destination_well", "volume")
+
+
+def plate_to_metadata(plate):
+    """Return a JSON-friendly dict with the name, class, dimensions and data
+    of the plate (but not its wells)."""
+    return {
+        "name": plate.name,
+        "class": plate.__class__.__name__,
+        "num_rows": plate.num_rows,
+        "num_columns": plate.num_columns,
+        "data": plate.data
+    }
+
+
+def _table_metadata(metadata):
+    return {ARROW_METADATA_KEY: json.dumps(metadata, default=str)}
+
+
+def _concatenate_columns(columns_list):
+    """Merge dicts {column: values} into one, with NaN for missing values."""
+    lengths = [len(columns["name"]) for columns in columns_list]
+    fields = OrderedDict()
+    for columns in columns_list:
+        for field in columns:
+            fields[field] = True
+    result = OrderedDict()
+    for field in fields:
+        parts = [
+            columns[field] if field in columns else [np.nan] * length
+            for columns, length in zip(columns_list, lengths)
+        ]
+        if all(isinstance(part, np.ndarray) for part in parts):
+            result[field] = np.concatenate(parts)
+        else:
+            result[field] = [value for part in parts for value in part]
+    return result
+
+
+def plates_to_arrow_table(plates, direction="row"):
+    """Return a pyarrow Table with one row per well of each plate.
+
+    The columns are ``plate`` (index of the well's plate in ``plates``),
+    then the columns of ``plate_to_arrow_table`` (``name``, ``row``,
+    ``column``, ``volume``, ``quantities``, and one column per data field of
+    the wells). The name, class, dimensions and data of each plate are
+    stored in the table's schema metadata, as JSON.
+    """
+    if not PYARROW_AVAILABLE:
+        raise ImportError("Install pyarrow to export plates to Arrow.")
+    columns_list = []
+    for i, plate in enumerate(plates):
+        columns = plate_to_columns(plate, direction=direction)
+        plate_column = [("plate", np.full(plate.num_wells, i))]
+        columns_list.append(OrderedDict(plate_column + list(columns.items())))
+    if len(columns_list) == 0:
+        columns = OrderedDict([("plate", np.array([], dtype=int)),
+                               ("name", []),
+                               ("row", np.array([], dtype=int)),
+                               ("column", np.array([], dtype=int)),
+                               ("volume", np.array([])),
+                               ("quantities", [])])
+    else:
+        columns = _concatenate_columns(columns_list)
+    metadata = {
+        "type": "plates",
+        "plates": [plate_to_metadata(plate) for plate in plates]
+    }
+    return columns_to_arrow_table(columns,
+                                  metadata=_table_metadata(metadata))
+
+
+def picklist_to_arrow_table(picklist):
+    """Return a pyarrow Table with one row per transfer of the picklist.
+
+    The columns are ``source_plate`` and ``destination_plate`` (indices of
+    the plates in ``picklist.list_plates()``), ``source_well``,
+    ``destination_well`` (well names), ``volume``, and one column per field
+    of the transfers' data (with a ``data.`` prefix for fields named like
+    another column, see ``data_field_to_column``). The name, class,
+    dimensions and data of each plate, and the data of the picklist, are
+    stored in the table's schema metadata, as JSON.
+    """
+    if not PYARROW_AVAILABLE:
+        raise ImportError("Install pyarrow to export picklists to Arrow.")
+    plates = picklist.list_plates()
+    plate_indices = {plate: i for i, plate in enumerate(plates)}
+    transfers = picklist.transfers_list
+    n_transfers = len(transfers)
+    source_plates = np.empty(n_transfers, dtype=int)
+    destination_plates = np.empty(n_transfers, dtype=int)
+    volumes = np.empty(n_transfers, dtype=float)
+    source_wells, destination_wells = [], []
+    data_columns = OrderedDict()
+    for i, transfer in enumerate(transfers):
+        source_plates[i] = plate_indices[transfer.source_well.plate]
+        destination_plates[i] = plate_indices[transfer.destination_well.plate]
+        volumes[i] = transfer.volume
+        source_wells.append(transfer.source_well.name)
+        destination_wells.append(transfer.destination_well.name)
+        for field, value in (transfer.data or {}).items():
+            column_name = data_field_to_column(field, TRANSFER_COLUMNS)
+            if column_name not in data_columns:
+                data_columns[column_name] = [np.nan] * n_transfers
+            data_columns[column_name][i] = value
+    columns = OrderedDict([
+        ("source_plate", source_plates), ("source_well", source_wells),
+        ("destination_plate", destination_plates),
+        ("destination_well", destination_wells), ("volume", volumes)
+    ])
+    columns.update(data_columns)
+    metadata = {
+        "type": "picklist",
+        "plates": [plate_to_metadata(plate) for plate in plates],
+        "data": picklist.data
+    }
+    return columns_to_arrow_table(columns,
+                                  metadata=_table_metadata(metadata))
+
+
+def arrow_table_to_file(table, filepath, file_format="infer"):
+    """Write a pyarrow Table to a file.
+
+    ``file_format`` is either "parquet" (compressed, most compact) or "arrow"
+    (Arrow IPC file, uncompressed, which can be memory-mapped and read
+    without copies). By default, files with a ``.parquet`` or ``.pq``
+    extension are written in Parquet, all others in Arrow IPC.
+    """
+    if file_format == "infer":
+        extension = str(filepath).lower().split(".")[-1]
+        file_format = "parquet" if extension in ("parquet", "pq") else "arrow"
+    if file_format == "parquet":
+        pyarrow.parquet.write_table(table, str(filepath))
+    elif file_format == "arrow":
+        with pyarrow.OSFile(str(filepath), "wb") as sink:
+            with pyarrow.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+    else:
+        raise ValueError("Unknown file format: %s" % file_format)
+
+
+def plates_to_arrow_file(plates, filepath, file_format="infer",
+                         direction="row"):
+    """Write the wells of several plates to an Arrow IPC or Parquet file.
+
+    The file can be read back into plates with ``plates_from_arrow_file``.
+    The volumes, quantities and data of the wells are stored (see
+    ``plates_to_arrow_table``), but not the sources of the wells.
+
+    Parameters
+    ----------
+
+    plates
+      A list of Plate objects.
+
+    filepath
+      Path of the file to write.
+
+    file_format
+      Either "parquet" or "arrow" (see ``arrow_table_to_file``). By default,
+      Parquet is used for ``.parquet`` files, Arrow IPC for other files.
+
+    direction
+      Order ("row" or "column") in which the wells are written.
+    """
+    table = plates_to_arrow_table(plates, direction=direction)
+    arrow_table_to_file(table, filepath, file_format=file_format)
+
+
+def picklist_to_arrow_file(picklist, filepath, file_format="infer"):
+    """Write the transfers of a picklist to an Arrow IPC or Parquet file.
+
+    The file can be read back into a picklist with
+    ``picklist_from_arrow_file``. Only the names and data of the plates are
+    stored (see ``picklist_to_arrow_table``), use ``plates_to_arrow_file``
+    to also archive their wells.
+
+    Parameters
+    ----------
+
+    picklist
+      A PickList object.
+
+    filepath
+      Path of the file to write.
+
+    file_format
+      Either "parquet" or "arrow" (see ``arrow_table_to_file``). By default,
+      Parquet is used for ``.parquet`` files, Arrow IPC for other files.
+    """
+    table = picklist_to_arrow_table(picklist)
+    arrow_table_to_file(table, filepath, file_format=file_format)
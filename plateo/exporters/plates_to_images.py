@@ -0,0 +1,229 @@
+"""Batch export of many plates as images: one file per plate, or a tiled
+contact sheet."""
+
+import os
+import time
+
+import numpy as np
+from tqdm import tqdm
+
+try:
+    import matplotlib.pyplot as plt
+    from matplotlib.figure import Figure
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    MATPLOTLIB_AVAILABLE = True
+except ImportError:
+    MATPLOTLIB_AVAILABLE = False
+
+from ..tools import parallel_imap
+
+
+class PlateImageMaker:
+    """Render plates as images, reusing a single figure.
+
+    Parameters
+    ----------
+
+    plotter
+      Either a matplotlib-based plotter (PlateColorsPlotter, etc.), or a
+      raster renderer with a ``render(plate)`` method returning an RGB array
+      (such as PlateColorsRasterizer), which is much faster.
+
+    figsize, dpi
+      Size (in inches) and resolution of the figure, for matplotlib plotters.
+
+    titles
+      If true, the plates' names are used as titles (matplotlib plotters
+      only).
+    """
+
+    def __init__(self, plotter, figsize=(6, 4), dpi=80, titles=True):
+        self.plotter = plotter
+        self.figsize = figsize
+        self.dpi = dpi
+        self.titles = titles
+        self.is_raster = hasattr(plotter, "render")
+        self.figure = None
+
+    def _plot(self, plate):
+        """Plot the plate on the figure (created at the first call) and return
+        the figure."""
+        if self.figure is None:
+            if not MATPLOTLIB_AVAILABLE:
+                raise IOError("Install Matplotlib to be able to plot")
+            fig = Figure(figsize=self.figsize, dpi=self.dpi, facecolor="white")
+            FigureCanvasAgg(fig)
+            ax = fig.add_subplot(111)
+            self.figure = fig, ax, ax.get_position()
+        fig, ax, position = self.figure
+        # Remove the colorbars and insets of the previous plate.
+        for other_ax in fig.axes:
+            if other_ax is not ax:
+                other_ax.remove()
+        ax.clear()
+        ax.set_position(position)
+        self.plotter.plot_plate(plate, ax=ax)
+        if self.titles and plate.name is not None:
+            ax.set_title(plate.name)
+        return fig
+
+    def image(self, plate):
+        """Return an RGB array of the plate's image."""
+        if self.is_raster:
+            return self.plotter.render(plate)
+        fig = self._plot(plate)
+        fig.canvas.draw()
+        return np.array(fig.canvas.buffer_rgba())[:, :, :3]
+
+    def write(self, plate, filepath):
+        """Write the plate's image to a file (PNG, or any other format
+        supported by matplotlib, depending on the file's extension)."""
+        if self.is_raster:
+            plt.imsave(filepath, self.plotter.render(plate))
+        else:
+            self._plot(plate).savefig(filepath, facecolor="white")
+
+
+def _run_batch(plates, function, n_jobs, progress_bar):
+    """Return (results, report) where results are the function's results
+    for the indices of the plates, and report has throughput figures."""
+    t0 = time.time()
+    results = parallel_imap(function, range(len(plates)), n_jobs=n_jobs)
+    if progress_bar:
+        results = tqdm(results, total=len(plates), unit="plate")
+    results = list(results)
+    duration = time.time() - t0
+    report = {
+        "n_plates": len(plates),
+        "duration": duration,
+        "plates_per_second": len(plates) / duration if duration else np.inf
+    }
+    return results, report
+
+
+def plates_to_image_files(plates, plotter, target_directory, filenames=None,
+                          extension="png", figsize=(6, 4), dpi=80,
+                          titles=True, n_jobs=1, progress_bar=False):
+    """Write one image file per plate.
+
+    Parameters
+    ----------
+
+    plates
+      A list of Plate objects.
+
+    plotter
+      A matplotlib plotter (PlateColorsPlotter, etc.) or a raster renderer
+      (PlateColorsRasterizer), see ``PlateImageMaker``.
+
+    target_directory
+      Directory where to write the images (created if needed).
+
+    filenames
+      List of file names, one per plate. By default, the plates' names are
+      used if they are all different, else names such as "plate_001".
+
+    extension
+      Format of the files when the file names are not provided.
+
+    figsize, dpi, titles
+      Parameters of the figure (see ``PlateImageMaker``).
+
+    n_jobs
+      Number of processes rendering the plates (None for as many processes as
+      CPUs). Each process reuses a single figure for all its plates.
+
+    progress_bar
+      If true, display a progress bar with the rendering throughput.
+
+    Returns
+    -------
+
+    report
+      A dict with the list of the ``filepaths`` written, the number of plates
+      ``n_plates``, the ``duration`` of the export in seconds, and the
+      throughput ``plates_per_second``.
+    """
+    if filenames is None:
+        names = [plate.name for plate in plates]
+        if (None in names) or (len(set(names)) < len(names)):
+            names = ["plate_%03d" % (i + 1) for i in range(len(plates))]
+        filenames = ["%s.%s" % (name, extension) for name in names]
+    if not os.path.exists(target_directory):
+        os.makedirs(target_directory)
+    filepaths = [os.path.join(target_directory, f) for f in filenames]
+    maker = PlateImageMaker(plotter, figsize=figsize, dpi=dpi, titles=titles)
+
+    def write_image(i):
+        maker.write(plates[i], filepaths[i])
+        return filepaths[i]
+
+    filepaths, report = _run_batch(plates, write_image, n_jobs, progress_bar)
+    report["filepaths"] = filepaths
+    return report
+
+
+def plates_to_contact_sheet(plates, plotter, filepath=None, n_columns=None,
+                            padding=10, background_color=(255, 255, 255),
+                            figsize=(6, 4), dpi=80, titles=True, n_jobs=1,
+                            progress_bar=False):
+    """Tile the images of many plates into a single image.
+
+    Parameters
+    ----------
+
+    plates
+      A list of Plate objects, tiled row by row.
+
+    plotter
+      A matplotlib plotter (PlateColorsPlotter, etc.) or a raster renderer
+      (PlateColorsRasterizer), see ``PlateImageMaker``.
+
+    filepath
+      Optional path of an image file where to write the contact sheet.
+
+    n_columns
+      Number of plates per row of the sheet. By default the sheet is about
+      square.
+
+    padding
+      Space between the images, in pixels.
+
+    background_color
+      RGB color (0-255) of the sheet's background.
+
+    figsize, dpi, titles, n_jobs, progress_bar
+      See ``plates_to_image_files``.
+
+    Returns
+    -------
+
+    report
+      A dict with the contact sheet ``image`` (RGB array), the number of
+      plates ``n_plates``, the ``duration`` of the export in seconds, and
+      the throughput ``plates_per_second``.
+    """
+    if len(plates) == 0:
+        raise ValueError("No plates to put in the contact sheet.")
+    maker = PlateImageMaker(plotter, figsize=figsize, dpi=dpi, titles=titles)
+    images, report = _run_batch(
+        plates, lambda i: maker.image(plates[i]), n_jobs, progress_bar)
+    if n_columns is None:
+        n_columns = int(np.ceil(np.sqrt(len(images))))
+    n_rows = int(np.ceil(len(images) / float(n_columns)))
+    cell_height = max(image.shape[0] for image in images)
+    cell_width = max(image.shape[1] for image in images)
+    sheet = np.empty((n_rows * (cell_height + padding) + padding,
+                      n_columns * (cell_width + padding) + padding, 3),
+                     dtype=np.uint8)
+    sheet[:] = background_color
+    for i, image in enumerate(images):
+        row, column = divmod(i, n_columns)
+        top = padding + row * (cell_height + padding)
+        left = padding + column * (cell_width + padding)
+        height, width, _ = image.shape
+        sheet[top:top + height, left:left + width] = image
+    if filepath is not None:
+        plt.imsave(filepath, sheet)
+    report["image"] = sheet
+    return report
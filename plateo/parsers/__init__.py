@@ -2,7 +2,8 @@
 
 from .plate_from_aati_fragment_analyzer import (
     plate_from_aati_fragment_analyzer_peaktable,
-    plate_from_aati_fragment_analyzer_zip
+    plate_from_aati_fragment_analyzer_zip,
+    wells_with_band_near
 )
 
 from .picklist_from_labcyte_echo_logfile import \
@@ -13,6 +14,9 @@ from .picklist_from_tecan_evo_picklist_file import \
 
 from .plate_from_nanodrop_xml_file import plate_from_nanodrop_xml_file
 
+from .plate_from_roche_lightcycler_qPCR import \
+    plate_from_roche_lightcycler_qPCR
+
 from .plate_volumes_from_labcyte_echo_files import (
     plate_volumes_from_labcyte_echo_logfile,
     plate_volumes_from_labcyte_echo_survey,
@@ -31,4 +35,11 @@ from .plate_from_tables import (
 
 from .plates_from_geneart_shipment_layout_sheet import (
     plates_from_geneart_shipment_layout_sheet
-)
\ No newline at end of file
+)
+
+from .plates_from_arrow_files import (
+    plates_from_arrow_file,
+    picklist_from_arrow_file,
+    plates_from_arrow_table,
+    picklist_from_arrow_table
+)
@@ -1,5 +1,5 @@
 """Misc. file parsers that are useful for other parsers"""
-from xml.sax import saxutils, parse, parseString
+from xml.sax import saxutils, parse, parseString, make_parser
 
 class ExcelHandler(saxutils.handler.ContentHandler):
     """
@@ -51,3 +51,102 @@ def parse_excel_xml(xml_file=None, xml_string=None):
         raise ValueError("At least one of xml_file or xml_string should be"
                          " provided.")
     return handler.tables
+
+
+class StreamingExcelHandler(ExcelHandler):
+    """Excel XML handler which stores finished rows in a buffer instead of
+    collecting whole tables.
+
+    Each finished row is appended to ``self.buffer`` as a tuple
+    ``(table_index, cells)``, and the buffer is emptied by the caller as the
+    parsing goes.
+    """
+
+    def __init__(self):
+        ExcelHandler.__init__(self)
+        self.buffer = []
+        self.table_index = -1
+
+    def startElement(self, name, atts):
+        ExcelHandler.startElement(self, name, atts)
+        if name == "Table":
+            self.table_index += 1
+
+    def endElement(self, name):
+        if name == "Cell":
+            self.cells.append(''.join(self.chars))
+        elif name == "Row":
+            self.buffer.append((self.table_index, self.cells))
+
+
+def iter_excel_xml_rows(xml_file=None, xml_string=None, max_tables=None,
+                        chunk_size=2 ** 16):
+    """Iterate over the rows of the tables of an Excel XML as it is parsed.
+
+    Yields tuples ``(table_index, cells)`` where ``cells`` is the list of the
+    row's cells contents. The file is parsed incrementally, by chunks, so
+    the parsing stops as soon as ``max_tables`` tables have been read.
+
+    Provide either the path to (or file object of) an XML file, or a string of
+    XML content.
+    """
+    def read_chunks(f):
+        chunk = f.read(chunk_size)
+        while chunk:
+            yield chunk
+            chunk = f.read(chunk_size)
+
+    if xml_file is not None:
+        if hasattr(xml_file, "read"):
+            def chunks():
+                return read_chunks(xml_file)
+        else:
+            def chunks():
+                with open(xml_file, "rb") as f:
+                    for chunk in read_chunks(f):
+                        yield chunk
+    elif xml_string is not None:
+        def chunks():
+            return [xml_string]
+    else:
+        raise ValueError("At least one of xml_file or xml_string should be"
+                         " provided.")
+    handler = StreamingExcelHandler()
+    parser = make_parser()
+    parser.setContentHandler(handler)
+    for chunk in chunks():
+        parser.feed(chunk)
+        for table_index, cells in handler.buffer:
+            if (max_tables is not None) and (table_index >= max_tables):
+                return
+            yield table_index, cells
+        handler.buffer = []
+    parser.close()
+    for table_index, cells in handler.buffer:
+        if (max_tables is None) or (table_index < max_tables):
+            yield table_index, cells
+
+
+def excel_xml_table_to_columns(xml_file=None, xml_string=None, table_index=0):
+    """Return a dict ``{header: [values]}`` of the columns of an XML table.
+
+    The first row of the table is used as header, and rows which do not have
+    as many cells as the header are ignored. The XML is only parsed until the
+    end of the requested table.
+    """
+    headers = None
+    columns = None
+    rows = iter_excel_xml_rows(xml_file=xml_file, xml_string=xml_string,
+                               max_tables=table_index + 1)
+    for index, cells in rows:
+        if index != table_index:
+            continue
+        if headers is None:
+            headers = cells
+            columns = [[] for header in headers]
+        elif len(cells) == len(headers):
+            for column, cell in zip(columns, cells):
+                column.append(cell)
+    if headers is None:
+        raise ValueError("No table %d found in the XML." % table_index)
+    return dict(zip(headers, columns))
@@ -137,9 +137,6 @@ def picklist_from_labcyte_echo_logfile(logfile=None, logcontent=None,
         add_plates_from_metadata(transfer.data, plates_dict)
     for transfer in all_transfers:
         meta = transfer.data
-        transfer.source_plate = plates_dict[meta["Source Plate Name"]]
-        transfer.destination_plate = plates_dict[
-            meta["Destination Plate Name"]]
         obsolete_fields = [
             field for field in meta
             if any(e in field for e in ("Plate Name", "Plate Type",
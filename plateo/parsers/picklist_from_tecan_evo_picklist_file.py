@@ -1,12 +1,47 @@
 """Read a .gwl picklist"""
 
+import numpy as np
 import pandas
-from ..tools import index_to_wellname
-from ..PickList import PickList
+from ..tools import wellnames_by_index, unit_factors
+from ..PickList import PickList, Transfer
 
-def picklist_from_tecan_evo_picklist_file(filename, plates_dict):
+GWL_COLUMNS = [
+    "Action", "RackLabel", "RackID", "RackType",
+    "Position", "TubeID", "Volume", "LiquidClass",
+    "TipType", "TipMask"
+]
+
+
+def _wells_at_positions(rack_labels, positions, plates_dict):
+    """Return an array of the wells at the given (column-wise) positions."""
+    positions = positions.astype(float).astype(int)
+    wells = np.empty(len(rack_labels), dtype=object)
+    for label in np.unique(rack_labels):
+        selected = rack_labels == label
+        plate = plates_dict[label]
+        wellnames = wellnames_by_index(plate.num_wells, direction="column")
+        wells[selected] = [
+            plate.wells[name]
+            for name in wellnames[positions[selected] - 1]
+        ]
+    return wells
+
+
+def picklist_from_tecan_evo_picklist_file(filename, plates_dict,
+                                          volume_unit="L"):
     """Read a .gwl file into a PickList
 
+    Each dispense line (D) is paired with the last aspirate line (A) before
+    it, so multi-dispense blocks (one aspirate followed by several dispenses)
+    produce one transfer per dispense. Other lines (wash W, comments C,
+    breaks B, etc.) are ignored.
+
+    The volumes of the transfers are in liters, like all volumes in Plateo
+    (e.g. those given to ``picklist_to_tecan_evo_picklist_file``), converted
+    from the microliters of the file. Note that previous versions returned
+    the microliters of the file unconverted: use ``volume_unit="uL"`` to
+    keep this behaviour.
+
     Parameters
     ----------
 
@@ -17,30 +52,33 @@ def picklist_from_tecan_evo_picklist_file(filename, plates_dict):
       A dictionnary linking the plate names inside the file to plate objects
       For instance { "PrimersPlate": primers_plate, "SeqDestPlate": ... }
 
+    volume_unit
+      Unit of the volumes of the returned transfers, "L" (default), "mL",
+      "uL" or "nL".
     """
-    df = pandas.read_csv(filename, sep=";", header=None)
-    df.columns = [
-        "Action", "RackLabel", "RackID", "RackType",
-        "Position", "TubeID", "Volume", "LiquidClass",
-        "TipType", "TipMask"
-    ]
-
-    picklist = PickList()
-    for i, row in df.iterrows():
-        if row.Action == "A":
-            source_plate = plates_dict[row.RackLabel]
-            source_well_name = index_to_wellname(
-                int(row.Position), num_wells=source_plate.num_wells,
-                direction="column"
-            )
-            source_well = source_plate[source_well_name]
-        if row.Action == "D":
-            dest_plate = plates_dict[row.RackLabel]
-            dest_well_name = index_to_wellname(
-                int(row.Position), num_wells=dest_plate.num_wells,
-                direction="column"
-            )
-            dest_well = dest_plate[dest_well_name]
-            picklist.add_transfer(source_well, dest_well,
-                                  volume=float(row.Volume))
-    return picklist
+    df = pandas.read_csv(filename, sep=";", header=None, names=GWL_COLUMNS,
+                         index_col=False, dtype=str, keep_default_na=False)
+    actions = df["Action"].str.strip().to_numpy()
+    aspirate_lines = np.flatnonzero(actions == "A")
+    dispense_lines = np.flatnonzero(actions == "D")
+    aspirate_indices = np.searchsorted(aspirate_lines, dispense_lines) - 1
+    if (aspirate_indices < 0).any():
+        first_line = dispense_lines[aspirate_indices < 0][0]
+        raise ValueError("Dispense on line %d has no prior aspirate line."
+                         % (first_line + 1))
+    source_lines = aspirate_lines[aspirate_indices]
+
+    labels = df["RackLabel"].to_numpy()
+    positions = df["Position"].to_numpy()
+    source_wells = _wells_at_positions(
+        labels[source_lines], positions[source_lines], plates_dict)
+    dest_wells = _wells_at_positions(
+        labels[dispense_lines], positions[dispense_lines], plates_dict)
+    volume_factor = unit_factors["uL"] / unit_factors[volume_unit]
+    volumes = (df["Volume"].to_numpy()[dispense_lines].astype(float) *
+               volume_factor)
+    return PickList([
+        Transfer(source_well, dest_well, volume)
+        for source_well, dest_well, volume
+        in zip(source_wells, dest_wells, volumes.tolist())
+    ])
@@ -1,14 +1,6 @@
+import io
 import zipfile
-import sys
-
-PYTHON3 = sys.version_info[0] == 3
-
-if PYTHON3:
-    from io import StringIO, BytesIO
-
-    StringIO = BytesIO
-else:
-    from StringIO import StringIO
+from collections.abc import Mapping
 
 import pandas
 import matplotlib.image as mpimg
@@ -16,6 +8,135 @@ import numpy as np
 from ..containers import Plate96
 
 
+class AATIPeakTable:
+    """Columnar representation of an AATI fragment analyzer peak table.
+
+    The bands of all wells are stored in a few shared arrays (one per column
+    of the original table), sorted by well, so that queries over all the
+    bands of a plate are vectorized. Per-well views are obtained with
+    ``well_bands(wellname)``.
+
+    Parameters
+    ----------
+
+    dataframe
+      A Pandas dataframe of the peak table, with (at least) columns ``Well``,
+      ``Peak ID``, ``Size (bp)`` and ``% (Conc.)``.
+    """
+
+    size_column = "Size (bp)"
+    concentration_column = "ng/ul"
+    rfu_column = "RFU"
+
+    def __init__(self, dataframe):
+        self.wellnames = dataframe["Well"].drop_duplicates().to_numpy()
+        bands = dataframe[dataframe["% (Conc.)"] > 0]
+        bands = bands.sort_values("Well", kind="stable")
+        self.columns = {
+            column: bands[column].to_numpy()
+            for column in bands.columns
+        }
+        wells = self.columns["Well"].astype(str)
+        names = self.wellnames.astype(str)
+        self.starts = np.searchsorted(wells, names, side="left")
+        self.ends = np.searchsorted(wells, names, side="right")
+        self._slices = {
+            name: slice(start, end)
+            for name, start, end in zip(self.wellnames, self.starts,
+                                        self.ends)
+        }
+
+    @property
+    def sizes(self):
+        return self.columns[self.size_column]
+
+    @property
+    def concentrations(self):
+        return self.columns[self.concentration_column]
+
+    @property
+    def rfus(self):
+        return self.columns[self.rfu_column]
+
+    def well_bands(self, wellname):
+        """Return a WellBands view on the bands of the given well."""
+        return WellBands(self, self._slices[wellname])
+
+    def wells_with_band_near(self, size, tolerance=0, min_concentration=0):
+        """Return the names of all wells with a band at ``size`` +/-
+        ``tolerance`` (in basepairs).
+
+        Only bands with a concentration (in ng/ul) strictly above
+        ``min_concentration`` are considered.
+        """
+        selected = np.abs(self.sizes - size) <= tolerance
+        if min_concentration:
+            selected &= self.concentrations > min_concentration
+        return sorted(set(self.columns["Well"][selected]))
+
+
+class WellBands(Mapping):
+    """Read-only view of the bands of one well in an AATIPeakTable.
+
+    It behaves like a dict ``{peak_id: {attrs}}`` (where the attrs dicts are
+    only built when accessed), and provides the columnar data of the well's
+    bands as array views with ``sizes``, ``concentrations``, ``rfus``, and
+    ``column(name)``.
+    """
+
+    def __init__(self, table, bands_slice):
+        self.table = table
+        self.slice = bands_slice
+
+    def column(self, name):
+        return self.table.columns[name][self.slice]
+
+    @property
+    def sizes(self):
+        return self.column(self.table.size_column)
+
+    @property
+    def concentrations(self):
+        return self.column(self.table.concentration_column)
+
+    @property
+    def rfus(self):
+        return self.column(self.table.rfu_column)
+
+    @property
+    def peak_ids(self):
+        return self.column("Peak ID")
+
+    def __getitem__(self, peak_id):
+        indices = (self.peak_ids == peak_id).nonzero()[0]
+        if len(indices) == 0:
+            raise KeyError(peak_id)
+        index = self.slice.start + indices[0]
+        return {
+            column: values[index:index + 1].tolist()[0]
+            for column, values in self.table.columns.items()
+            if column != "Peak ID"
+        }
+
+    def __iter__(self):
+        return iter(self.peak_ids.tolist())
+
+    def __len__(self):
+        return self.slice.stop - self.slice.start
+
+    def has_band_near(self, size, tolerance=0):
+        """Return True iff the well has a band at ``size`` +/- ``tolerance``.
+        """
+        return bool((np.abs(self.sizes - size) <= tolerance).any())
+
+    def to_dict(self):
+        """Return a dict ``{peak_id: {attrs}}`` of the well's bands."""
+        return {peak_id: self[peak_id] for peak_id in self}
+
+    def __repr__(self):
+        return "WellBands(%s)" % self.to_dict()
+
+
 def plate_from_aati_fragment_analyzer_peaktable(filename):
     """"Return a Plate96 object with a data field for the ``bands``.
 
@@ -26,6 +147,12 @@ def plate_from_aati_fragment_analyzer_peaktable(filename):
     attribute has fields such as ``Size (bp)``, ``% (Conc.)``, ``nmole/L``,
     ``ng/ul``, ``RFU``.
 
+    The "bands" of each well is a ``WellBands`` view on a columnar
+    ``AATIPeakTable`` stored in the plate's ``data["peak_table"]``. The attrs
+    dicts are only built when accessed, while the band sizes, concentrations
+    and RFUs are available as arrays (e.g. ``well.data.bands.sizes``). Use
+    ``wells_with_band_near`` for fast queries over all wells.
+
     Note that the concentration column name must be either ``% (Conc.)`` or
     ``% (Conc.) (ng/uL)``.
     """
@@ -37,41 +164,187 @@ def plate_from_aati_fragment_analyzer_peaktable(filename):
             "'% (Conc.) (ng/uL)'!"
         )
 
-    # Make into standard format for the loop in the next block:
+    # Make into standard format for the table in the next block:
     if "% (Conc.) (ng/uL)" in df.columns:
         df = df.rename(columns={"% (Conc.) (ng/uL)": "% (Conc.)"})
+    table = AATIPeakTable(df)
     wells = {
-        name: {
-            "bands": {
-                peak_id: row.to_dict()
-                for peak_id, row in d.set_index("Peak ID").iterrows()
-                if row["% (Conc.)"] > 0
-            }
-        }
-        for name, d in df.groupby(["Well"])
+        name: {"bands": table.well_bands(name)}
+        for name in table.wellnames
     }
-    return Plate96(wells_data=wells)
+    return Plate96(wells_data=wells, data={"peak_table": table})
 
 
-def plate_from_aati_fa_gel_image(filename):
+def wells_with_band_near(plate, size, tolerance=0, min_concentration=0):
+    """Return the wells of an AATI plate with a band at ``size`` +/-
+    ``tolerance`` (in basepairs).
+
+    Parameters
+    ----------
+
+    plate
+      A plate obtained from ``plate_from_aati_fragment_analyzer_peaktable``
+      or ``plate_from_aati_fragment_analyzer_zip``.
+
+    size
+      Size of the band, in basepairs.
+
+    tolerance
+      Maximal difference between the band size and ``size``, in basepairs.
+
+    min_concentration
+      Only bands with a concentration (in ng/ul) strictly above this value are
+      considered.
+    """
+    table = plate.data["peak_table"]
+    wellnames = set(table.wells_with_band_near(
+        size, tolerance=tolerance, min_concentration=min_concentration
+    ))
+    return [well for well in plate.iter_wells() if well.name in wellnames]
+
+
+class AATIGelImage:
+    """Gel image of an AATI fragment analyzer run, decoded on first access.
+
+    The image is only read and decoded the first time ``array`` (or a lane)
+    is accessed, and all lanes are views on this single decoded array. When
+    the image (or the zip archive containing it) is given as a file-like
+    object, the image file's bytes are read right away, so that the object
+    can be closed by the caller before the image is decoded.
+
+    Parameters
+    ----------
+
+    source
+      A path or file-like object of the image file, or the name of the image
+      file inside the ``archive``.
+
+    archive
+      A path or file-like object of the zip archive containing the image, if
+      any.
+
+    num_lanes
+      Number of lanes (one per well) in the gel image.
+    """
+
+    def __init__(self, source, archive=None, num_lanes=96):
+        self.format = None
+        if archive is not None:
+            self.format = source.split(".")[-1]
+            if hasattr(archive, "read"):
+                with zipfile.ZipFile(archive) as zip_file:
+                    source = io.BytesIO(zip_file.read(source))
+                archive = None
+        elif hasattr(source, "read"):
+            if hasattr(source, "seek"):
+                source.seek(0)
+            source = io.BytesIO(source.read())
+        self.source = source
+        self.archive = archive
+        self.num_lanes = num_lanes
+        self._array = None
+        self._bounds = None
+
+    def _read_image(self):
+        if self.archive is None:
+            if hasattr(self.source, "seek"):
+                self.source.seek(0)
+            return mpimg.imread(self.source, format=self.format)
+        with zipfile.ZipFile(self.archive) as archive:
+            with archive.open(self.source) as f:
+                return mpimg.imread(f, format=self.format)
+
+    @property
+    def array(self):
+        """The full gel image, as a HxWx(3 or 4) array."""
+        if self._array is None:
+            self._array = self._read_image()
+        return self._array
+
+    @property
+    def bounds(self):
+        """Return (ymin, ymax, xx) where xx are the x-limits of the lanes."""
+        if self._bounds is None:
+            img = self.array
+            threshold = img.mean(axis=2) > 0.9
+            vertical_lines = (threshold.sum(axis=0) < 200).nonzero()[0]
+            xmin, xmax = vertical_lines.min() + 1, vertical_lines.max() - 1
+            horizontal_lines = (threshold.sum(axis=1) < 200).nonzero()[0]
+            ymin, ymax = horizontal_lines.min() + 1, horizontal_lines.max() - 1
+            xx = np.linspace(xmin, xmax, self.num_lanes + 1)
+            self._bounds = ymin, ymax, xx.round(0).astype(int)
+        return self._bounds
+
+    def lane(self, index):
+        """Return a view of the gel image for lane ``index`` (from 0)."""
+        ymin, ymax, xx = self.bounds
+        return self.array[ymin:ymax, xx[index]:xx[index + 1]]
+
+    def release(self):
+        """Free the decoded image. It will be decoded again if accessed."""
+        self._array = None
+
+
+class GelLaneImage:
+    """Lazy reference to one lane of an AATIGelImage.
+
+    It can be used wherever an array is expected (e.g. in ``ax.imshow``),
+    the gel image being decoded the first time a lane is accessed.
+    """
+
+    def __init__(self, gel_image, index):
+        self.gel_image = gel_image
+        self.index = index
+
+    @property
+    def image(self):
+        """The lane's image, a view on the full gel image array."""
+        return self.gel_image.lane(self.index)
+
+    def __array__(self, dtype=None, copy=None):
+        image = self.image
+        if dtype is not None:
+            image = image.astype(dtype)
+        return image
+
+    @property
+    def shape(self):
+        return self.image.shape
+
+    def __getitem__(self, index):
+        return self.image[index]
+
+    def __repr__(self):
+        return "GelLaneImage(%d)" % self.index
+
+
+def plate_from_aati_fa_gel_image(filename, archive=None):
     """Return a Plate96 where each well stores an image of the gel migration.
 
-    Each well has a ``data["migration_image"]`` which is a WxH
-    array, a greyscale version of the image.
+    Each well has a ``data["migration_image"]`` which behaves like a HxW(x3)
+    array, an image of the well's lane. The gel image is only decoded when
+    one of these lane images is first accessed, and lane images are views on
+    the same decoded image (see ``AATIGelImage``).
+
+    Note that ``migration_image`` is a GelLaneImage, not a Numpy array as in
+    previous versions: it works with ``np.asarray``, ``ax.imshow``, indexing
+    and ``.shape``, and its ``image`` attribute is the lane's array.
+
+    Parameters
+    ----------
+
+    filename
+      Path or file-like object of the gel image, or name of the image file in
+      the zip ``archive``.
+
+    archive
+      Path or file-like object of a zip archive containing the image.
     """
-    img = mpimg.imread(filename)
-    black_white = img.mean(axis=2)
-    threshold = black_white > 0.9
-    vertical_lines = (threshold.sum(axis=0) < 200).nonzero()[0]
-    xmin, xmax = vertical_lines.min() + 1, vertical_lines.max() - 1
-    horizontal_lines = (threshold.sum(axis=1) < 200).nonzero()[0]
-    ymin, ymax = horizontal_lines.min() + 1, horizontal_lines.max() - 1
-    xx = np.linspace(xmin, xmax, 97).round(0).astype(int)
-    plate = Plate96("Gel Image")
+    gel_image = AATIGelImage(filename, archive=archive, num_lanes=96)
+    plate = Plate96("Gel Image", data={"gel_image": gel_image})
     wells = plate.iter_wells(direction="column")
-    bands_x = zip(xx, xx[1:])
-    for (x1, x2), well in zip(bands_x, wells):
-        well.data["migration_image"] = img[ymin:ymax, x1:x2]
+    for index, well in enumerate(wells):
+        well.data["migration_image"] = GelLaneImage(gel_image, index)
     return plate
 
 
@@ -87,8 +360,15 @@ def plate_from_aati_fragment_analyzer_zip(filename):
     attribute has fields such as ``Size (bp)``, ``% (Conc.)``, ``nmole/L``,
     ``ng/ul``, ``RFU``.
 
-    Each well also has a  ``data["migration_image"]`` which is a WxH
-    array, a greyscale version of the image.
+    Each well also has a  ``data["migration_image"]`` which behaves like a
+    HxW(x3) array, an image of the well's lane. The gel image is only read
+    from the archive and decoded when a lane image is first accessed (if
+    ``filename`` is a file-like object, the image file is read from it right
+    away, so that it can be closed afterwards).
+
+    Note that ``migration_image`` is a GelLaneImage, not a Numpy array as in
+    previous versions: it works with ``np.asarray``, ``ax.imshow``, indexing
+    and ``.shape``, and its ``image`` attribute is the lane's array.
     """
     ladder = None
     images_plate = None
@@ -96,16 +376,18 @@ def plate_from_aati_fragment_analyzer_zip(filename):
     with zipfile.ZipFile(filename) as f:
         for name in f.namelist():
             if name.endswith("Peak Table.csv"):
-                content = StringIO(f.read(name))
-                plate = plate_from_aati_fragment_analyzer_peaktable(content)
+                with f.open(name) as content:
+                    plate = plate_from_aati_fragment_analyzer_peaktable(content)
             if name.endswith("Size Calibration.csv"):
-                ladder = pandas.read_csv(StringIO(f.read(name)))
+                with f.open(name) as content:
+                    ladder = pandas.read_csv(content)
             if name.endswith(("Gel.PNG", "Gel.JPEG")):
-                content = StringIO(f.read(name))
-                images_plate = plate_from_aati_fa_gel_image(content)
+                images_plate = plate_from_aati_fa_gel_image(name,
+                                                            archive=filename)
     if plate is None:
         raise IOError("No file `Peak Table.csv` found in AATI archive.")
     plate.data["ladder"] = ladder
     if images_plate is not None:
+        plate.data["gel_image"] = images_plate.data["gel_image"]
         plate.merge_data_from(images_plate)
     return plate
@@ -1,17 +1,11 @@
 import pandas
 
-from plateo.tools import index_to_wellname
-from plateo.parsers.file_parsers import parse_excel_xml
-from plateo.parsers.plate_from_tables import plate_from_dataframe
+from plateo.containers import get_plate_class
+from plateo.tools import wellnames_by_index
+from plateo.parsers.file_parsers import excel_xml_table_to_columns
 import numpy as np
 
 
-def parse_numeric(numeric_wannabe):
-    try:
-        return float(numeric_wannabe)
-    except ValueError:
-        return np.nan
-
 def plate_from_nanodrop_xml_file(xml_file=None, xml_string=None, num_wells=96,
                                  direction="row"):
     """Return a plate with the DNA concentrations measured by the Nanodrop.
@@ -38,29 +32,41 @@ def plate_from_nanodrop_xml_file(xml_file=None, xml_string=None, num_wells=96,
     Returns
     -------
 
-    A Plate where the wells have the following data fields:
-    TODO: complete
+    A Plate where the wells have one data field per column of the first table
+    of the Nanodrop file (numeric columns being converted to numbers), and a
+    ``concentration`` field (NaN for non-numeric concentration values).
 
-    """
+    Only the first table of the file is parsed, and its rows are streamed
+    directly into columns (see ``excel_xml_table_to_columns``).
 
-    table = parse_excel_xml(xml_file=xml_file, xml_string=xml_string)[0]
-    table = [
-        line for line in table
-        if len(line) == len(table[0])
-    ]
-    dataframe = pandas.DataFrame(table[1:], columns=table[0])
-    for column in dataframe.columns:
-        dataframe[column] = pandas.to_numeric(dataframe[column],
-                                              errors='ignore')
+    """
 
-    def wellname(i):
-        return index_to_wellname(int(i), num_wells, direction=direction)
-    dataframe["wellname"] = dataframe["#"].apply(wellname)
+    columns = excel_xml_table_to_columns(xml_file=xml_file,
+                                         xml_string=xml_string)
+    for column, values in columns.items():
+        numeric_values = pandas.to_numeric(np.array(values, dtype=object),
+                                           errors='coerce')
+        if not np.isnan(numeric_values).any():
+            columns[column] = numeric_values
     conc_label = [
         label
         for label in ["Nucleic Acid", "Nucleic Acid Conc."]
-        if label in dataframe
+        if label in columns
     ][0]
-    dataframe['concentration'] = [parse_numeric(e)
-                                  for e in dataframe[conc_label]]
-    return plate_from_dataframe(dataframe, num_wells=num_wells)
+    columns['concentration'] = pandas.to_numeric(
+        np.array(columns[conc_label], dtype=object), errors='coerce')
+
+    indices = np.asarray(columns["#"], dtype=int)
+    wellnames = wellnames_by_index(num_wells, direction=direction)
+    fields = list(columns.keys())
+    values = [
+        values.tolist() if hasattr(values, "tolist") else values
+        for values in columns.values()
+    ]
+    wells_data = {
+        wellname: dict(zip(fields, well_values))
+        for wellname, well_values in zip(wellnames[indices - 1],
+                                          zip(*values))
+    }
+    plate_class = get_plate_class(num_wells=num_wells)
+    return plate_class(wells_data=wells_data)
@@ -2,18 +2,174 @@
 
 """
 
+from io import StringIO
+
+import numpy as np
 import pandas as pd
-from ..tools import index_to_wellname
 
-def plate_from_roche_lightcycler_qPCR(filename):
-    """NOR IMPLEMENTED. TODO: rewrite completely.
+from ..containers import get_plate_class
+from ..tools import infer_plate_size_from_wellnames, wellnames_by_index
+
+POSITION_COLUMNS = ("Pos", "SamplePos", "No")
+CQ_COLUMNS = ("Cq", "Cp", "Ct")
+
+
+def read_lightcycler_table(filename):
+    """Return a dataframe from a LightCycler tab-separated text export.
+
+    The lines preceding the table's header (e.g. "Experiment: ...") are
+    skipped, the header being the first line with a well position column
+    (``Pos``, ``SamplePos``, or ``No``).
     """
-    dataframe = pd.read_csv(filename, sep="\t", header=3, index_col=False)
-    num_wells = dataframe.No.max()
-    return {
-        index_to_wellname(row.No, num_wells, direction="row"): {
-            column: row[column]
-            for column in dataframe.columns
-        }
-        for i, row in dataframe.iterrows()
+    if hasattr(filename, "read"):
+        content = filename.read()
+    else:
+        with open(filename, "r") as f:
+            content = f.read()
+    if isinstance(content, bytes):
+        content = content.decode()
+    lines = content.splitlines()
+    for header_index, line in enumerate(lines):
+        fields = [field.strip() for field in line.split("\t")]
+        if any(column in fields for column in POSITION_COLUMNS):
+            break
+    else:
+        raise ValueError("No table with a well position column (%s) found."
+                         % ", ".join(POSITION_COLUMNS))
+    dataframe = pd.read_csv(StringIO(content), sep="\t", index_col=False,
+                            skiprows=header_index)
+    dataframe.columns = [str(column).strip() for column in dataframe.columns]
+    return dataframe
+
+
+def _dataframe_wellnames(dataframe, num_wells):
+    """Return the array of well names of the dataframe's rows."""
+    for column in POSITION_COLUMNS[:2]:
+        if column in dataframe.columns:
+            return dataframe[column].astype(str).str.strip().to_numpy()
+    indices = dataframe["No"].to_numpy(dtype=int)
+    return wellnames_by_index(num_wells, direction="row")[indices - 1]
+
+
+def _infer_num_wells(dataframe):
+    for column in POSITION_COLUMNS[:2]:
+        if column in dataframe.columns:
+            wellnames = dataframe[column].astype(str).str.strip()
+            return infer_plate_size_from_wellnames(wellnames)
+    return 96 if dataframe["No"].max() <= 96 else 384
+
+
+def plate_from_roche_lightcycler_qPCR(filename, curves_filename=None,
+                                      num_wells="infer", channel=None,
+                                      program=None, name=None):
+    """Return a plate with the Cq values and amplification curves of a qPCR.
+
+    Parameters
+    ----------
+
+    filename
+      Path (or file object) of a LightCycler results text export, with
+      (tab-separated) columns for the well position (``Pos`` e.g. "A1", or
+      ``No`` e.g. 1), the sample name (``Name``) and the Cq (``Cq`` or
+      ``Cp``).
+
+    curves_filename
+      Optional path (or file object) of a LightCycler amplification curves
+      text export, with one line per well and cycle and columns for the well
+      position (``SamplePos``), the ``Cycle`` number, and the fluorescence.
+
+    num_wells
+      Number of wells of the plate (96 or 384). If left to "infer", it is
+      deduced from the well positions in the file.
+
+    channel
+      Name of the fluorescence column of the curves file. By default the last
+      column of the file is used.
+
+    program
+      Number of the amplification program (``Prog`` column of the curves
+      file). Only the lines of this program are read. It can be left to None
+      if the file has no ``Prog`` column or a single program, else a
+      ValueError is raised (e.g. for files with amplification and melting
+      programs).
+
+    name
+      Name of the returned plate.
+
+    Returns
+    -------
+
+    A Plate where each well with results has data fields ``Cq`` and
+    ``sample_name``. The full table of results is stored as a dataframe
+    indexed by well name in ``plate.data.summary``.
+
+    If a curves file is provided, the plate also has data fields ``cycles``
+    (array of the cycle numbers) and ``amplification_curves`` (array of
+    shape (plate.num_wells, number of cycles), with one row per well in
+    row order, and NaNs for wells with no data). In that case each well has
+    a data field ``amplification_curve``, a view on the plate array's row.
+    """
+    summary = read_lightcycler_table(filename)
+    if num_wells == "infer":
+        num_wells = _infer_num_wells(summary)
+    wellnames = _dataframe_wellnames(summary, num_wells)
+    summary.index = pd.Index(wellnames, name="wellname")
+    cq_column = [c for c in CQ_COLUMNS if c in summary.columns]
+    cq_values = (summary[cq_column[0]].to_numpy(dtype=float) if cq_column
+                 else np.full(len(summary), np.nan))
+    sample_names = (summary["Name"].tolist() if "Name" in summary.columns
+                    else [None] * len(summary))
+    wells_data = {
+        wellname: {"Cq": cq, "sample_name": sample_name}
+        for wellname, cq, sample_name in zip(wellnames, cq_values.tolist(),
+                                             sample_names)
     }
+    plate_class = get_plate_class(num_wells=num_wells)
+    plate = plate_class(name=name, wells_data=wells_data,
+                        data={"summary": summary})
+    if curves_filename is not None:
+        curves = read_lightcycler_table(curves_filename)
+        if channel is None:
+            channel = curves.columns[-1]
+        if "Prog" in curves.columns:
+            programs = curves["Prog"].unique()
+            if program is None:
+                if len(programs) > 1:
+                    raise ValueError(
+                        "The curves file has several programs (%s), "
+                        "provide the amplification program." %
+                        ", ".join(str(p) for p in sorted(programs)))
+            else:
+                curves = curves[curves["Prog"] == program]
+                if len(curves) == 0:
+                    raise ValueError("No curves for program %s, the "
+                                     "programs are %s." % (program, ", ".join(
+                                         str(p) for p in sorted(programs))))
+        cycles, cycle_indices = np.unique(curves["Cycle"].to_numpy(),
+                                          return_inverse=True)
+        wellname_indices = {
+            wellname: index
+            for index, wellname in enumerate(
+                wellnames_by_index(num_wells, direction="row"))
+        }
+        curves_wellnames = _dataframe_wellnames(curves, num_wells)
+        well_indices = np.array([
+            wellname_indices[wellname] for wellname in curves_wellnames
+        ])
+        cells = well_indices * len(cycles) + cycle_indices
+        if len(np.unique(cells)) < len(cells):
+            duplicates = pd.Series(cells).duplicated().to_numpy()
+            raise ValueError(
+                "Several lines for the same well and cycle in the curves "
+                "file, e.g. well %s, cycle %s." % (
+                    curves_wellnames[duplicates][0],
+                    cycles[cycle_indices[duplicates][0]]))
+        array = np.full((num_wells, len(cycles)), np.nan)
+        array[well_indices, cycle_indices] = curves[channel].to_numpy(
+            dtype=float)
+        plate.data["cycles"] = cycles
+        plate.data["amplification_curves"] = array
+        for index in np.unique(well_indices):
+            well = plate.wells[wellnames_by_index(num_wells)[index]]
+            well.data["amplification_curve"] = array[index]
+    return plate
@@ -0,0 +1,185 @@
+"""Read plates and picklists from the Arrow IPC or Parquet files written by
+``plates_to_arrow_file`` and ``picklist_to_arrow_file``."""
+
+import json
+
+try:
+    import pyarrow
+    import pyarrow.ipc
+    import pyarrow.parquet
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+from ..containers import get_plate_class_by_name
+from ..PickList import PickList, Transfer
+from ..exporters.plate_to_tables import WELL_COLUMNS, column_to_data_field
+from ..exporters.plates_to_arrow_files import (ARROW_METADATA_KEY,
+                                               TRANSFER_COLUMNS)
+
+
+def arrow_table_from_file(filepath, memory_map=True):
+    """Read a pyarrow Table from an Arrow IPC or Parquet file.
+
+    The format is detected from the first bytes of the file. With
+    ``memory_map=True``, the file is memory-mapped, so that the columns of
+    Arrow IPC files are read without copies, and only when used.
+    """
+    if not PYARROW_AVAILABLE:
+        raise ImportError("Install pyarrow to read Arrow files.")
+    filepath = str(filepath)
+    with open(filepath, "rb") as f:
+        magic = f.read(6)
+    if magic[:4] == b"PAR1":
+        return pyarrow.parquet.read_table(filepath, memory_map=memory_map)
+    if memory_map:
+        source = pyarrow.memory_map(filepath, "r")
+    else:
+        source = pyarrow.OSFile(filepath, "rb")
+    if magic == b"ARROW1":
+        return pyarrow.ipc.open_file(source).read_all()
+    return pyarrow.ipc.open_stream(source).read_all()
+
+
+def _table_metadata(table, expected_type):
+    metadata = (table.schema.metadata or {}).get(ARROW_METADATA_KEY, None)
+    if metadata is None:
+        raise ValueError("The table was not written by Plateo.")
+    metadata = json.loads(metadata)
+    if metadata["type"] != expected_type:
+        raise ValueError("The table contains %s, not %s."
+                         % (metadata["type"], expected_type))
+    return metadata
+
+
+def plate_from_metadata(metadata, wells_data=None):
+    """Return an empty plate from a dict written by ``plate_to_metadata``."""
+    plate_class = get_plate_class_by_name(
+        metadata["class"], metadata["num_rows"], metadata["num_columns"])
+    plate = plate_class(name=metadata["name"], data=metadata["data"])
+    if wells_data:
+        for name, data in wells_data.items():
+            plate.wells[name].data.update(data)
+    return plate
+
+
+def _data_columns(table, excluded_columns):
+    return [
+        (field, table.column(field).to_pylist())
+        for field in table.column_names
+        if field not in excluded_columns
+    ]
+
+
+def plates_from_arrow_table(table):
+    """Return the list of plates stored in a table written by
+    ``plates_to_arrow_table``."""
+    metadata = _table_metadata(table, "plates")
+    plate_indices = table.column("plate").to_numpy().tolist()
+    names = table.column("name").to_pylist()
+    data_columns = _data_columns(table, ("plate",) + WELL_COLUMNS)
+    wells_data = [{} for plate_metadata in metadata["plates"]]
+    if len(data_columns):
+        for i, (plate_index, name) in enumerate(zip(plate_indices, names)):
+            data = {
+                column_to_data_field(field): values[i]
+                for field, values in data_columns
+                if values[i] is not None
+            }
+            if data:
+                wells_data[plate_index][name] = data
+    plates = [
+        plate_from_metadata(plate_metadata, wells_data=plate_wells_data)
+        for plate_metadata, plate_wells_data
+        in zip(metadata["plates"], wells_data)
+    ]
+    wells = [dict(plate.wells) for plate in plates]
+    volumes = table.column("volume").to_numpy().tolist()
+    quantities = table.column("quantities").to_pylist()
+    for plate_index, name, volume, well_quantities in zip(
+            plate_indices, names, volumes, quantities):
+        content = wells[plate_index][name].content
+        content.volume = volume
+        content.quantities = content.container_class(well_quantities)
+    return plates
+
+
+def picklist_from_arrow_table(table, plates_dict=None):
+    """Return the picklist stored in a table written by
+    ``picklist_to_arrow_table``.
+
+    See ``picklist_from_arrow_file`` for the ``plates_dict`` parameter.
+    """
+    metadata = _table_metadata(table, "picklist")
+    if plates_dict is None:
+        plates = [plate_from_metadata(m) for m in metadata["plates"]]
+    else:
+        plates = [plates_dict[m["name"]] for m in metadata["plates"]]
+    wells = [dict(plate.wells) for plate in plates]
+    source_plates = table.column("source_plate").to_numpy().tolist()
+    destination_plates = table.column("destination_plate").to_numpy().tolist()
+    source_wells = table.column("source_well").to_pylist()
+    destination_wells = table.column("destination_well").to_pylist()
+    volumes = table.column("volume").to_numpy().tolist()
+    data_columns = _data_columns(table, TRANSFER_COLUMNS)
+    transfers = []
+    for i in range(table.num_rows):
+        data = {
+            column_to_data_field(field): values[i]
+            for field, values in data_columns
+            if values[i] is not None
+        }
+        transfers.append(Transfer(
+            source_well=wells[source_plates[i]][source_wells[i]],
+            destination_well=wells[destination_plates[i]][
+                destination_wells[i]],
+            volume=volumes[i],
+            data=data or None
+        ))
+    return PickList(transfers, data=metadata["data"])
+
+
+def plates_from_arrow_file(filepath, memory_map=True):
+    """Read the list of plates stored in an Arrow IPC or Parquet file.
+
+    The file must have been written with ``plates_to_arrow_file``. The plates
+    have the same class (if it is one of the classes of
+    ``plateo.containers``), name, data, and well contents and data as the
+    plates written. Data fields with a null value, or with a NaN value, are
+    not set in the wells.
+
+    Parameters
+    ----------
+
+    filepath
+      Path to an Arrow IPC or Parquet file.
+
+    memory_map
+      If true, the file is memory-mapped rather than read in memory at once.
+    """
+    table = arrow_table_from_file(filepath, memory_map=memory_map)
+    return plates_from_arrow_table(table)
+
+
+def picklist_from_arrow_file(filepath, plates_dict=None, memory_map=True):
+    """Read a picklist stored in an Arrow IPC or Parquet file.
+
+    The file must have been written with ``picklist_to_arrow_file``.
+
+    Parameters
+    ----------
+
+    filepath
+      Path to an Arrow IPC or Parquet file.
+
+    plates_dict
+      A dictionnary linking the plate names inside the file to plate objects
+      For instance { "Source": source_plate, "Destination": ... }, e.g. with
+      plates read with ``plates_from_arrow_file``. If None, new empty plates
+      are created with the names, classes and data of the plates written.
+
+    memory_map
+      If true, the file is memory-mapped rather than read in memory at once.
+    """
+    table = arrow_table_from_file(filepath, memory_map=memory_map)
+    return picklist_from_arrow_table(table, plates_dict=plates_dict)
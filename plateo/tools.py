@@ -3,8 +3,11 @@
 In particular, methods for converting to and from plate coordinates.
 """
 
+import multiprocessing
+import os
 import numpy as np
 from collections import OrderedDict
+from functools import lru_cache
 from fuzzywuzzy import process
 import re
 
@@ -75,6 +78,22 @@ def index_to_wellname(index, num_wells, direction="row"):
     return coordinates_to_wellname((row, column))
 
 
+@lru_cache(maxsize=None)
+def wellnames_by_index(num_wells, direction="row"):
+    """Return an array of the well names ordered by index (read-only).
+
+    The well with index ``i`` (as in ``index_to_wellname``) is at position
+    ``i - 1`` in the array, so that many indices can be converted at once
+    with ``wellnames_by_index(96)[indices - 1]``.
+    """
+    wellnames = np.array([
+        index_to_wellname(index, num_wells, direction=direction)
+        for index in range(1, num_wells + 1)
+    ], dtype=object)
+    wellnames.flags.writeable = False
+    return wellnames
+
+
 def shift_wellname(wellname, row_shift=0, column_shift=0):
     letter, number = wellname[0], wellname[1:]
     letter_rownum = rowname_to_number(letter)
@@ -165,3 +184,71 @@ def did_you_mean(name, other_names, limit=5, min_score=50):
         }
     results = process.extract(name, list(other_names), limit=limit)
     return [e for (e, score) in results if score >= min_score]
+
+
+_worker_function = None
+
+
+def _set_worker_function(function):
+    global _worker_function
+    _worker_function = function
+
+
+def _call_worker_function(item):
+    return _worker_function(item)
+
+
+def effective_n_jobs(n_jobs):
+    """Return the number of processes to use for ``n_jobs``.
+
+    None means as many as there are CPUs, and negative numbers count from
+    the number of CPUs, as in joblib (-1 for all CPUs, -2 for all CPUs but
+    one, etc.). A ValueError is raised for 0.
+    """
+    n_cpus = os.cpu_count() or 1
+    if n_jobs is None:
+        return n_cpus
+    if n_jobs == 0:
+        raise ValueError("n_jobs must be a positive or negative number, not 0.")
+    if n_jobs < 0:
+        return max(1, n_cpus + 1 + n_jobs)
+    return n_jobs
+
+
+def parallel_imap(function, items, n_jobs=None):
+    """Iterate over ``function(item)`` for all items, computed in parallel.
+
+    The results are yielded in the order of the items, as soon as they are
+    available. The worker processes are forked, so ``function`` does not need
+    to be picklable (it can be a closure) and sees the state of the program
+    at the time of the call, but the items and results must be picklable.
+
+    Parameters
+    ----------
+
+    function
+      A function ``(item) => result``.
+
+    items
+      An iterable of items.
+
+    n_jobs
+      Number of worker processes (see ``effective_n_jobs``). None means as
+      many as there are CPUs, -1 too. If ``n_jobs`` is 1 or the platform does
+      not support forking processes, the results are computed sequentially
+      in the current process.
+    """
+    n_jobs = effective_n_jobs(n_jobs)
+    if n_jobs > 1:
+        try:
+            context = multiprocessing.get_context("fork")
+        except ValueError:
+            n_jobs = 1
+    if n_jobs == 1:
+        for item in items:
+            yield function(item)
+        return
+    with context.Pool(n_jobs, initializer=_set_worker_function,
+                      initargs=(function,)) as pool:
+        for result in pool.imap(_call_worker_function, items):
+            yield result
@@ -0,0 +1,109 @@
+import numpy as np
+import pandas
+import pytest
+
+from plateo import PickList, FrozenPlate
+from plateo.containers.plates import Plate96, Trough8x1
+
+
+def test_freeze_and_thaw():
+    plate = Plate96(name="Source", data={"project": {"id": [1, 2]}})
+    plate["A1"].add_content({"DNA": 1.0}, volume=20e-6)
+    plate["A1"].data["info"] = "part"
+    snapshot = plate.freeze()
+    assert isinstance(snapshot, FrozenPlate)
+    assert snapshot["A1"].volume == 20e-6
+    assert snapshot["A1"].quantities == {"DNA": 1.0}
+    assert snapshot.data["project"]["id"] == (1, 2)
+    with pytest.raises(AttributeError):
+        snapshot["A1"].volume = 0
+    with pytest.raises(TypeError):
+        snapshot["A1"].quantities["DNA"] = 2
+    assert hash(snapshot) == hash(plate.freeze())
+    assert snapshot == plate.freeze()
+    plate["A1"].data["info"] = "other part"
+    assert snapshot != plate.freeze()
+    cache = {snapshot: "cached"}
+    restored = plate.freeze().with_wells({"A1": snapshot["A1"]})
+    assert cache[restored] == "cached"
+    new_plate = snapshot.thaw()
+    assert isinstance(new_plate, Plate96)
+    assert new_plate["A1"].volume == 20e-6
+    assert new_plate["A1"].data["info"] == "part"
+    assert new_plate.data["project"]["id"] == [1, 2]
+
+
+def test_execute_on_snapshots():
+    source = Plate96(name="Source")
+    trough = Trough8x1(name="Trough")
+    trough["A1"].add_content({"Buffer": 1.0}, volume=1000e-6)
+    destination = Plate96(name="Destination")
+    for well in source.iter_wells():
+        well.add_content({"DNA_" + well.name: 1.0}, volume=20e-6)
+    picklist = PickList()
+    for name in ["A1", "A2", "B3"]:
+        picklist.add_transfer(source[name], destination["A1"], 5e-6)
+        picklist.add_transfer(trough["B1"], destination[name], 10e-6)
+    snapshots = [plate.freeze() for plate in (source, trough, destination)]
+    new_snapshots = picklist.execute_on_snapshots(snapshots)
+    picklist.execute()
+    assert new_snapshots == [plate.freeze()
+                             for plate in (source, trough, destination)]
+    assert [hash(s) for s in new_snapshots] == [
+        hash(plate.freeze()) for plate in (source, trough, destination)]
+    assert snapshots[0]["A1"].volume == 20e-6
+    assert new_snapshots[0]["A4"] is snapshots[0]["A4"]
+    assert new_snapshots[1]["H1"].volume == pytest.approx(970e-6)
+    assert new_snapshots[2]["A1"].sources == (
+        ("Source", "A1"), ("Trough", "B1"), ("Source", "A2"),
+        ("Source", "B3"))
+
+
+def test_freeze_array_data():
+    plate = Plate96(name="qPCR", data={"summary": pandas.DataFrame(
+        {"well": ["A1", "B3"], "Cq": [21.5, float("nan")]})})
+    plate["A1"].data["curve"] = np.array([0.1, 0.5, 0.9])
+    snapshot = plate.freeze()
+    assert hash(snapshot) == hash(plate.freeze())
+    assert snapshot == plate.freeze()
+    with pytest.raises(ValueError):
+        snapshot["A1"].data["curve"].value[0] = 1
+    plate["A1"].data["curve"][0] = 1
+    assert snapshot != plate.freeze()
+    new_plate = snapshot.thaw()
+    assert np.array_equal(new_plate["A1"].data["curve"], [0.1, 0.5, 0.9])
+    new_plate["A1"].data["curve"][0] = 2
+    assert snapshot["A1"].data["curve"].value[0] == 0.1
+    assert new_plate.data["summary"].equals(plate.data["summary"])
+    plate["A2"].data["other"] = bytearray(b"abc")
+    with pytest.raises(TypeError):
+        plate.freeze()
+
+
+def test_execute_on_snapshots_with_ambiguous_names():
+    source, destination = Plate96(), Plate96()
+    source["A1"].add_content({"DNA": 1.0}, volume=20e-6)
+    picklist = PickList()
+    picklist.add_transfer(source["A1"], destination["A1"], 5e-6)
+    with pytest.raises(ValueError):
+        picklist.execute_on_snapshots([source.freeze(), destination.freeze()])
+    destination.name = "Destination"
+    with pytest.raises(ValueError):
+        picklist.execute_on_snapshots({"Destination": destination.freeze()})
+    new_snapshots = picklist.execute_on_snapshots(
+        {None: source.freeze(), "Destination": destination.freeze()})
+    assert new_snapshots["Destination"]["A1"].volume == 5e-6
+
+
+def test_execute_on_snapshots_checks_capacity_of_lazy_wells():
+    from plateo import TransferError
+    from plateo.containers.plates import Plate4ti0960
+    trough = Trough8x1(name="Water")
+    trough["A1"].add_content({"Water": 1.0}, volume=1e-3)
+    destination = Plate4ti0960(name="Destination", lazy=True)
+    snapshots = [trough.freeze(), destination.freeze()]
+    assert snapshots[1]["B1"].capacity == 150e-6
+    picklist = PickList()
+    picklist.add_transfer(trough["A1"], destination["B1"], 200e-6)
+    with pytest.raises(TransferError):
+        picklist.execute_on_snapshots(snapshots)
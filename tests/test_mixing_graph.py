@@ -0,0 +1,76 @@
+import numpy as np
+
+from plateo import MixingGraph, PickList
+from plateo.containers.plates import Plate96
+
+
+def test_mixing_graph():
+    source_plate = Plate96(name="Source")
+    for well, component in [("A1", "DNA_1"), ("A2", "DNA_2"),
+                            ("A3", "Buffer")]:
+        source_plate[well].add_content({component: 1}, volume=100e-6)
+    destination_plate = Plate96(name="Destination")
+    destination_plate["B1"].add_content({"Water": 1}, volume=10e-6)
+    picklist = PickList()
+    for well in ["A1", "A2"]:
+        picklist.add_transfer(source_plate[well], destination_plate["A1"],
+                              5e-6)
+    picklist.add_transfer(source_plate["A3"], destination_plate["A1"], 10e-6)
+    picklist.add_transfer(destination_plate["A1"], destination_plate["B1"],
+                          10e-6)
+    graph = MixingGraph()
+    graph.record_picklist(picklist)
+
+    source_wells = [source_plate[w] for w in ["A1", "A2", "A3"]]
+    fractions = graph.fractions(destination_plate["A1"])
+    assert np.allclose([fractions[w] for w in source_wells],
+                       [0.25, 0.25, 0.5])
+    fractions = graph.fractions(destination_plate["B1"])
+    assert np.allclose(fractions[destination_plate["B1"]], 0.5)
+    assert np.allclose(fractions[source_plate["A1"]], 0.125)
+    assert graph.fractions(source_plate["A1"]) == {source_plate["A1"]: 1.0}
+
+    matrix, wells, roots = graph.fractions_matrix()
+    assert roots == source_wells + [destination_plate["B1"]]
+    matrix = np.asarray(matrix.todense() if hasattr(matrix, "todense")
+                        else matrix)
+    assert matrix.shape == (5, 4)
+    assert np.allclose(matrix.sum(axis=1), 1)
+
+    ancestry = graph.ancestry(destination_plate["B1"])
+    assert len(ancestry) == 4
+    assert ancestry[-1] == (destination_plate["A1"], destination_plate["B1"],
+                            10e-6)
+    assert graph.ancestors(destination_plate["B1"]) == (
+        source_wells + [destination_plate["A1"]])
+
+
+def test_mixing_graph_ancestry_is_time_aware():
+    plate = Plate96()
+    graph = MixingGraph()
+    graph.add_edge(plate["A1"], plate["B1"], 1, 0)
+    graph.add_edge(plate["B1"], plate["C1"], 1, 0)
+    graph.add_edge(plate["A2"], plate["B1"], 1, 0)
+    assert graph.ancestors(plate["C1"]) == [plate["A1"], plate["B1"]]
+    assert graph.ancestors(plate["B1"]) == [plate["A1"], plate["A2"]]
+
+
+def test_mixing_graph_pooling_and_incremental_updates():
+    plate = Plate96()
+    wells = list(plate.iter_wells())
+    graph = MixingGraph()
+    for i, well in enumerate(wells[:-1]):
+        graph.add_edge(well, wells[-1], 1e-6, i * 1e-6)
+    fractions = graph.fractions(wells[-1])
+    assert len(fractions) == 95
+    assert np.allclose(list(fractions.values()), 1 / 95.0)
+    # Half of the pool is moved to an empty well, which then gets as much
+    # of A1, then the pool is emptied and refilled with A2.
+    graph.add_edge(wells[-1], plate["A1"], 47.5e-6, 0)
+    graph.add_edge(plate["A2"], plate["A1"], 47.5e-6, 47.5e-6)
+    fractions = graph.fractions(plate["A1"])
+    assert np.allclose(fractions[plate["A2"]], 0.5 + 0.5 / 95)
+    assert np.allclose(fractions[plate["B1"]], 0.5 / 95)
+    graph.add_edge(wells[-1], plate["B1"], 47.5e-6, 0)
+    graph.add_edge(plate["A2"], wells[-1], 1e-6, 0)
+    assert graph.fractions(wells[-1]) == {plate["A2"]: 1.0}
@@ -62,3 +62,18 @@ def test_enforce_maximum_dispense_volume():
 def test_merge_picklists():
     new_picklist = picklist.merge_picklists([picklist, picklist])
     assert len(new_picklist.transfers_list) == 2
+
+
+def test_copy_with_new_plates():
+    source, destination = Plate96(name="Source"), Plate96(name="Destination")
+    source["A1"].add_content({"DNA": 1}, volume=10e-6)
+    picklist = PickList(data={"robot": "echo"})
+    picklist.add_transfer(source["A1"], destination["B2"], 1e-6,
+                          data={"speed": 1})
+    new_picklist, new_plates = picklist.copy_with_new_plates()
+    new_transfer = new_picklist.transfers_list[0]
+    assert new_transfer.source_well is new_plates[source]["A1"]
+    new_transfer.data["speed"] = 2
+    new_picklist.data["robot"] = "tecan"
+    assert picklist.transfers_list[0].data == {"speed": 1}
+    assert picklist.data == {"robot": "echo"}
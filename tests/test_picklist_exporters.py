@@ -1,11 +1,16 @@
 import filecmp
 import os
 
+import pytest
+
 from plateo import PickList
-from plateo.containers import Plate96
+from plateo.containers import Plate96, Trough8x1
 from plateo.exporters import (
     picklist_to_tecan_evo_picklist_file,
     picklist_to_labcyte_echo_picklist_file,
+    PlateColorsPlotter,
+    PlateColorsRasterizer,
+    PlateTextPlotter,
 )
 
 data_dir = os.path.join(
@@ -46,3 +51,108 @@ def test_picklist_to_labcyte_echo_picklist_file(tmpdir):
         os.path.join(tmpdir, "my_picklist.csv"),
         os.path.join(data_dir, "my_picklist.csv"),
     )
+
+
+def test_picklist_animator_incremental(tmpdir):
+    imageio = pytest.importorskip("imageio")
+    pytest.importorskip("proglog")
+    from plateo.exporters.picklist_to_animation import PicklistAnimator
+
+    source_plate = Plate96(name="Source")
+    destination_plate = Plate96(name="Destination")
+    for well in source_plate:
+        well.add_content({"DNA": 1}, volume=20e-6)
+    picklist = PickList()
+    for source_name, dest_name in [("A1", "A5"), ("C5", "A5"), ("D6", "B1")]:
+        picklist.add_transfer(source_plate.wells[source_name],
+                              destination_plate.wells[dest_name],
+                              volume=5e-6)
+    frames = {}
+    for incremental in [True, False]:
+        animator = PicklistAnimator(
+            plate_plotters={
+                "Source": PlateColorsPlotter(lambda w: w.volume),
+                "Destination": PlateColorsPlotter(lambda w: w.volume,
+                                                  well_radius=200),
+            },
+            message_function=lambda picklist, transfer: str(transfer),
+            logger=None,
+            incremental=incremental,
+        )
+        target = os.path.join(str(tmpdir), "animation_%s.gif" % incremental)
+        animator.animate(picklist, target, dpi=30)
+        frames[incremental] = imageio.mimread(target)
+    assert len(frames[True]) == 3
+    # The destination wells, initially empty, must change color as in a
+    # full redraw of the plates.
+    assert all((f1 == f2).all() for f1, f2 in zip(frames[True], frames[False]))
+    animator.write_pdf(picklist, os.path.join(str(tmpdir), "animation.pdf"))
+
+
+def test_picklist_animator_parallel(tmpdir):
+    imageio = pytest.importorskip("imageio")
+    pytest.importorskip("proglog")
+    from plateo.exporters.picklist_to_animation import PicklistAnimator
+
+    source_plate = Plate96(name="Source")
+    destination_plate = Plate96(name="Destination")
+    for well in source_plate:
+        well.add_content({"DNA": 1}, volume=20e-6)
+    picklist = PickList()
+    for i, well in enumerate(list(source_plate)[:5]):
+        picklist.add_transfer(well, destination_plate.wells["A%d" % (i + 1)],
+                              volume=5e-6)
+    animator = PicklistAnimator(
+        plate_plotters={
+            "Source": PlateColorsPlotter(lambda w: w.volume),
+            "Destination": PlateTextPlotter(lambda w: 1e6 * w.volume),
+        },
+        message_function=lambda picklist, transfer: "%d/%d" % (
+            picklist.transfers_list.index(transfer) + 1,
+            len(picklist.transfers_list)),
+        logger=None,
+        incremental=True,
+    )
+    frames = {}
+    for n_jobs in [1, 2]:
+        target = os.path.join(str(tmpdir), "animation_%d.gif" % n_jobs)
+        animator.animate(picklist, target, dpi=30, n_jobs=n_jobs,
+                         chunk_size=2)
+        frames[n_jobs] = imageio.mimread(target)
+    assert len(frames[2]) == 5
+    assert all((f1 == f2).all() for f1, f2 in zip(frames[1], frames[2]))
+    assert source_plate.wells["A1"].volume == 20e-6
+    animator.write_pdf(picklist, os.path.join(str(tmpdir), "animation.pdf"),
+                       n_jobs=2, chunk_size=2)
+
+
+def test_picklist_raster_animator(tmpdir):
+    imageio = pytest.importorskip("imageio")
+    pytest.importorskip("proglog")
+    from plateo.exporters.picklist_to_animation import PicklistRasterAnimator
+
+    source_plate = Plate96(name="Source")
+    destination_plate = Plate96(name="Destination")
+    trough = Trough8x1(name="Water")
+    trough["A1"].add_content({"Water": 1}, volume=100e-6)
+    for well in source_plate:
+        well.add_content({"DNA": 1}, volume=20e-6)
+    picklist = PickList()
+    for source_name, dest_name in [("A1", "A5"), ("C5", "A5"), ("D6", "B1")]:
+        picklist.add_transfer(source_plate.wells[source_name],
+                              destination_plate.wells[dest_name],
+                              volume=5e-6)
+    picklist.add_transfer(trough["H1"], destination_plate["B1"], 10e-6)
+    rasterizer = PlateColorsRasterizer(lambda w: w.volume)
+    animator = PicklistRasterAnimator(
+        plate_rasterizers={"Source": rasterizer, "Destination": rasterizer,
+                           "Water": rasterizer},
+        logger=None)
+    frames = [frame.copy() for frame in animator.iter_frames(picklist)]
+    assert len(frames) == 4
+    assert frames[0].shape == (240, 320, 3)
+    assert (frames[0] != frames[1]).any()
+    assert (frames[2] != frames[3]).any()
+    target = os.path.join(str(tmpdir), "animation.gif")
+    animator.animate(picklist, target)
+    assert len(imageio.mimread(target)) == 4
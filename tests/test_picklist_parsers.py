@@ -1,10 +1,73 @@
+import os
+
+import pytest
+
+from plateo import PickList
+from plateo.containers import Plate96
+from plateo.exporters import (picklist_to_tecan_evo_picklist_file,
+                              picklist_to_arrow_file)
 from plateo.parsers import (picklist_from_labcyte_echo_logfile,
-                            picklist_from_tecan_evo_picklist_file)
+                            picklist_from_tecan_evo_picklist_file,
+                            picklist_from_arrow_file)
 
 def test_picklist_from_labcyte_echo_logfile():
     picklist_from_labcyte_echo_logfile
     pass
 
-def test_picklist_from_tecan_evo_picklist_file():
-    picklist_from_tecan_evo_picklist_file
-    pass
+def test_picklist_from_tecan_evo_picklist_file(tmpdir):
+    source, destination = Plate96(name="Source"), Plate96(name="Dest")
+    picklist = PickList()
+    for source_name, dest_name in [("A1", "B2"), ("C5", "H12"), ("A2", "B2")]:
+        picklist.add_transfer(source[source_name], destination[dest_name],
+                              volume=2e-6)
+    path = os.path.join(str(tmpdir), "picklist.gwl")
+    picklist_to_tecan_evo_picklist_file(picklist, path)
+    plates_dict = {"Source": source, "Dest": destination}
+    new_picklist = picklist_from_tecan_evo_picklist_file(path, plates_dict)
+    assert new_picklist.to_plain_string() == picklist.to_plain_string()
+
+
+def test_picklist_from_tecan_evo_picklist_file_multidispense(tmpdir):
+    source, destination = Plate96(name="Source"), Plate96(name="Dest")
+    path = os.path.join(str(tmpdir), "picklist.gwl")
+    with open(path, "w") as f:
+        f.write("C;Multi-dispense\n"
+                "A;Source;;;9;;30.0;;;\n"
+                "D;Dest;;;1;;10.0;;;\n"
+                "D;Dest;;;2;;20.0;;;\n"
+                "W;\n"
+                "A;Source;;;16;;5.0;;;\n"
+                "D;Dest;;;96;;5.0;;;\n"
+                "W;")
+    plates_dict = {"Source": source, "Dest": destination}
+    picklist = picklist_from_tecan_evo_picklist_file(path, plates_dict)
+    transfers = [
+        (t.source_well.name, t.destination_well.name, t.volume)
+        for t in picklist.transfers_list
+    ]
+    assert transfers == [("A2", "A1", pytest.approx(10e-6)),
+                         ("A2", "B1", pytest.approx(20e-6)),
+                         ("H2", "H12", pytest.approx(5e-6))]
+    picklist = picklist_from_tecan_evo_picklist_file(path, plates_dict,
+                                                     volume_unit="uL")
+    assert [t.volume for t in picklist.transfers_list] == [10, 20, 5]
+
+
+def test_picklist_from_arrow_file(tmpdir):
+    pytest.importorskip("pyarrow")
+    source, destination = Plate96(name="Source"), Plate96(name="Dest")
+    picklist = PickList(data={"robot": "echo"})
+    picklist.add_transfer(source["A1"], destination["B2"], volume=2e-6)
+    picklist.add_transfer(source["C5"], destination["H12"], volume=1e-6,
+                          data={"speed": 3, "volume": "dead volume"})
+    path = os.path.join(str(tmpdir), "picklist.arrow")
+    picklist_to_arrow_file(picklist, path)
+    new_picklist = picklist_from_arrow_file(path)
+    assert new_picklist.data == {"robot": "echo"}
+    assert ([t.to_plain_string() for t in new_picklist.transfers_list] ==
+            [t.to_plain_string() for t in picklist.transfers_list])
+    assert [t.data for t in new_picklist.transfers_list] == [
+        None, {"speed": 3, "volume": "dead volume"}]
+    plates_dict = {"Source": source, "Dest": destination}
+    new_picklist = picklist_from_arrow_file(path, plates_dict=plates_dict)
+    assert new_picklist.transfers_list[1].source_well is source["C5"]
@@ -1,5 +1,8 @@
+import os
+
 import pytest
 
+from plateo import Plate
 from plateo.containers.plates import Plate96
 from plateo.Well import Well
 
@@ -72,3 +75,86 @@ def test_iter_wells():
 
 def test___repr__():
     assert Plate96().__repr__() == "Plate96(None)"
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_to_json_from_json(compact):
+    plate = Plate96(name="Source", data={"run": 3})
+    for well in plate.iter_wells():
+        if well.row < 3:
+            well.add_content({"DNA_" + well.name: 1e-9, "water": 1},
+                             volume=20e-6)
+    plate["H12"].add_content({}, volume=5e-6)
+    plate["A1"].data.info = "hello"
+    plate["A2"].data.score = float("nan")
+    json_string = plate.to_json(compact=compact)
+    assert "NaN" not in json_string
+    new_plate = Plate.from_json(json_string)
+    assert isinstance(new_plate, Plate96)
+    assert (new_plate.name, new_plate.data) == ("Source", {"run": 3})
+    for well in plate:
+        assert new_plate[well.name].content.to_dict() == well.content.to_dict()
+    assert new_plate["A1"].data == {"info": "hello"}
+    assert new_plate["A2"].data == {"score": None}
+    assert new_plate["C3"].data == {}
+    assert new_plate["H12"].volume == 5e-6
+
+
+def test_from_dict():
+    plate = Plate96()
+    plate["B2"].add_content({"DNA": 1e-9}, volume=20e-6)
+    plate["B2"].data.info = "hello"
+    new_plate = Plate.from_dict(plate.to_dict())
+    assert isinstance(new_plate, Plate96)
+    assert new_plate["B2"].content.to_dict() == plate["B2"].content.to_dict()
+    assert new_plate["B2"].data == {"info": "hello"}
+
+
+def test_lazy_plate():
+    plate = Plate96(lazy=True, wells_data={"B3": {"info": "hello"}})
+    assert plate.is_lazy
+    assert [w.name for w in plate.iter_wells(skip_untouched=True)] == ["B3"]
+    plate["C4"].add_content({"DNA": 1e-9}, volume=10e-6)
+    assert plate.wells.C4.volume == 10e-6
+    assert plate.list_well_data_fields() == ["info"]
+    assert plate.last_nonempty_well() is plate["C4"]
+    assert len(list(plate.iter_wells(skip_untouched=True))) == 2
+    with pytest.raises(KeyError):
+        plate["I1"]
+    assert ("H12" in plate.wells) and ("I1" not in plate.wells)
+    assert plate.wells.get("I1") is None
+    assert len(plate.wells.created_wells()) == 2
+    assert plate.wells.get("H12").name == "H12"
+    assert len(plate.wells.created_wells()) == 3
+    assert len(list(plate.iter_wells())) == 96
+    assert len(plate.wells) == 96
+    assert len(plate.wells.copy()) == 96
+
+
+def test_lazy_trough():
+    from plateo.containers.plates import Trough8x1
+    trough = Trough8x1(name="Water", lazy=True)
+    trough["A1"].add_content({"Water": 1}, volume=100e-6)
+    assert trough["H1"].volume == 100e-6
+    assert len(trough.wells.created_wells()) == 2
+    trough = Trough8x1("Water", {"supplier": "Lab"})
+    assert trough.data == {"supplier": "Lab"}
+
+
+def test_exports_do_not_create_well_containers(tmpdir):
+    from plateo import PlateStore
+    from plateo.exporters import plate_to_pandas_dataframe
+
+    plate = Plate96(name="Lazy")
+    plate["A1"].add_content({"DNA": 1}, volume=1e-6)
+    plate["B1"].data["info"] = "x"
+    plate.list_well_data_fields()
+    plate.list_data_field_values("info")
+    plate.to_json()
+    plate.to_json(compact=True)
+    plate.to_dict()
+    plate_to_pandas_dataframe(plate)
+    PlateStore(os.path.join(str(tmpdir), "store.db")).add_plate(plate)
+    untouched = [w for w in plate if w.name not in ("A1", "B1")]
+    assert all(w._data is None for w in untouched)
+    assert all(w.content._quantities is None for w in untouched)
@@ -1,14 +1,65 @@
 from plateo.exporters import (plate_to_platemap_spreadsheet,
+                              plate_to_content_spreadsheet,
+                              plates_to_content_spreadsheet,
                               plate_to_genesift_sequencing_order_spreadsheet,
                               plate_to_pandas_dataframe,
+                              plate_to_arrow_table,
                               plate_to_bokeh_plot,
+                              plates_to_bokeh_grid,
                               PlateTextPlotter,
                               PlateGraphsPlotter,
-                              PlateColorsPlotter)
-from plateo.containers import Plate96
+                              PlateCurvesPlotter,
+                              PlateColorsPlotter,
+                              PlateColorsRasterizer,
+                              plates_to_image_files,
+                              plates_to_contact_sheet)
+import os
+from plateo.containers import Plate96, Plate1536, Trough8x1
+import numpy as np
+import pandas
+import pytest
 
-def test_plate_to_platemap_spreadsheet():
+def test_plate_to_platemap_spreadsheet(tmpdir):
     plate = Plate96("TestPlate")
+    plate.wells["B3"].data.info = 5
+    dataframe = plate_to_platemap_spreadsheet(
+        plate, lambda w: w.data.get("info", None))
+    assert dataframe.shape == (8, 12)
+    assert dataframe.loc["B", 3] == 5
+    filepath = os.path.join(str(tmpdir), "platemap.xlsx")
+    plate_to_platemap_spreadsheet(plate, lambda w: w.data.get("info", None),
+                                  filepath=filepath)
+    dataframe = pandas.read_excel(filepath, index_col=0)
+    assert dataframe.loc["B", 3] == 5
+
+
+def test_plates_to_content_spreadsheet(tmpdir):
+    plates = [Plate96("Plate_%d" % i) for i in range(3)]
+    for i, plate in enumerate(plates):
+        plate.wells["A2"].add_content({"DNA_%d" % i: 2e-9},
+                                      volume=(i + 1) * 1e-6)
+    filepath = os.path.join(str(tmpdir), "content.xlsx")
+    plate_to_content_spreadsheet(plates[0], filepath)
+    sheets = pandas.read_excel(filepath, sheet_name=None, index_col=0)
+    assert list(sheets) == ["content", "volume (uL)",
+                            "concentration (ng-uL)"]
+    assert sheets["content"].loc["A", 2] == "DNA_0"
+    assert sheets["volume (uL)"].loc["A", 2] == 1
+    assert sheets["concentration (ng-uL)"].loc["A", 2] == 2
+
+    # The plates can be generated one at a time.
+    filepath = os.path.join(str(tmpdir), "library.xlsx")
+    plates_to_content_spreadsheet((plate for plate in plates), filepath)
+    other_filepath = os.path.join(str(tmpdir), "library_pandas.xlsx")
+    with pandas.ExcelWriter(other_filepath) as writer:
+        plates_to_content_spreadsheet(plates, writer)
+    for path in (filepath, other_filepath):
+        volumes = pandas.read_excel(path, sheet_name="volume (uL)",
+                                    header=None)
+        # Each plate takes a title row, a header row, 8 rows and a blank row.
+        assert list(volumes[0][[0, 11, 22]]) == ["Plate_0", "Plate_1",
+                                                 "Plate_2"]
+        assert list(volumes[2][[2, 13, 24]]) == [1, 2, 3]
 
 
 def test_plate_to_genesift_sequencing_order_spreadsheet():
@@ -16,11 +67,65 @@ def test_plate_to_genesift_sequencing_order_spreadsheet():
 
 
 def test_plate_to_pandas_dataframe():
-    plate_to_pandas_dataframe
+    plate = Plate96("TestPlate")
+    plate.wells["A2"].add_content({"DNA": 2e-9}, volume=1e-6)
+    plate.wells["B1"].data.info = "some info"
+    plate.wells["B2"].data.info = None
+    plate.wells["B3"].data.volume = "high"
+    dataframe = plate_to_pandas_dataframe(plate)
+    assert list(dataframe.index[:3]) == ["A1", "A2", "A3"]
+    assert list(dataframe.columns) == ["name", "content", "row", "column",
+                                       "info", "volume"]
+    assert dataframe.loc["A2", "content"] == {"volume": 1e-6,
+                                              "quantities": {"DNA": 2e-9}}
+    assert dataframe.loc["B1", "info"] == "some info"
+    assert dataframe.loc["B2", "info"] is None
+    assert np.isnan(dataframe.loc["A1", "info"])
+    assert dataframe.loc["B3", "volume"] == "high"
+    dataframe = plate_to_pandas_dataframe(plate, fields=["column", "content"],
+                                          direction="column")
+    assert list(dataframe.index[:2]) == ["A1", "B1"]
+    assert list(dataframe.columns) == ["column", "content"]
+    assert dataframe.loc["A2", "content"]["volume"] == 1e-6
+
+    dataframe = plate_to_pandas_dataframe(plate, split_content=True)
+    assert list(dataframe.columns) == ["name", "row", "column", "volume",
+                                       "quantities", "info", "data.volume"]
+    assert dataframe.loc["A2", "volume"] == 1e-6
+    assert dataframe.loc["A2", "quantities"] == {"DNA": 2e-9}
+    assert dataframe.loc["B3", "data.volume"] == "high"
+
+
+def test_plate_to_arrow_table():
+    pytest.importorskip("pyarrow")
+    plate = Plate96("TestPlate")
+    plate.wells["A2"].add_content({"DNA": 2e-9}, volume=1e-6)
+    plate.wells["B1"].data.info = "some info"
+    plate.wells["B2"].data.info = 3
+    table = plate_to_arrow_table(plate)
+    assert table.num_rows == 96
+    assert table.column("quantities")[1].as_py() == [("DNA", 2e-9)]
+    assert table.column("info")[12].as_py() == "some info"
+    assert table.column("info")[13].as_py() == "3"
 
 
 def test_plate_to_bokeh_plot():
-    plate_to_bokeh_plot
+    pytest.importorskip("bokeh")
+    plate = Plate96("TestPlate")
+    plate.wells["A1"].add_content({"DNA": 1}, volume=1e-6)
+    plate.wells["A1"].data.url = "http://example.com/A1"
+    plate.wells["B2"].data.info = "some info"
+    plot = plate_to_bokeh_plot(plate, hover_data=["info"])
+    data = plot.select_one({"name": "well"}).data_source.data
+    assert len(data["well_name"]) == 96
+    assert data["display_color"][:2] == ["#aaa", "#fff"]
+    assert data["url"][0] == "http://example.com/A1"
+    assert "info: some info" in data["html_content"][13]
+    assert plate.wells["C3"]._data is None
+    assert plate.wells["C3"].content._quantities is None
+    assert plot.output_backend == "canvas"
+    assert plate_to_bokeh_plot(Plate1536()).output_backend == "webgl"
+    plates_to_bokeh_grid([plate, Plate96("OtherPlate")], ncols=2)
 
 
 def test_PlateTextPlotter():
@@ -33,3 +138,104 @@ def test_PlateGraphsPlotter():
 
 def test_PlateColorsPlotter():
     PlateColorsPlotter
+
+
+def test_PlateColorsRasterizer():
+    plate = Plate96("TestPlate")
+    for well in plate.wells_in_row("A"):
+        well.add_content({"DNA": 1}, volume=well.column * 1e-6)
+    rasterizer = PlateColorsRasterizer(
+        lambda well: well.volume if well.volume else None,
+        colormap=[(0, 0, 0), (1, 0, 0)], well_size=10, well_radius='full',
+        margin=5)
+    image = rasterizer.render(plate)
+    assert image.shape == (90, 130, 3)
+    # Plate border, first and last wells of row A, empty well.
+    assert (image[4, 4] == 0).all()
+    assert image[10, 10].tolist() == [0, 0, 0]
+    assert image[10, 120].tolist() == [255, 0, 0]
+    assert image[20, 10].tolist() == [230, 230, 230]
+    plate.wells["B1"].add_content({"DNA": 1}, volume=12e-6)
+    rasterizer.render_wells(image, plate, [plate.wells["B1"]],
+                            limits=(1e-6, 12e-6))
+    assert (image == rasterizer.render(plate)).all()
+
+
+def test_PlateColorsRasterizer_trough():
+    trough = Trough8x1("Water")
+    trough["A1"].add_content({"Water": 1}, volume=100e-6)
+    rasterizer = PlateColorsRasterizer(
+        lambda well: well.volume, colormap=[(0, 0, 0), (1, 0, 0)],
+        well_size=10, well_radius='full', margin=5)
+    assert rasterizer.image_shape(trough) == (90, 20, 3)
+    image = rasterizer.render(trough)
+    assert image[80, 10].tolist() == [0, 0, 0]
+    trough["H1"].transfer_to_other_well(Plate96()["A1"], 50e-6)
+    rasterizer.render_wells(image, trough, [trough["H1"]], limits=(0, 5e-5))
+    assert image[80, 10].tolist() == [255, 0, 0]
+    assert rasterizer.well_center(trough, trough["H1"]).tolist() == [10, 80]
+
+
+def test_plates_to_image_files_and_contact_sheet(tmpdir):
+    plates = [Plate96("Plate_%d" % i) for i in range(3)]
+    for i, plate in enumerate(plates):
+        for well in plate:
+            well.data.value = well.column * i
+    for plotter in [PlateColorsPlotter(lambda w: w.data.value,
+                                       plot_colorbar=True),
+                    PlateColorsRasterizer(lambda w: w.data.value)]:
+        report = plates_to_image_files(plates, plotter, str(tmpdir), n_jobs=2)
+        assert report["n_plates"] == 3
+        assert [os.path.basename(f) for f in report["filepaths"]] == [
+            "Plate_0.png", "Plate_1.png", "Plate_2.png"]
+        assert all(os.path.exists(f) for f in report["filepaths"])
+        report = plates_to_contact_sheet(
+            plates, plotter, os.path.join(str(tmpdir), "sheet.png"),
+            n_columns=2, padding=10)
+        assert report["image"].shape[2] == 3
+    assert report["image"].shape == (2 * 90 + 30, 2 * 130 + 30, 3)
+
+
+def test_PlateTextPlotter_collection():
+    plate = Plate96("TestPlate")
+    for well in plate:
+        well.data.value = well.row
+    plotter = PlateTextPlotter(lambda w: w.data.value,
+                               fontdict={"color": "red", "size": 8})
+    ax, stats = plotter.plot_plate(plate)
+    assert stats["B3"] == ((3, 7), "2")
+    assert len(ax.texts) == 0
+    plate.wells["B3"].data.value = 10
+    (collection,) = plotter.update_wells(ax, plate, [plate.wells["B3"]])
+    index = list(stats).index("B3")
+    assert (collection.get_paths()[index].vertices.shape !=
+            collection.get_paths()[0].vertices.shape)
+    ax.figure.canvas.draw()
+
+    # Fontdicts with other properties fall back to one Text per well.
+    plotter = PlateTextPlotter(lambda w: w.data.value,
+                               fontdict={"rotation": 45})
+    ax, stats = plotter.plot_plate(plate)
+    assert len(ax.texts) == 96
+
+
+def test_PlateCurvesPlotter():
+    plate = Plate96("TestPlate")
+    for well in plate.wells_in_row("A"):
+        well.data.curve = well.column * np.arange(5.0)
+    plotter = PlateCurvesPlotter(
+        lambda w: (np.arange(5), w.data.curve) if "curve" in w.data else None,
+        subplot_size=(0.5, 0.5))
+    ax, stats = plotter.plot_plate(plate)
+    assert len(stats) == 12
+    lines = ax.collections[-2]
+    assert len(lines.get_segments()) == 12
+    # With shared limits, the A1 curve stays at the bottom of its frame
+    # while the A12 curve spans the whole frame height.
+    a1, a12 = lines.get_segments()[0], lines.get_segments()[-1]
+    assert np.ptp(a1[:, 1]) < np.ptp(a12[:, 1]) < 0.5
+    assert np.allclose(a12[:, 0].mean(), 12)
+    plotter.ylim = "well"
+    ax, stats = plotter.plot_plate(plate)
+    a1, a12 = ax.collections[-2].get_segments()[::11]
+    assert np.allclose(np.ptp(a1[:, 1]), np.ptp(a12[:, 1]))
@@ -1,15 +1,24 @@
 import os
+import zipfile
 
+import matplotlib.image
+import numpy as np
 import pytest
 
 from plateo.Plate import Plate
+from plateo.parsers.file_parsers import iter_excel_xml_rows, parse_excel_xml
+from plateo.containers import Plate96, Trough8x1
+from plateo.exporters import plates_to_arrow_file
 from plateo.parsers import (
+    plates_from_arrow_file,
     plate_from_platemap_spreadsheet,
     plate_from_list_spreadsheet,
     plate_from_nanodrop_xml_file,
     plate_from_aati_fragment_analyzer_peaktable,
     plate_from_aati_fragment_analyzer_zip,
     plate_from_dataframe,
+    plate_from_roche_lightcycler_qPCR,
+    wells_with_band_near,
 )
 
 
@@ -24,8 +33,24 @@ def test_plate_from_list_spreadsheet():
 
 
 def test_plate_from_nanodrop_xml_file():
-    plate_from_nanodrop_xml_file
-    pass
+    xml_file = os.path.join("tests", "data", "example_nanodrop.xml")
+    plate = plate_from_nanodrop_xml_file(xml_file)
+    assert plate["A2"].data["concentration"] == 20.0
+    assert plate["A2"].data["A260"] == 0.4
+    assert plate["A2"].data["Sample ID"] == "S2"
+    assert np.isnan(plate["A3"].data["concentration"])
+    assert plate["A6"].data == {}
+    plate = plate_from_nanodrop_xml_file(xml_file, direction="column")
+    assert plate["B1"].data["Sample ID"] == "S2"
+
+
+def test_iter_excel_xml_rows():
+    xml_file = os.path.join("tests", "data", "example_nanodrop.xml")
+    rows = list(iter_excel_xml_rows(xml_file, chunk_size=50))
+    assert rows[-1] == (1, ["1", "2"])
+    rows = list(iter_excel_xml_rows(xml_file, max_tables=1, chunk_size=50))
+    assert len(rows) == 6
+    assert [row for (table, row) in rows] == parse_excel_xml(xml_file)[0]
 
 
 def test_plate_from_dataframe():
@@ -44,6 +69,109 @@ def test_plate_from_aati_fragment_analyzer_peaktable(tmpdir):
         plate_from_aati_fragment_analyzer_peaktable(bad_peaktable)
 
 
-def test_plate_from_aati_fragment_analyzer_zip():
-    plate_from_aati_fragment_analyzer_zip
-    pass
+def test_aati_fragment_analyzer_bands():
+    peaktable = os.path.join("tests", "data", "example_Peak Table.csv")
+    plate = plate_from_aati_fragment_analyzer_peaktable(peaktable)
+    bands = plate["A1"].data["bands"]
+    assert list(bands) == [2, 3, 4, 5, 6, 7]  # peak 1 has no concentration
+    assert bands[3]["Size (bp)"] == 364
+    assert list(bands.sizes) == [192, 364, 703, 1040, 1240, 1434]
+    assert bands.has_band_near(360, tolerance=5)
+    wells = wells_with_band_near(plate, 364, tolerance=5)
+    assert plate["A1"] in wells
+    assert all(well.data.bands.has_band_near(364, 5) for well in wells)
+
+
+def test_plate_from_aati_fragment_analyzer_zip(tmpdir):
+    # Synthetic white gel image with a dark frame around the lanes.
+    image = np.ones((300, 500, 3))
+    image[[10, 289], :] = image[:, [10, 489]] = 0
+    image_path = os.path.join(str(tmpdir), "Gel.PNG")
+    matplotlib.image.imsave(image_path, image)
+    zip_path = os.path.join(str(tmpdir), "results.zip")
+    with zipfile.ZipFile(zip_path, "w") as archive:
+        archive.write(image_path, "2020 Gel.PNG")
+        archive.write(os.path.join("tests", "data", "example_Peak Table.csv"),
+                      "2020 Peak Table.csv")
+    plate = plate_from_aati_fragment_analyzer_zip(zip_path)
+    assert 364 in plate["A1"].data.bands.sizes
+    gel_image = plate.data.gel_image
+    assert gel_image._array is None  # not decoded yet
+    lane = np.asarray(plate["A1"].data.migration_image)
+    assert lane.shape[0] == 277
+    assert np.shares_memory(lane, gel_image.array)
+    assert np.shares_memory(plate["B1"].data.migration_image.image,
+                            gel_image.array)
+    with open(zip_path, "rb") as f:
+        plate = plate_from_aati_fragment_analyzer_zip(f)
+    assert f.closed and plate.data.gel_image._array is None
+    assert np.array_equal(plate["A1"].data.migration_image, lane)
+
+
+def test_plate_from_roche_lightcycler_qPCR(tmpdir):
+    summary_path = os.path.join(str(tmpdir), "results.txt")
+    with open(summary_path, "w") as f:
+        f.write("Experiment: test  Selected Filter: SYBR Green I\n"
+                "Include\tColor\tPos\tName\tCp\tConcentration\n"
+                "True\t255\tA1\tSample 1\t21.5\t\n"
+                "True\t255\tB3\tSample 2\t\t\n")
+    curves_path = os.path.join(str(tmpdir), "curves.txt")
+    with open(curves_path, "w") as f:
+        f.write("Experiment: test\n"
+                "SamplePos\tSampleName\tProg\tCycle\t465-510\n")
+        for cycle in range(1, 41):
+            for wellname, value in [("A1", cycle * 0.1), ("B3", 0.05)]:
+                f.write("%s\tname\t2\t%d\t%f\n" % (wellname, cycle, value))
+    plate = plate_from_roche_lightcycler_qPCR(
+        summary_path, curves_filename=curves_path)
+    assert plate.num_wells == 96
+    assert plate["A1"].data.Cq == 21.5
+    assert np.isnan(plate["B3"].data.Cq)
+    assert plate["A1"].data.sample_name == "Sample 1"
+    assert plate.data.summary.loc["B3", "Name"] == "Sample 2"
+    curves = plate.data.amplification_curves
+    assert curves.shape == (96, 40)
+    assert np.shares_memory(plate["A1"].data.amplification_curve, curves)
+    assert np.allclose(plate["A1"].data.amplification_curve[:2], [0.1, 0.2])
+    assert np.isnan(curves[1]).all()  # well A2
+
+    with open(curves_path, "a") as f:
+        f.write("A1\tname\t3\t1\t5.0\n")
+    with pytest.raises(ValueError):
+        plate_from_roche_lightcycler_qPCR(summary_path,
+                                          curves_filename=curves_path)
+    plate = plate_from_roche_lightcycler_qPCR(
+        summary_path, curves_filename=curves_path, program=2)
+    assert np.allclose(plate["A1"].data.amplification_curve[:2], [0.1, 0.2])
+    with open(curves_path, "a") as f:
+        f.write("A1\tname\t2\t1\t5.0\n")
+    with pytest.raises(ValueError):
+        plate_from_roche_lightcycler_qPCR(
+            summary_path, curves_filename=curves_path, program=2)
+
+
+@pytest.mark.parametrize("extension", ["arrow", "parquet"])
+def test_plates_from_arrow_file(tmpdir, extension):
+    pytest.importorskip("pyarrow")
+    plate = Plate96(name="Source", data={"run": 3})
+    for well in plate:
+        well.add_content({"DNA_" + well.name: 1e-9}, volume=50e-6)
+    plate["A1"].data.info = "hello"
+    plate["B2"].data.score = 3.5
+    plate["B3"].data.volume = "high"
+    trough = Trough8x1(name="Water")
+    trough["A1"].add_content({}, volume=1e-3)
+    path = os.path.join(str(tmpdir), "plates." + extension)
+    plates_to_arrow_file([plate, trough], path)
+    new_plate, new_trough = plates_from_arrow_file(path)
+    assert isinstance(new_plate, Plate96)
+    assert (new_plate.name, new_plate.data) == ("Source", {"run": 3})
+    for well in plate:
+        assert new_plate[well.name].content.to_dict() == well.content.to_dict()
+    assert new_plate["A1"].data == {"info": "hello"}
+    assert new_plate["B2"].data == {"score": 3.5}
+    assert new_plate["B3"].data == {"volume": "high"}
+    assert new_plate["C3"].data == {}
+    assert isinstance(new_trough, Trough8x1)
+    assert new_trough["H1"].volume == 1e-3
+
@@ -0,0 +1,44 @@
+import os
+
+from plateo import PickList, PlateStore
+from plateo.containers import Plate96, Plate384
+
+
+def test_plate_store(tmpdir):
+    source = Plate96(name="Source", data={"barcode": "BC001"})
+    for well in source:
+        well.add_content({"part_" + well.name: 1e-9}, volume=20e-6)
+    source["A1"].data.info = "hello"
+    destination = Plate384(name="Dest")
+    picklist = PickList(data={"robot": "echo"})
+    picklist.add_transfer(source["A1"], destination["B2"], 2e-6,
+                          data={"speed": 3})
+    picklist.add_transfer(source["A2"], destination["B2"], 2e-6)
+    path = os.path.join(str(tmpdir), "store.db")
+    with PlateStore(path) as store:
+        picklist_id = store.add_picklist(picklist, name="run_1")
+        picklist.execute()
+        store.add_plates([source, destination])
+
+    store = PlateStore(path)
+    assert store.find_plate_ids(barcode="BC001") == [1, 3]
+    assert store.find_wells(component="part_A1") == [
+        (1, "A1"), (3, "A1"), (4, "B2")]
+    assert store.find_wells(data_field="info", data_value="hello") == [
+        (1, "A1"), (3, "A1")]
+    plates = list(store.iter_plates(component="part_A2", name="Dest"))
+    assert len(plates) == 1
+    dest = plates[0]
+    assert isinstance(dest, Plate384)
+    assert dest["B2"].content.to_dict() == destination["B2"].content.to_dict()
+    assert dest["A1"].volume == 0
+
+    new_picklist = store.get_picklist(picklist_id)
+    assert new_picklist.data == {"robot": "echo"}
+    assert ([t.to_plain_string() for t in new_picklist.transfers_list] ==
+            [t.to_plain_string() for t in picklist.transfers_list])
+    assert new_picklist.transfers_list[0].data == {"speed": 3}
+    assert new_picklist.transfers_list[0].source_well.volume == 20e-6
+    assert [p.data for p in store.iter_picklists(name="run_1")] == [
+        {"robot": "echo"}]
+    store.close()
@@ -0,0 +1,58 @@
+import copy
+import pickle
+
+from plateo import PickList, SparseQuantities, component_registry
+from plateo.containers.plates import Plate96
+
+
+class SparsePlate96(Plate96):
+    quantities_class = SparseQuantities
+
+
+def test_sparse_quantities():
+    quantities = SparseQuantities({"DNA_2": 2.0, "DNA_1": 1.0})
+    assert quantities == {"DNA_1": 1.0, "DNA_2": 2.0}
+    assert quantities["DNA_2"] == 2.0
+    assert "DNA_3" not in quantities
+    assert component_registry.names[quantities.ids[0]] in ("DNA_1", "DNA_2")
+    quantities["DNA_3"] = 3.0
+    del quantities["DNA_1"]
+    assert dict(quantities.items()) == {"DNA_2": 2.0, "DNA_3": 3.0}
+    quantities.add({"DNA_1": 1.0, "DNA_2": 1.0}, factor=2)
+    assert quantities == {"DNA_1": 2.0, "DNA_2": 4.0, "DNA_3": 3.0}
+    quantities.subtract(SparseQuantities({"DNA_1": 2.0, "DNA_2": 1.0}))
+    assert quantities == {"DNA_2": 3.0, "DNA_3": 3.0}
+    assert pickle.loads(pickle.dumps(quantities)) == quantities
+    assert copy.deepcopy(quantities) == quantities
+
+
+def test_sparse_quantities_transfers():
+    results = []
+    for plate_class in (Plate96, SparsePlate96):
+        source, destination = plate_class(), plate_class()
+        for i, well in enumerate(source):
+            well.add_content({"DNA_%d" % (i % 5): 1e-9, "buffer": 2e-9},
+                             volume=20e-6)
+        picklist = PickList()
+        for well in source:
+            picklist.add_transfer(well, destination["A1"], 5e-6)
+        picklist.add_transfer(source["B1"], destination["A2"], 15e-6)
+        picklist.execute()
+        assert isinstance(destination["A1"].content.quantities,
+                          plate_class.quantities_class or dict)
+        results.append((dict(destination["A1"].content.quantities),
+                        dict(source["B1"].content.quantities),
+                        source["A1"].content.components_as_string()))
+    assert results[0] == results[1]
+
+
+def test_sparse_quantities_json_round_trip():
+    plate = SparsePlate96(name="Sparse")
+    plate["A1"].add_content({"DNA_1": 1.0, "DNA_2": 2.0}, volume=10e-6)
+    for compact in [False, True]:
+        new_plate = SparsePlate96.from_json(plate.to_json(compact=compact))
+        assert isinstance(new_plate, SparsePlate96)
+        quantities = new_plate["A1"].content.quantities
+        assert isinstance(quantities, SparseQuantities)
+        assert quantities == {"DNA_1": 1.0, "DNA_2": 2.0}
+        assert new_plate["A2"].content._quantities is None
@@ -81,6 +81,14 @@ def test_index_to_wellname(index, num_wells, direction, expected):
     assert tools.index_to_wellname(index, num_wells, direction) == expected
 
 
+def test_wellnames_by_index():
+    wellnames = tools.wellnames_by_index(96, direction="column")
+    assert list(wellnames[[0, 1, 8, 95]]) == ["A1", "B1", "A2", "H12"]
+    for index in [1, 42, 96]:
+        expected = tools.index_to_wellname(index, 96, direction="column")
+        assert wellnames[index - 1] == expected
+
+
 shift_data = [
     ("A1", 0, 0, "A1"),
     ("A1", 0, 3, "A4"),
@@ -131,3 +139,17 @@ def test_human_seq_size():
 
 def test_human_volume():
     assert tools.human_volume(500) == "500 L"
+
+
+def test_parallel_imap():
+    offset = 10  # closures need not be picklable
+
+    def function(x):
+        return x ** 2 + offset
+    expected = [x ** 2 + offset for x in range(20)]
+    for n_jobs in [1, 2, -1]:
+        assert list(tools.parallel_imap(function, range(20), n_jobs)) == expected
+    with pytest.raises(ValueError):
+        list(tools.parallel_imap(function, range(20), 0))
+    assert tools.effective_n_jobs(-1) == tools.effective_n_jobs(None)
+    assert tools.effective_n_jobs(-1000) == 1
@@ -24,3 +24,10 @@ def test_to_plain_string():
 
 def test___repr__():
     assert transfer.__repr__() == "2.50E-05L from Source A1 into Destination B2"
+
+
+def test_transfer_plates():
+    source, destination = Plate96(name="Source"), Plate96(name="Dest")
+    transfer = Transfer(source["A1"], destination["B2"], 1e-6)
+    assert transfer.source_plate is source
+    assert transfer.destination_plate is destination
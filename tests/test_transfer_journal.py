@@ -0,0 +1,72 @@
+import pytest
+
+from plateo import PickList, TransferJournal, TransferError
+from plateo.containers.plates import Plate96
+
+
+def plates_state(plates):
+    return [
+        (well.name, well.volume, dict(well.content.quantities),
+         [source.name for source in well.sources])
+        for plate in plates
+        for well in plate.iter_wells()
+    ]
+
+
+def test_transfer_journal():
+    source = Plate96(name="Source")
+    destination = Plate96(name="Destination")
+    for i, well in enumerate(source.iter_wells()):
+        well.add_content({"DNA_%d" % i: 1.0}, volume=50e-6)
+    picklist = PickList()
+    for i in range(40):
+        picklist.add_transfer(source.well_at_index(1 + i % 12),
+                              destination.well_at_index(1 + i % 7), 1e-6)
+        picklist.add_transfer(destination.well_at_index(1 + i % 7),
+                              destination.well_at_index(20), 0.5e-6)
+    plates = [source, destination]
+    states = [plates_state(plates)]
+    for transfer in picklist.transfers_list:
+        transfer.source_well.transfer_to_other_well(
+            transfer.destination_well, transfer.volume)
+        states.append(plates_state(plates))
+    for plate in plates:
+        for well in plate.iter_wells():
+            well.empty_completely()
+            well.sources = []
+    for i, well in enumerate(source.iter_wells()):
+        well.add_content({"DNA_%d" % i: 1.0}, volume=50e-6)
+
+    journal = TransferJournal(picklist, checkpoint_interval=10)
+    assert len(journal) == 80
+    for position in [5, 4, 80, 3, 42, 79, 0, 17, 80]:
+        journal.seek(position)
+        assert journal.position == position
+        assert plates_state(plates) == states[position]
+    journal.seek(30)
+    journal.undo()
+    journal.undo()
+    assert plates_state(plates) == states[28]
+    journal.step()
+    assert plates_state(plates) == states[29]
+    journal.run()
+    assert journal.current_transfer is None
+    with pytest.raises(IndexError):
+        journal.step()
+
+
+def test_transfer_journal_stops_at_failed_transfer():
+    plate = Plate96()
+    plate["A1"].add_content({"DNA": 1.0}, volume=10e-6)
+    picklist = PickList()
+    picklist.add_transfer(plate["A1"], plate["B1"], 6e-6)
+    picklist.add_transfer(plate["A1"], plate["B2"], 6e-6)
+    journal = TransferJournal(picklist)
+    with pytest.raises(TransferError):
+        journal.run()
+    assert journal.position == 1
+    assert journal.current_transfer.destination_well == plate["B2"]
+    journal.undo()
+    assert plate["A1"].volume == 10e-6
+    assert plate["B1"].volume == 0
+    assert plate["B1"].sources == []
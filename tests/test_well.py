@@ -1,7 +1,11 @@
+from copy import deepcopy
+
 import pytest
+from box import Box
 
+from plateo import set_default_container_class
 from plateo.containers.plates import Plate96
-from plateo.Well import TransferError, Well
+from plateo.Well import TransferError, Well, AttrDict
 
 
 plate = Plate96()
@@ -75,3 +79,94 @@ def test_is_after():
 
 def test___lt__():
     assert True
+
+
+def test_lazy_containers():
+    plate = Plate96()
+    well = plate["B2"]
+    assert not hasattr(well, "__dict__")
+    assert well.content.concentration() == 0
+    assert well.content.components_as_string() == ""
+    assert list(well.iterate_sources_tree()) == [well]
+    well.data.info = "hello"
+    assert plate["B2"].data == {"info": "hello"}
+    plate["A1"].add_content({"DNA": 1e-9}, volume=10e-6)
+    plate["A1"].transfer_to_other_well(well, 5e-6)
+    assert well.sources == [plate["A1"]]
+    assert well.content.quantities == {"DNA": 0.5e-9}
+
+
+@pytest.mark.parametrize("container_class", [AttrDict, dict])
+def test_container_class(container_class):
+    class Plate(Plate96):
+        pass
+    Plate.container_class = container_class
+    plate = Plate(wells_data={"A1": {"info": "hello"}})
+    assert type(plate.wells) is container_class
+    assert type(plate["A1"].data) is container_class
+    plate["A1"].add_content({"DNA": 1e-9}, volume=10e-6)
+    plate["A1"].transfer_to_other_well(plate["B1"], 5e-6)
+    assert type(plate["B1"].content.quantities) is container_class
+    assert plate["B1"].content.quantities == {"DNA": 0.5e-9}
+    if container_class is AttrDict:
+        assert plate.wells.A1.data.info == "hello"
+
+
+def test_set_default_container_class():
+    set_default_container_class(AttrDict)
+    try:
+        plate = Plate96()
+        assert type(plate["A1"].data) is AttrDict
+    finally:
+        set_default_container_class(Box)
+    assert type(Plate96()["A1"].data) is Box
+
+
+def test_iterate_sources_tree_with_shared_ancestors():
+    plate = Plate96()
+    plate["A1"].add_content({"DNA": 1}, volume=10e-6)
+    plate["A1"].transfer_to_other_well(plate["B1"], 2e-6)
+    plate["A1"].transfer_to_other_well(plate["B2"], 2e-6)
+    plate["B1"].transfer_to_other_well(plate["C1"], 1e-6)
+    plate["B2"].transfer_to_other_well(plate["C1"], 1e-6)
+    plate["B1"].transfer_to_other_well(plate["C1"], 1e-6)
+    assert plate["C1"].sources == [plate["B1"], plate["B2"]]
+    tree = list(plate["C1"].iterate_sources_tree())
+    assert tree == [plate["A1"], plate["B1"], plate["B2"], plate["C1"]]
+
+
+def test_sources():
+    plate = Plate96()
+    plate["A1"].add_content({"DNA": 1}, volume=10e-6)
+    plate["A1"].transfer_to_other_well(plate["B1"], 1e-6)
+    plate["B1"].sources.append("Water tank")
+    plate["B1"].add_source("Water tank")
+    plate["A1"].transfer_to_other_well(plate["B1"], 1e-6)
+    assert plate["B1"].sources == [plate["A1"], "Water tank"]
+    plate["B1"].add_source(["unhashable", "source"])
+    assert len(plate["B1"].sources) == 3
+    new_plate = deepcopy(plate)
+    new_plate["B1"].add_source(new_plate["A1"])
+    assert new_plate["B1"].sources[0] is new_plate["A1"]
+    assert len(new_plate["B1"].sources) == 3
+    sources = plate["B1"].sources
+    sources[0] = plate["A2"]
+    plate["B1"].add_source(plate["A1"])
+    plate["B1"].add_source(plate["A2"])
+    assert sources == [plate["A2"], "Water tank", ["unhashable", "source"],
+                       plate["A1"]]
+    sources.remove(plate["A1"])
+    sources.append(plate["A3"])
+    plate["B1"].add_source(plate["A1"])
+    assert len(sources) == 5
+
+
+def test_iterate_sources_tree_with_unhashable_sources():
+    plate = Plate96()
+    plate["A1"].sources.append({"supplier": "IDT"})
+    plate["A1"].add_content({"DNA": 1}, volume=10e-6)
+    plate["A1"].transfer_to_other_well(plate["B1"], 1e-6)
+    plate["A1"].transfer_to_other_well(plate["C1"], 1e-6)
+    plate["B1"].transfer_to_other_well(plate["C1"], 1e-6)
+    assert list(plate["C1"].iterate_sources_tree()) == [
+        {"supplier": "IDT"}, plate["A1"], plate["B1"], plate["C1"]]